@@ -0,0 +1,156 @@
+import heapq
+import itertools
+import os
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from metrics import get_timings
+
+# Lower number = served first
+PRIORITIES = {
+    "chat": 0,             # interactive chat
+    "recommendations": 1,  # profile recommendations
+    "tool": 2,             # agent tool sub-calls
+    "summary": 2,          # background conversation summaries
+}
+DEFAULT_PRIORITY = 2
+# Share of max_queue a priority class may fill before its requests are shed;
+# lower classes give up first so interactive chat keeps its headroom
+SHED_AT = {0: 1.0, 1: 0.75, 2: 0.5}
+
+
+class LoadShedError(Exception):
+    """The LLM queue is too deep (or the wait too long); the caller should fall back"""
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        """rate requests per second on average, with bursts of up to burst"""
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self) -> float:
+        """Seconds until a token is available; 0 if one is available now"""
+        self._refill()
+        return 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+
+    def take(self):
+        self._refill()
+        self._tokens -= 1
+
+
+class AdmissionController:
+    def __init__(self, rate: float = 2.0, burst: int = 5, max_concurrency: int = 4, max_queue: int = 32,
+                 queue_timeout: float = 20.0):
+        """Global gate in front of the LLM: a token-bucket rate limit, a concurrency cap and a priority queue"""
+        self.bucket = TokenBucket(rate, burst)
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+
+        self._queue = []  # heap of (priority, sequence)
+        self._sequence = itertools.count()
+        self._active = 0
+        self._condition = threading.Condition()
+        self._counters = defaultdict(lambda: defaultdict(int))
+
+    def _shed(self, call_type: str, reason: str):
+        self._counters[call_type]["shed"] += 1
+        raise LoadShedError(f"LLM busy ({reason}); {call_type} request shed")
+
+    def _acquire(self, call_type: str):
+        priority = PRIORITIES.get(call_type, DEFAULT_PRIORITY)
+        deadline = time.monotonic() + self.queue_timeout
+        with self._condition:
+            if len(self._queue) >= self.max_queue * SHED_AT.get(priority, SHED_AT[DEFAULT_PRIORITY]):
+                self._shed(call_type, f"{len(self._queue)} queued")
+            ticket = (priority, next(self._sequence))
+            heapq.heappush(self._queue, ticket)
+            try:
+                while True:
+                    wait = deadline - time.monotonic()
+                    if self._queue[0] == ticket and self._active < self.max_concurrency:
+                        token_wait = self.bucket.wait_time()
+                        if token_wait == 0:
+                            break
+                        wait = min(wait, token_wait)
+                    if deadline - time.monotonic() <= 0:
+                        self._shed(call_type, f"waited {self.queue_timeout:g}s")
+                    self._condition.wait(wait)
+            except BaseException:
+                self._queue.remove(ticket)
+                heapq.heapify(self._queue)
+                # The next ticket may now be at the head
+                self._condition.notify_all()
+                raise
+            heapq.heappop(self._queue)
+            self.bucket.take()
+            self._active += 1
+            self._counters[call_type]["admitted"] += 1
+            self._condition.notify_all()
+
+    def _release(self):
+        with self._condition:
+            self._active -= 1
+            self._condition.notify_all()
+
+    def hold_until(self, finished: Future, call_type: str):
+        """Count an abandoned call against the concurrency cap until finished resolves.
+
+        The resilience layer gives up on an attempt at its deadline, but the upstream request keeps
+        running; without this its slot would be free again while the request still loads the upstream.
+        """
+        with self._condition:
+            self._active += 1
+            self._counters[call_type]["abandoned"] += 1
+        finished.add_done_callback(lambda _: self._release())
+
+    @contextmanager
+    def slot(self, call_type: str):
+        """Hold one LLM slot for the with-block; raises LoadShedError instead of queueing too long"""
+        started = time.perf_counter()
+        self._acquire(call_type)
+        get_timings().record(f"queue.{call_type}", time.perf_counter() - started)
+        try:
+            yield
+        finally:
+            self._release()
+
+    def stats(self) -> Dict:
+        with self._condition:
+            counters = {call_type: dict(counts) for call_type, counts in self._counters.items()}
+            active, queued = self._active, len(self._queue)
+        for call_type, counts in counters.items():
+            counts["queue_time"] = get_timings().summary(f"queue.{call_type}")
+        return {"active": active, "queued": queued, "calls": counters}
+
+
+_controller: Optional[AdmissionController] = None
+_controller_lock = threading.Lock()
+
+
+def get_admission_controller() -> AdmissionController:
+    """Process-wide, since every session shares the one Gemini quota"""
+    global _controller
+    if _controller is None:
+        with _controller_lock:
+            if _controller is None:
+                _controller = AdmissionController(
+                    rate=float(os.getenv("LLM_RATE_PER_SECOND", 2)),
+                    burst=int(os.getenv("LLM_BURST", 5)),
+                    max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", 4)),
+                    max_queue=int(os.getenv("LLM_MAX_QUEUE", 32)),
+                    queue_timeout=float(os.getenv("LLM_QUEUE_TIMEOUT_SECONDS", 20)),
+                )
+    return _controller
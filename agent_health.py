@@ -0,0 +1,138 @@
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from langchain_agent import ScholarshipChatAgent
+
+WARMING = "warming"
+READY = "ready"
+DEGRADED = "degraded"
+DOWN = "down"
+
+
+class AgentHealth:
+    def __init__(self, factory: Callable, probe_interval: float = 60.0, slow_probe_seconds: float = 5.0,
+                 failures_until_down: int = 3):
+        """Builds the chat agent off the request path and tracks its health with periodic cheap probes.
+
+        warming  -> the agent is being built or hasn't been probed yet
+        ready    -> the last probe succeeded quickly
+        degraded -> the last probe was slow or failed, but fewer than failures_until_down in a row
+        down     -> the agent couldn't be built, or failures_until_down probes in a row failed
+        """
+        self.factory = factory
+        self.probe_interval = probe_interval
+        self.slow_probe_seconds = slow_probe_seconds
+        self.failures_until_down = failures_until_down
+
+        self.agent = None
+        self.state = WARMING
+        self.last_error: Optional[str] = None
+        self.last_probe_ms: Optional[float] = None
+        self.last_probe_at: Optional[float] = None
+        self.consecutive_failures = 0
+        self.probe_count = 0
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._ready = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "AgentHealth":
+        """Start the warm-up/probe thread once; returns immediately"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="agent-health", daemon=True)
+                self._thread.start()
+        return self
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Block until the agent has been built (in any state but down) or timeout passes"""
+        return self._ready.wait(timeout)
+
+    def probe_now(self):
+        """Ask the background thread for an immediate probe (or rebuild when down)"""
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            if self.agent is None:
+                self._build()
+            if self.agent is not None:
+                self._probe()
+            # Retry sooner while the agent is unavailable
+            interval = self.probe_interval if self.state in (READY, DEGRADED) else min(self.probe_interval, 10.0)
+            self._wake.wait(interval)
+            self._wake.clear()
+
+    def _build(self):
+        try:
+            agent = self.factory()
+        except Exception as e:
+            print(f"❌ Chat agent warm-up failed: {e}")
+            with self._lock:
+                self.state = DOWN
+                self.last_error = str(e)
+            return
+        with self._lock:
+            self.agent = agent
+        self._ready.set()
+
+    def _probe(self):
+        started = time.perf_counter()
+        try:
+            self.agent.probe()
+        except Exception as e:
+            self.record_failure(e)
+            return
+        self.record_success(time.perf_counter() - started)
+
+    def record_success(self, seconds: float):
+        with self._lock:
+            self.probe_count += 1
+            self.last_probe_at = time.time()
+            self.last_probe_ms = round(seconds * 1000, 1)
+            self.consecutive_failures = 0
+            if seconds > self.slow_probe_seconds:
+                self.state = DEGRADED
+                self.last_error = f"slow response ({self.last_probe_ms} ms)"
+            else:
+                self.state = READY
+                self.last_error = None
+
+    def record_failure(self, error: Exception):
+        with self._lock:
+            self.probe_count += 1
+            self.last_probe_at = time.time()
+            self.consecutive_failures += 1
+            self.last_error = str(error)
+            self.state = DOWN if self.consecutive_failures >= self.failures_until_down else DEGRADED
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "state": self.state,
+                "last_error": self.last_error,
+                "last_probe_ms": self.last_probe_ms,
+                "last_probe_at": self.last_probe_at,
+                "consecutive_failures": self.consecutive_failures,
+                "probe_count": self.probe_count,
+            }
+
+
+_health: Optional[AgentHealth] = None
+_health_lock = threading.Lock()
+
+
+def get_agent_health() -> AgentHealth:
+    """Process-wide agent holder; the first call starts warming the agent up in the background"""
+    global _health
+    if _health is None:
+        with _health_lock:
+            if _health is None:
+                _health = AgentHealth(
+                    ScholarshipChatAgent,
+                    probe_interval=float(os.getenv("AGENT_PROBE_INTERVAL_SECONDS", 60)),
+                ).start()
+    return _health
@@ -0,0 +1,119 @@
+import queue
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from langchain.agents.conversational.output_parser import ConvoOutputParser
+from langchain_core.agents import AgentFinish
+from langchain_core.callbacks import BaseCallbackHandler, CallbackManagerForLLMRun
+from langchain_core.exceptions import OutputParserException
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+# The conversational ReAct agent prefixes its final answer with this
+ANSWER_PREFIX = "AI:"
+# How a reply that is part of the ReAct loop opens; anything else is the model answering directly
+REACT_OPENERS = ("Thought:", "Action:", "Do I need to use a tool?", ANSWER_PREFIX)
+
+
+class StreamedChatModel(BaseChatModel):
+    """Chat model over a text-streaming function, so an agent's calls take our own LLM path.
+
+    Single-flight, admission, deadlines and retries all apply to each agent step, and every
+    chunk is reported to the run's callbacks as it arrives.
+    """
+
+    # (prompt, stop sequences) -> text chunks
+    stream_text: Callable[[str, Optional[List[str]]], Iterator[str]]
+
+    @property
+    def _llm_type(self) -> str:
+        return "streamed"
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        prompt = "\n".join(str(message.content) for message in messages)
+        parts = []
+        for text in self.stream_text(prompt, stop):
+            parts.append(text)
+            if run_manager:
+                run_manager.on_llm_new_token(text)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="".join(parts)))])
+
+
+class DirectAnswerParser(ConvoOutputParser):
+    """ConvoOutputParser that takes a reply outside the ReAct format as the final answer.
+
+    Gemini often answers without the "Thought: ... AI:" scaffolding; that is an answer, not a parse error.
+    """
+
+    def parse(self, text: str):
+        if text.lstrip().startswith(REACT_OPENERS):
+            try:
+                return super().parse(text)
+            except OutputParserException:
+                pass
+        return AgentFinish({"output": text.strip()}, text)
+
+
+class FinalAnswerStreamer(BaseCallbackHandler):
+    def __init__(self):
+        """Queues the tokens of the agent's final answer; tool-choosing steps are held back"""
+        self.chunks = queue.Queue()
+        self.streamed = False
+        self._buffer = ""
+        self._answering = False
+
+    def on_llm_start(self, *args, **kwargs):
+        self._buffer = ""
+        self._answering = False
+
+    def on_llm_new_token(self, token: str, **kwargs):
+        if self._answering:
+            self._put(token)
+            return
+        self._buffer += token
+        if ANSWER_PREFIX in self._buffer:
+            self._answering = True
+            self._put(self._buffer.split(ANSWER_PREFIX, 1)[1].lstrip())
+            return
+        # Read the same way DirectAnswerParser reads the whole reply
+        opening = self._buffer.lstrip()
+        if not any(opening.startswith(opener) or opener.startswith(opening) for opener in REACT_OPENERS):
+            self._answering = True
+            self._put(self._buffer)
+
+    def _put(self, text: str):
+        if text:
+            self.streamed = True
+            self.chunks.put(text)
+
+
+def stream_agent(agent, inputs: Dict) -> Iterator[str]:
+    """The agent's final answer, token by token as it is generated.
+
+    The agent runs on its own thread; an answer the streamer couldn't recognise as it arrived is
+    yielded whole at the end, and an agent error is re-raised to the reader.
+    """
+    streamer = FinalAnswerStreamer()
+    outcome = {}
+    done = object()
+
+    def run():
+        try:
+            outcome["output"] = agent.invoke(inputs, config={"callbacks": [streamer]})["output"]
+        except Exception as e:
+            outcome["error"] = e
+        finally:
+            streamer.chunks.put(done)
+
+    threading.Thread(target=run, name="agent-run", daemon=True).start()
+    while True:
+        chunk = streamer.chunks.get()
+        if chunk is done:
+            break
+        yield chunk
+    if "error" in outcome:
+        raise outcome["error"]
+    if not streamer.streamed:
+        yield outcome["output"]
@@ -1,9 +1,12 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 from datetime import datetime, timedelta
 import os
 from dotenv import load_dotenv
 import json
+import uuid
+import inspect
 
 # Disable Streamlit file watcher to prevent torch.classes errors
 os.environ["STREAMLIT_SERVER_WATCH_DIRS"] = "false"
@@ -11,16 +14,38 @@ os.environ["STREAMLIT_SERVER_WATCH_DIRS"] = "false"
 # Load environment variables
 load_dotenv(dotenv_path=".env.local")
 
+# Import our custom modules
+from langchain_agent import use_fake_llm
+from agent_health import DEGRADED, READY, WARMING, get_agent_health
+from catalog import DEFAULT_CATALOG_PATH, get_catalog
+from catalog_db import get_catalog_store
+from eligibility import evaluate, explain
+from metrics import get_timings
+from prefetch import get_prefetcher
+from resilience import OPEN, get_resilient_caller
+from hedging import get_hedger, hedging_enabled
+from singleflight import get_singleflight
+from admission import get_admission_controller
+from chat_history import DEFAULT_HISTORY_DIR, ChatHistory, prune_archives
+from ranking import RankedResults, match_scores, scholarship_name
+from materialize import get_materialized
+from models import COUNTRIES, DEGREE_LEVELS, FIELDS_OF_STUDY, GENDERS
+
 # Check required environment variables - UPDATED FOR GEMINI
-required_vars = ['GOOGLE_API_KEY']
+# (none are needed when running against the offline fake LLM)
+required_vars = [] if use_fake_llm() else ['GOOGLE_API_KEY']
 missing_vars = [var for var in required_vars if not os.getenv(var)]
 
 if missing_vars:
     st.error(f"Missing required environment variables: {', '.join(missing_vars)}")
     st.stop()
 
-# Import our custom modules
-from langchain_agent import ScholarshipChatAgent
+# "columnar" (in-memory catalog, default) or "sqlite" (paged queries against scholarships.db)
+CATALOG_BACKEND = os.getenv("SCHOLARSHIP_CATALOG_BACKEND", "columnar").lower()
+DB_PAGE_SIZE = 20
+# Newer Streamlit can skip a closed expander's body entirely; older versions still build it
+LAZY_EXPANDERS = "on_change" in inspect.signature(st.expander).parameters
+CHAT_HISTORY_DIR = os.getenv("CHAT_HISTORY_DIR", DEFAULT_HISTORY_DIR)
 
 # Page configuration - UPDATED FOR GEMINI
 st.set_page_config(
@@ -30,127 +55,491 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Initialize session state
-@st.cache_resource
-def initialize_chat_agent():
-    """Initialize chat agent with proper error handling"""
-    try:
-        return ScholarshipChatAgent()
-    except Exception as e:
-        st.error(f"Failed to initialize AI agent: {e}")
-        return None
+# The chat agent is built and probed in the background, so the page renders right away
+agent_health = get_agent_health()
 
-if 'chat_agent' not in st.session_state:
-    st.session_state.chat_agent = initialize_chat_agent()
-if 'messages' not in st.session_state:
-    st.session_state.messages = []
+def chat_agent():
+    """The shared chat agent, or None while it is still warming up (or couldn't be built)"""
+    return agent_health.agent
 
-def main():
-    # UPDATED TITLE AND INFO FOR GEMINI
-    st.title("🎓 AI Scholarship Finder")
-    st.markdown("**Powered by Scholardeep** - Advanced AI scholarship discovery!")
-    
-    # Display model info - UPDATED FOR GEMINI
-    with st.expander("🤖 About this AI"):
-        st.write("""
-        This scholarship finder uses:
-        - **Scholardeep** for advanced natural language understanding
-        - **Real-time web access** for the latest scholarship opportunities
-        - **Intelligent matching** based on your academic profile
-        - **Personalized recommendations** using AI analysis
-        - **No database dependency** - Pure AI-powered search
-        """)
+# Initialize session state
+# Keys this browser session's conversation memory in the agent's session pool
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+# Recent chat messages in memory, older ones archived to disk and paged back in on request
+if 'chat_history' not in st.session_state:
+    prune_archives(CHAT_HISTORY_DIR, max_age_seconds=7 * 24 * 3600)
+    st.session_state.chat_history = ChatHistory(st.session_state.session_id, directory=CHAT_HISTORY_DIR)
+    st.session_state.history_pages = 0
+
+def render_scholarship(title, key, details):
+    """Expander with a scholarship's details and how the saved profile matches it.
     
-    # Display AI status with better error handling
-    if st.session_state.chat_agent:
+    details() returns (scholarship, criteria); with lazy expanders it only runs while this one is open.
+    """
+    expander = st.expander(title, key=key, on_change="rerun") if LAZY_EXPANDERS else st.expander(title)
+    with expander:
+        if LAZY_EXPANDERS and not expander.open:
+            return
+        scholarship, criteria = details()
+        eligible = all(passed for passed, _ in criteria)
+        st.markdown(f"**Provider:** {scholarship['providing_body']}")
+        st.markdown(f"**Degree Level:** {', '.join(scholarship['degree_level'])}")
+        st.markdown(f"**Field of Study:** {', '.join(scholarship['field_of_study'])}")
+        st.markdown(f"**Gender Eligibility:** {scholarship['gender_eligibility']}")
+        st.markdown(f"**GPA Requirement:** {scholarship['gpa_requirement']}")
+        st.markdown(f"**Description:** {scholarship['brief_description']}")
+        st.markdown(f"**Link:** [{scholarship['link']}]({scholarship['link']})")
+        
+        if eligible:
+            # Add eligibility match indicators
+            st.success("✅ You are eligible for this scholarship!")
+            
+            # Show matching criteria
+            st.markdown("**Matching Criteria:**")
+            for passed, text in criteria:
+                st.markdown(f"- ✓ {text}")
+            
+            # Add apply button
+            st.markdown(f"[🔗 Apply Now]({scholarship['link']})")
+        else:
+            # Reasons come from the record's failure bitmask
+            st.warning("⚠️ You may not be eligible for this scholarship")
+            st.markdown("**Reasons:**")
+            for passed, text in criteria:
+                if not passed:
+                    st.markdown(f"- {text}")
+
+def prefetch_recommendations(profile):
+    """Start generating the AI recommendations for profile in the background"""
+    agent = chat_agent()
+    if agent:
+        # Without the fallback, a failed generation marks the job failed so it is retried, not replayed
+        get_prefetcher().submit(agent.analysis_key(profile), lambda: agent.analyze_profile_stream(profile, fallback=False))
+
+@st.fragment(run_every=5)
+def status_banner():
+    """AI status read from the agent's health state; polls so it follows warm-up and probes"""
+    health = agent_health.stats()
+    state = health['state']
+    if state == READY:
         st.success("🤖 **AI Status:** AI is ready and connected")
+    elif state == WARMING:
+        st.info("⏳ **AI Status:** Warming up... you can fill in your profile meanwhile")
+    elif state == DEGRADED:
+        st.warning(f"⚠️ **AI Status:** Degraded - answers may be slow or fall back to general advice ({health['last_error']})")
     else:
         st.error("❌ **AI Status:** Not connected. ")
         st.info("🔧 Make sure your .env.local file contains: GOOGLE_API_KEY=your_api_key_here")
     
-    # Sidebar for student profile
-    with st.sidebar:
-        st.header("📝 Student Profile")
-        
-        name = st.text_input("Full Name", placeholder="Enter your full name")
-        gender = st.selectbox(
-            "Gender",
-            ["Male", "Female", "Other", "Prefer not to say"]
+    resilience_stats = get_resilient_caller().stats()
+    if resilience_stats['breaker_state'] == OPEN:
+        st.warning("⚡ Gemini keeps failing, so answers fall back to general advice until it recovers.")
+    calls = resilience_stats['calls'].values()
+    if calls:
+        st.caption(
+            f"🛡️ LLM calls: {sum(c.get('successes', 0) for c in calls)} ok · "
+            f"{sum(c.get('retries', 0) for c in calls)} retried · "
+            f"{sum(c.get('failures', 0) for c in calls)} failed · "
+            f"{sum(c.get('short_circuited', 0) for c in calls)} failed fast · "
+            f"{get_singleflight().stats()['coalesced']} coalesced · "
+            f"{sum(c.get('shed', 0) for c in get_admission_controller().stats()['calls'].values())} shed under load"
+            + (f" · {sum(c.get('hedged', 0) for c in get_hedger().stats().values())} hedged" if hedging_enabled() else "")
         )
-        field_of_study = st.selectbox(
-            "Field of Study",
-            ["Engineering", "Medicine", "Business", "Computer Science", "Arts", "Science", "Law", "Education", "Mathematics"]
+    
+    # Views rendered during warm-up had no agent; rerun the page once it is up
+    previous_state = st.session_state.get('agent_state')
+    st.session_state.agent_state = state
+    if previous_state == WARMING and state != WARMING:
+        st.rerun()
+
+def render_timing(name, label):
+    """Caption with how long this view took to rerun"""
+    summary = get_timings().summary(name)
+    if summary:
+        st.caption(f"⏱️ {label} rerun: last {summary['last_ms']} ms · avg {summary['avg_ms']} ms over {summary['count']} runs")
+
+def render_cache_hit(message):
+    """Where a cached answer came from, with a button to report it as not matching the question"""
+    hit = message.get("cache_hit")
+    if not hit:
+        return
+    if not hit.get("reported"):
+        st.caption(f"♻️ Answered from the similar question \"{hit['question']}\" (similarity {hit['similarity']:.2f})")
+        if st.button("👎 Not what I asked", key=f"false_hit_{message['id']}"):
+            chat_agent().semantic_cache.report_false_hit(hit["entry_id"])
+            hit["reported"] = True
+    if hit.get("reported"):
+        st.caption("🙏 Thanks, that answer won't be reused. Ask again for a fresh one.")
+
+def render_routes():
+    """Caption with how many chat questions each route answered, and how fast"""
+    agent = chat_agent()
+    stats = agent.router.stats() if agent else {}
+    if stats:
+        routes = " · ".join(f"{route} {s['count']} ({s.get('avg_ms', '–')} ms avg)" for route, s in sorted(stats.items()))
+        st.caption(f"🧭 Chat routes: {routes}")
+    cache_stats = agent.semantic_cache.stats() if agent else None
+    if cache_stats and cache_stats["lookups"]:
+        st.caption(
+            f"♻️ Semantic cache: {cache_stats['hit_rate']:.0%} hit rate ({cache_stats['hits']}/{cache_stats['lookups']}) · "
+            f"{cache_stats['near_misses']} near misses · {cache_stats['false_hits']} reported wrong"
         )
-        degree_level = st.selectbox(
-            "Degree Level",
-            ["Undergraduate", "Postgraduate", "PhD"]
+    memory_stats = agent.sessions.get(st.session_state.session_id).stats() if agent else None
+    if memory_stats and memory_stats["last_prompt_tokens"]:
+        st.caption(
+            f"🧠 Memory: last prompt ~{memory_stats['last_prompt_tokens']} tokens "
+            f"(5-turn window: ~{memory_stats['last_baseline_tokens']}) · {memory_stats['summarized_turns']} turns summarized · "
+            f"~{memory_stats['saved_tokens_total']} tokens saved"
         )
-        country = st.selectbox(
-            "Country",
-            ["India", "USA", "UK", "Canada", "Australia", "Germany", "Other"]
+    pool_stats = agent.sessions.stats() if agent else None
+    if pool_stats:
+        st.caption(
+            f"👥 Sessions: {pool_stats['sessions']} in memory (~{pool_stats['resident_tokens']} tokens) · "
+            f"{pool_stats['spilled_sessions']} spilled to disk · "
+            f"{pool_stats['evicted_idle'] + pool_stats['evicted_capacity']} evicted"
         )
-        
-        # Additional profile fields for better matching
-        cgpa = st.number_input("CGPA (on a 10.0 scale)", min_value=0.0, max_value=10.0, value=7.5, step=0.01, key="cgpa_input")
-        # Automatically calculate GPA based on CGPA (assuming 10.0 scale to 4.0 scale conversion)
-        gpa_calculated = round(cgpa / 2.5, 2)
-        gpa = st.number_input("GPA (on a 4.0 scale)", min_value=0.0, max_value=4.0, value=gpa_calculated, step=0.01, key="gpa_input")
 
-        
-        if st.button("💾 Save Profile", type="primary"):
-            if name.strip():  # Validate that name is provided
-                st.session_state.student_profile = {
-                    'name': name,
-                    'gender': gender,
-                    'field_of_study': field_of_study,
-                    'degree_level': degree_level,
-                    'country': country,
-                    'gpa': gpa,
-                    'cgpa': cgpa
-                }
-                st.success("✅ Profile saved!")
-                st.info("👉 Check the 'Eligible Scholarships' tab to see AI-powered recommendations!")
-            else:
-                st.error("❌ Please enter your full name to save the profile.")
+@st.fragment
+def profile_sidebar():
+    """Profile form; editing a field reruns only this fragment, saving reruns the views that use the profile"""
+    st.header("📝 Student Profile")
     
-    # Main content with tabs
-    tab1, tab2 = st.tabs(["💬 Chat with AI", "🎯 Eligible Scholarships"])
+    name = st.text_input("Full Name", placeholder="Enter your full name")
+    gender = st.selectbox(
+        "Gender",
+        GENDERS
+    )
+    field_of_study = st.selectbox(
+        "Field of Study",
+        FIELDS_OF_STUDY
+    )
+    degree_level = st.selectbox(
+        "Degree Level",
+        DEGREE_LEVELS
+    )
+    country = st.selectbox(
+        "Country",
+        COUNTRIES
+    )
     
-    with tab1:
+    # Additional profile fields for better matching
+    cgpa = st.number_input("CGPA (on a 10.0 scale)", min_value=0.0, max_value=10.0, value=7.5, step=0.01, key="cgpa_input")
+    # Automatically calculate GPA based on CGPA (assuming 10.0 scale to 4.0 scale conversion)
+    gpa_calculated = round(cgpa / 2.5, 2)
+    gpa = st.number_input("GPA (on a 4.0 scale)", min_value=0.0, max_value=4.0, value=gpa_calculated, step=0.01, key="gpa_input")
+
+    
+    if st.button("💾 Save Profile", type="primary"):
+        if name.strip():  # Validate that name is provided
+            st.session_state.student_profile = {
+                'name': name,
+                'gender': gender,
+                'field_of_study': field_of_study,
+                'degree_level': degree_level,
+                'country': country,
+                'gpa': gpa,
+                'cgpa': cgpa
+            }
+            # Overlap the LLM call with the user reading the database results
+            prefetch_recommendations(st.session_state.student_profile)
+            # The results views read the profile, so a save reruns the whole page once
+            st.session_state.profile_saved = True
+            st.rerun()
+        else:
+            st.error("❌ Please enter your full name to save the profile.")
+    
+    if st.session_state.pop('profile_saved', False):
+        st.success("✅ Profile saved!")
+        st.info("👉 Check the 'Eligible Scholarships' tab to see AI-powered recommendations!")
+
+@st.fragment
+def chat_view():
+    """Chat tab; sending a message reruns only this fragment"""
+    with get_timings().track("chat"):
         # UPDATED HEADER FOR GEMINI
         st.header("💬 Chat with Scholardeep Assistant")
         
-        # Display chat messages
-        for message in st.session_state.messages:
+        # Display chat messages: archived pages only when asked for, each as one cached markdown block
+        history = st.session_state.chat_history
+        shown_pages = min(st.session_state.history_pages, history.pages())
+        if shown_pages < history.pages():
+            if st.button(f"⬆️ Load earlier messages ({history.archived - shown_pages * history.page_size} more)",
+                         key="load_earlier"):
+                st.session_state.history_pages += 1
+                shown_pages += 1
+        for markup in history.earlier(shown_pages):
+            st.markdown(markup)
+        for message in history.messages:
             with st.chat_message(message["role"]):
                 st.markdown(message["content"])
+                render_cache_hit(message)
         
         # Chat input
         if prompt := st.chat_input("Ask me about scholarships..."):
             # Add user message
-            st.session_state.messages.append({"role": "user", "content": prompt})
+            history.append({"role": "user", "content": prompt})
             with st.chat_message("user"):
                 st.markdown(prompt)
             
-            # Get AI response - UPDATED SPINNER TEXT FOR GEMINI
+            # Get AI response, streamed token by token as Gemini generates it
             with st.chat_message("assistant"):
-                with st.spinner("🤖 Scholardeep is analyzing your request..."):
-                    try:
-                        if st.session_state.chat_agent:
-                            # Get response from agent
-                            response = st.session_state.chat_agent.chat(prompt)
-                            st.markdown(response)
-                            st.session_state.messages.append({"role": "assistant", "content": response})
-                        else:
-                            error_msg = "❌ AI assistant is not available. Please check your Google API key configuration."
-                            st.error(error_msg)
-                            st.session_state.messages.append({"role": "assistant", "content": error_msg})
-                        
-                    except Exception as e:
-                        # UPDATED ERROR MESSAGE FOR GEMINI
-                        error_msg = f"⚠️ I encountered an error: {str(e)}\n\nPlease check your Google API key and try again."
+                try:
+                    # A message sent during warm-up waits briefly for the agent instead of failing
+                    if agent_health.state == WARMING:
+                        agent_health.wait_ready(timeout=15)
+                    agent = chat_agent()
+                    if agent:
+                        response = st.write_stream(agent.chat_stream(prompt, session_id=st.session_state.session_id))
+                        message = {"role": "assistant", "content": response}
+                        hit = agent.last_cache_hit()
+                        if hit:
+                            message["cache_hit"] = {"entry_id": hit.entry_id, "question": hit.question,
+                                                    "similarity": hit.similarity}
+                        history.append(message)
+                        render_cache_hit(message)
+                    else:
+                        error_msg = "❌ AI assistant is not available. Please check your Google API key configuration."
                         st.error(error_msg)
-                        st.session_state.messages.append({"role": "assistant", "content": error_msg})
+                        history.append({"role": "assistant", "content": error_msg})
+                    
+                except Exception as e:
+                    # UPDATED ERROR MESSAGE FOR GEMINI
+                    error_msg = f"⚠️ I encountered an error: {str(e)}\n\nPlease check your Google API key and try again."
+                    st.error(error_msg)
+                    history.append({"role": "assistant", "content": error_msg})
+    render_timing("chat", "Chat")
+    render_routes()
+
+def ranked_rows(scholarships, ranked, page_key, criteria):
+    """(title, key, details) for the current page of ranked results; records and criteria(i) are built only on demand"""
+    page = min(st.session_state.get(page_key, 1), ranked.pages(DB_PAGE_SIZE)) - 1
+    return [
+        (f"🎓 {scholarship_name(scholarships, i)} · {score}% match", f"scholarship_{i}",
+         lambda i=i: (scholarships[i], criteria(i)))
+        for i, score in ranked.page(page, DB_PAGE_SIZE)
+    ]
+
+def stored_rows(page, profile):
+    """(title, key, details) for a page of SQLite rows, which arrive already assembled and ranked"""
+    return [
+        (f"🎓 {row['scholarship_name']} · {score}% match", f"scholarship_{row['id']}",
+         lambda row=row, mask=mask: (row, explain(row, profile, mask)))
+        for row, mask, score in zip(page.rows, page.failures, page.scores)
+    ]
+
+@st.fragment
+def database_view():
+    """Database matches for the saved profile, one page at a time; paging and the show-all toggle rerun only this fragment"""
+    with get_timings().track("database"):
+        st.subheader("📋 Eligible Scholarships from Database")
+        try:
+            profile = st.session_state.student_profile
+            
+            if CATALOG_BACKEND == "sqlite":
+                # Only the requested page of rows is read from SQLite
+                store = get_catalog_store()
+                store.sync_from_json(DEFAULT_CATALOG_PATH)
+                page = store.query(profile, page=st.session_state.get("db_page", 1) - 1, page_size=DB_PAGE_SIZE)
+                eligible_count = page.total
+                eligible_rows = stored_rows(page, profile)
+            else:
+                # Shared catalog, re-parsed only when scholarships.json changes
+                catalog = get_catalog()
+                scholarships = catalog.scholarships
+                
+                # A sidebar profile is a bucket lookup in the precomputed side file (materialize.py);
+                # anything else evaluates every scholarship once as vectorized column masks
+                eligibility = None
+                eligible_ids = get_materialized().eligible_ids(profile)
+                if eligible_ids is None:
+                    eligibility = evaluate(scholarships, profile)
+                    eligible_ids = eligibility.eligible_ids
+                # Ranked by match score; only the requested page is picked out and rendered
+                scores = match_scores(scholarships, profile, eligible_ids, np.zeros(len(eligible_ids), dtype=np.uint8))
+                ranked = RankedResults(eligible_ids, scores)
+                eligible_count = len(ranked)
+                eligible_rows = ranked_rows(scholarships, ranked, "db_page", lambda i: explain(scholarships[i], profile, 0))
+            
+            # Display eligible scholarships count
+            if eligible_count:
+                st.success(f"✅ Found {eligible_count} eligible scholarships for you!")
+            else:
+                st.warning("⚠️ No eligible scholarships found in our database for your profile.")
+                st.info("Try checking the AI Recommendations tab for more personalized options.")
+            
+            # Display eligible scholarships in a more structured way
+            for title, key, details in eligible_rows:
+                render_scholarship(title, key, details)
+            if eligible_count > DB_PAGE_SIZE:
+                st.number_input("Page", min_value=1, max_value=-(-eligible_count // DB_PAGE_SIZE), key="db_page")
+            
+            # Add toggle to show all scholarships
+            if st.checkbox("Show all scholarships (including non-eligible)"):
+                st.subheader("All Available Scholarships")
+                # Only the records not already shown above
+                if CATALOG_BACKEND == "sqlite":
+                    other_page = store.query(profile, eligible=False, page=st.session_state.get("db_other_page", 1) - 1, page_size=DB_PAGE_SIZE)
+                    other_count = other_page.total
+                    other_rows = stored_rows(other_page, profile)
+                else:
+                    # Failure bitmasks (and their explanations) are only needed for this view
+                    if eligibility is None:
+                        eligibility = evaluate(scholarships, profile)
+                    other_ids = eligibility.ineligible_ids
+                    other = RankedResults(other_ids, match_scores(scholarships, profile, other_ids, eligibility.failures[other_ids]))
+                    other_count = len(other)
+                    other_rows = ranked_rows(scholarships, other, "db_other_page", eligibility.criteria)
+                for title, key, details in other_rows:
+                    render_scholarship(title, key, details)
+                if other_count > DB_PAGE_SIZE:
+                    st.number_input("Page", min_value=1, max_value=-(-other_count // DB_PAGE_SIZE), key="db_other_page")
+            
+            # Add profile summary
+            st.divider()
+            st.subheader("📋 Your Profile Summary")
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("Field", profile['field_of_study'])
+            with col2:
+                st.metric("Level", profile['degree_level'])
+            with col3:
+                st.metric("Gender", profile['gender'])
+            with col4:
+                st.metric("Country", profile['country'])
+            
+            if CATALOG_BACKEND == "sqlite":
+                store_stats = store.stats()
+                st.caption(
+                    f"🗄️ SQLite catalog: {store_stats['records']} scholarships · "
+                    f"{store_stats['query_count']} queries (avg {store_stats['avg_query_ms']} ms)"
+                )
+            else:
+                catalog_stats = catalog.stats()
+                st.caption(
+                    f"📚 Catalog: {catalog_stats['records']} scholarships ({catalog_stats['memory_kb']} KB) · "
+                    f"loaded {catalog_stats['reload_count']}× (last {catalog_stats['last_load_ms']} ms) · "
+                    f"{catalog_stats['check_count']} freshness checks"
+                )
+                materialized_stats = get_materialized().stats()
+                lookup = materialized_stats['lookup']
+                st.caption(
+                    f"🧮 Precomputed: {materialized_stats['buckets']} profile buckets ({materialized_stats['kb']} KB)"
+                    + (f" · lookup avg {lookup['avg_ms']} ms" if lookup else "")
+                )
+
+            
+        except Exception as e:
+            st.error(f"❌ Error loading scholarships: {str(e)}")
+            st.info("🔄 Please try refreshing the page or check if the scholarships.json file exists.")
+    render_timing("database", "Database results")
+
+@st.fragment
+def recommendations_view():
+    """AI recommendations for the saved profile"""
+    with get_timings().track("recommendations"):
+        st.subheader("🤖 AI-Powered Scholarship Recommendations")
+        try:
+            profile = st.session_state.student_profile
+            
+            # Get scholarships using the new method
+            agent = chat_agent()
+            if agent:
+                # Usually already started in the background when the profile was saved:
+                # replay what it has generated so far, then keep streaming the rest
+                job = get_prefetcher().get(agent.analysis_key(profile))
+                if job:
+                    placeholder = st.empty()
+                    if not job.done and not job.parts:
+                        placeholder.info("⏳ Scholardeep started on your recommendations when you saved your profile...")
+                    st.write_stream(agent.with_fallback(job.stream(), profile))
+                    placeholder.empty()
+                else:
+                    # Stream the comprehensive analysis from Gemini as it is generated
+                    # (a cached answer for the same profile and prompt template arrives at once)
+                    st.write_stream(agent.analyze_profile_stream(profile))
+                
+                # Success message
+                st.success("✅ AI recommendations loaded successfully!")
+                cache_stats = agent.response_cache.stats()
+                prefetch_stats = get_prefetcher().stats()
+                st.caption(
+                    f"🗃️ Response cache: {cache_stats['memory_hits'] + cache_stats['disk_hits']} hits · "
+                    f"{cache_stats['misses']} misses · hit rate {cache_stats['hit_rate']:.0%} · "
+                    f"prefetched {prefetch_stats['submitted']} ({prefetch_stats['pending']} running)"
+                )
+                
+                # Add tips section
+                with st.expander("💡 Application Tips"):
+                    st.write("""
+                    **📝 Application Best Practices:**
+                    - Start applications early (3-6 months before deadlines)
+                    - Tailor each application to the specific scholarship
+                    - Highlight achievements relevant to the scholarship's mission
+                    - Get strong letters of recommendation
+                    - Proofread all materials carefully
+                    - Follow application instructions exactly
+                    - Apply to multiple scholarships to increase chances
+                    
+                    **📚 Documents Usually Required:**
+                    - Academic transcripts
+                    - Personal statement/essay
+                    - Letters of recommendation
+                    - Resume/CV
+                    - Financial information (for need-based scholarships)
+                    - Portfolio (for creative fields)
+                    """)
+            elif agent_health.state == WARMING:
+                st.info("⏳ Scholardeep is warming up; your recommendations will appear in a moment.")
+            else:
+                st.error("❌ Scholardeep AI model not available. Please check your configuration.")
+                st.info("🔧 Ensure GOOGLE_API_KEY is set in your .env.local file")
+                
+        except Exception as e:
+            st.error(f"❌ Error analyzing scholarships: {str(e)}")
+            st.info("🔄 Please try refreshing the page or check your internet connection.")
+            
+            # Show fallback content on error
+            st.markdown("""
+            ## 📚 While we fix this, here are general scholarship tips:
+            
+            1. **University Financial Aid Office** - Your first stop for institutional aid
+            2. **Fastweb.com** - Comprehensive scholarship database  
+            3. **Professional Associations** - Field-specific opportunities
+            4. **Government Websites** - National and regional programs
+            5. **Local Community Foundations** - Often overlooked opportunities
+            6. **Company Scholarships** - Many corporations offer educational funding
+            """)
+    render_timing("recommendations", "AI recommendations")
+
+def main():
+    # UPDATED TITLE AND INFO FOR GEMINI
+    st.title("🎓 AI Scholarship Finder")
+    st.markdown("**Powered by Scholardeep** - Advanced AI scholarship discovery!")
+    
+    # Display model info - UPDATED FOR GEMINI
+    with st.expander("🤖 About this AI"):
+        st.write("""
+        This scholarship finder uses:
+        - **Scholardeep** for advanced natural language understanding
+        - **Real-time web access** for the latest scholarship opportunities
+        - **Intelligent matching** based on your academic profile
+        - **Personalized recommendations** using AI analysis
+        - **No database dependency** - Pure AI-powered search
+        """)
+    
+    # Display AI status from the background health checks
+    status_banner()
+    
+    # Sidebar for student profile
+    with st.sidebar:
+        profile_sidebar()
+
+    # Main content with tabs
+    tab1, tab2 = st.tabs(["💬 Chat with AI", "🎯 Eligible Scholarships"])
+    
+    with tab1:
+        chat_view()
     
     with tab2:
         st.header("🎯 Eligible Scholarships For You")
@@ -166,234 +555,16 @@ def main():
             source_tab1, source_tab2 = st.tabs(["📋 Database Scholarships", "🤖 AI Recommendations"])
             
             with source_tab1:
-                st.subheader("📋 Eligible Scholarships from Database")
-                try:
-                    # Load scholarships from JSON file
-                    with open("scholarships.json", "r") as f:
-                        scholarships = json.load(f)
-                    
-                    profile = st.session_state.student_profile
-                    
-                    # Filter eligible scholarships
-                    eligible_scholarships = []
-                    for scholarship in scholarships:
-                        is_eligible = True
-                        
-                        # Check degree level
-                        if profile['degree_level'] not in scholarship['degree_level']:
-                            is_eligible = False
-                        
-                        # Check field of study
-                        if profile['field_of_study'] not in scholarship['field_of_study']:
-                            is_eligible = False
-                        
-                        # Check gender eligibility if not "All"
-                        if scholarship['gender_eligibility'] != "All" and profile['gender'] != scholarship['gender_eligibility']:
-                            is_eligible = False
-
-                        # Check GPA requirement
-                        if 'gpa_requirement' in scholarship and scholarship['gpa_requirement'] is not None and isinstance(scholarship['gpa_requirement'], (int, float)):
-                            if profile['gpa'] < scholarship['gpa_requirement']:
-                                is_eligible = False
-
-                        # Check CGPA requirement
-                        if 'cgpa_requirement' in scholarship and scholarship['cgpa_requirement'] is not None and isinstance(scholarship['cgpa_requirement'], (int, float)):
-                            if profile['cgpa'] < scholarship['cgpa_requirement']:
-                                is_eligible = False
-                        
-                        if is_eligible:
-                            eligible_scholarships.append(scholarship)
-                    
-                    # Display eligible scholarships count
-                    if eligible_scholarships:
-                        st.success(f"✅ Found {len(eligible_scholarships)} eligible scholarships for you!")
-                    else:
-                        st.warning("⚠️ No eligible scholarships found in our database for your profile.")
-                        st.info("Try checking the AI Recommendations tab for more personalized options.")
-                    
-                    # Display eligible scholarships in a more structured way
-                    for scholarship in eligible_scholarships:
-                        with st.expander(f"🎓 {scholarship['scholarship_name']}"):
-                            st.markdown(f"**Provider:** {scholarship['providing_body']}")
-                            st.markdown(f"**Degree Level:** {', '.join(scholarship['degree_level'])}")
-                            st.markdown(f"**Field of Study:** {', '.join(scholarship['field_of_study'])}")
-                            st.markdown(f"**Gender Eligibility:** {scholarship['gender_eligibility']}")
-                            st.markdown(f"**GPA Requirement:** {scholarship['gpa_requirement']}")
-                            st.markdown(f"**Description:** {scholarship['brief_description']}")
-                            st.markdown(f"**Link:** [{scholarship['link']}]({scholarship['link']})")
-                            
-                            # Add eligibility match indicators
-                            st.success("✅ You are eligible for this scholarship!")
-                            
-                            # Show matching criteria
-                            st.markdown("**Matching Criteria:**")
-                            st.markdown(f"- ✓ Your degree level ({profile['degree_level']}) matches the required level")
-                            st.markdown(f"- ✓ Your field of study ({profile['field_of_study']}) matches the required fields")
-                            if scholarship['gender_eligibility'] == "All":
-                                st.markdown(f"- ✓ This scholarship is available for all genders")
-                            else:
-                                st.markdown(f"- ✓ Your gender ({profile['gender']}) matches the eligibility requirement")
-                            
-                            # Add apply button
-                            st.markdown(f"[🔗 Apply Now]({scholarship['link']})")
-                    
-                    # Add toggle to show all scholarships
-                    if st.checkbox("Show all scholarships (including non-eligible)"):
-                        st.subheader("All Available Scholarships")
-                        for scholarship in scholarships:
-                            # Skip already shown eligible scholarships
-                            if scholarship in eligible_scholarships:
-                                continue
-                                
-                            with st.expander(f"🎓 {scholarship['scholarship_name']}"):
-                                st.markdown(f"**Provider:** {scholarship['providing_body']}")
-                                st.markdown(f"**Degree Level:** {', '.join(scholarship['degree_level'])}")
-                                st.markdown(f"**Field of Study:** {', '.join(scholarship['field_of_study'])}")
-                                st.markdown(f"**Gender Eligibility:** {scholarship['gender_eligibility']}")
-                                st.markdown(f"**GPA Requirement:** {scholarship['gpa_requirement']}")
-                                st.markdown(f"**Description:** {scholarship['brief_description']}")
-                                st.markdown(f"**Link:** [{scholarship['link']}]({scholarship['link']})")
-                                
-                                # Add eligibility check
-                                reasons = []
-                                
-                                # Check degree level
-                                if profile['degree_level'] not in scholarship['degree_level']:
-                                    reasons.append(f"Your degree level ({profile['degree_level']}) doesn't match the required level ({', '.join(scholarship['degree_level'])})")
-                                
-                                # Check field of study
-                                if profile['field_of_study'] not in scholarship['field_of_study']:
-                                    reasons.append(f"Your field of study ({profile['field_of_study']}) doesn't match the required fields ({', '.join(scholarship['field_of_study'])})")
-                                
-                                # Check gender eligibility if not "All"
-                                if scholarship['gender_eligibility'] != "All" and profile['gender'] != scholarship['gender_eligibility']:
-                                    reasons.append(f"This scholarship is only available for {scholarship['gender_eligibility']} students")
-                                
-                                # Display eligibility status
-                                st.warning("⚠️ You may not be eligible for this scholarship")
-                                st.markdown("**Reasons:**")
-                                for reason in reasons:
-                                    st.markdown(f"- {reason}")
-                    
-                    # Add profile summary
-                    st.divider()
-                    st.subheader("📋 Your Profile Summary")
-                    col1, col2, col3, col4 = st.columns(4)
-                    with col1:
-                        st.metric("Field", profile['field_of_study'])
-                    with col2:
-                        st.metric("Level", profile['degree_level'])
-                    with col3:
-                        st.metric("Gender", profile['gender'])
-                    with col4:
-                        st.metric("Country", profile['country'])
-                    
-
-                    
-                except Exception as e:
-                    st.error(f"❌ Error loading scholarships: {str(e)}")
-                    st.info("🔄 Please try refreshing the page or check if the scholarships.json file exists.")
+                database_view()
             
             with source_tab2:
-                st.subheader("🤖 AI-Powered Scholarship Recommendations")
-                with st.spinner("🤖 Scholardeep is finding scholarships for you..."):
-                    try:
-                        profile = st.session_state.student_profile
-                        
-                        # Get scholarships using the new method
-                        if st.session_state.chat_agent:
-                            # FIXED: Properly formatted f-string for Gemini prompt
-                            gemini_prompt = f"""As an expert scholarship advisor with access to current scholarship information, provide a comprehensive analysis of scholarship opportunities for this student profile:
-
-**Student Profile:**
-- Name: {profile['name']}
-- Gender: {profile['gender']}
-- Field of Study: {profile['field_of_study']}
-- Degree Level: {profile['degree_level']}
-- Country: {profile['country']}
-
-**Please provide:**
-
-1. **🎯 TOP 5 ELIGIBLE SCHOLARSHIPS** - List specific scholarships this student is eligible for, including:
-   - Scholarship name and provider
-   - Award amount (if known)
-   - Eligibility requirements
-   - Application deadline (if known)
-   - Application process overview
-
-2. **📊 ELIGIBILITY ANALYSIS** - For each scholarship, provide:
-   - ✅ Eligible / ⚠️ Potentially Eligible / ❌ Not Eligible
-   - Match score (1-10) based on profile alignment
-   - Specific requirements they meet/don't meet
-
-3. **💡 PERSONALIZED RECOMMENDATIONS**:
-   - Scholarship categories most suitable for this profile
-   - Ways to strengthen their application
-   - Timeline suggestions for applications
-   - Additional opportunities to explore
-
-4. **🚀 ACTION PLAN**:
-   - Immediate next steps
-   - Documents to prepare
-   - Deadlines to watch
-   - Tips for success
-
-Please use current scholarship information and be specific about opportunities available in {profile['country']} and internationally for {profile['field_of_study']} students at the {profile['degree_level']} level. Format your response with clear headings, bullet points, and emoji indicators for easy reading."""
-                            
-                            # Get comprehensive response from Gemini
-                            gemini_response = st.session_state.chat_agent.llm.invoke(gemini_prompt)
-                            gemini_analysis = gemini_response.content if hasattr(gemini_response, 'content') else str(gemini_response)
-                            
-                            # Display the comprehensive analysis
-                            st.markdown(gemini_analysis)
-                            
-                            # Success message
-                            st.success("✅ AI recommendations loaded successfully!")
-                            
-                            # Add tips section
-                            with st.expander("💡 Application Tips"):
-                                st.write("""
-                                **📝 Application Best Practices:**
-                                - Start applications early (3-6 months before deadlines)
-                                - Tailor each application to the specific scholarship
-                                - Highlight achievements relevant to the scholarship's mission
-                                - Get strong letters of recommendation
-                                - Proofread all materials carefully
-                                - Follow application instructions exactly
-                                - Apply to multiple scholarships to increase chances
-                                
-                                **📚 Documents Usually Required:**
-                                - Academic transcripts
-                                - Personal statement/essay
-                                - Letters of recommendation
-                                - Resume/CV
-                                - Financial information (for need-based scholarships)
-                                - Portfolio (for creative fields)
-                                """)
-                        else:
-                            st.error("❌ Scholardeep AI model not available. Please check your configuration.")
-                            st.info("🔧 Ensure GOOGLE_API_KEY is set in your .env.local file")
-                            
-                    except Exception as e:
-                        st.error(f"❌ Error analyzing scholarships: {str(e)}")
-                        st.info("🔄 Please try refreshing the page or check your internet connection.")
-                        
-                        # Show fallback content on error
-                        st.markdown("""
-                        ## 📚 While we fix this, here are general scholarship tips:
-                        
-                        1. **University Financial Aid Office** - Your first stop for institutional aid
-                        2. **Fastweb.com** - Comprehensive scholarship database  
-                        3. **Professional Associations** - Field-specific opportunities
-                        4. **Government Websites** - National and regional programs
-                        5. **Local Community Foundations** - Often overlooked opportunities
-                        6. **Company Scholarships** - Many corporations offer educational funding
-                        """)
+                recommendations_view()
     
 
 
     # Footer
     st.divider()
+    render_timing("page", "Full page")
     st.markdown("""
     <div style='text-align: center; color: #666; padding: 20px;'>
         <p>🎓 <strong>AI Scholarship Finder</strong> - Powered by Scholardeep</p>
@@ -402,4 +573,6 @@ Please use current scholarship information and be specific about opportunities a
     """, unsafe_allow_html=True)
 
 if __name__ == "__main__":
-    main()
+    # Full-page reruns; fragment reruns are tracked separately under their own names
+    with get_timings().track("page"):
+        main()
@@ -0,0 +1,136 @@
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from columnar import ColumnarCatalog
+from normalization import is_normalized, normalize_scholarship
+from snapshot import load_snapshot, snapshot_path_for, write_snapshot
+
+DEFAULT_CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scholarships.json")
+
+
+class ScholarshipCatalog:
+    def __init__(self, path: str = DEFAULT_CATALOG_PATH, check_interval: float = 1.0):
+        """Scholarship catalog parsed once per process and reloaded only when the file changes"""
+        self.path = path
+        # Compiled snapshot (see snapshot.py) used instead of JSON when it matches the file
+        self.snapshot_path = snapshot_path_for(path)
+        # Minimum seconds between two os.stat() freshness checks
+        self.check_interval = check_interval
+
+        self._lock = threading.Lock()
+        self._current = ColumnarCatalog.from_records([])
+        self._signature = None
+        self._last_check = 0.0
+
+        # Counters surfaced in the UI
+        self.reload_count = 0
+        self.check_count = 0
+        self.last_load_seconds = 0.0
+        self.last_columns_seconds = 0.0
+        self.total_load_seconds = 0.0
+        self.last_loaded_at: Optional[float] = None
+        self.source: Optional[str] = None
+
+    def _file_signature(self):
+        """mtime and size identify a version of the catalog file"""
+        stat = os.stat(self.path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _load_snapshot(self, signature) -> Optional[ColumnarCatalog]:
+        """Map the compiled snapshot if it was built from this exact version of the file"""
+        if not os.path.exists(self.snapshot_path):
+            return None
+        try:
+            return load_snapshot(self.snapshot_path, expected_signature=signature)
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable snapshot {self.snapshot_path}: {e}")
+            return None
+
+    def _load(self, signature):
+        """Map the snapshot or parse the JSON file, and swap the columns in"""
+        started = time.perf_counter()
+        columns = self._load_snapshot(signature)
+        columns_started = time.perf_counter()
+        if columns is not None:
+            self.source = "snapshot"
+        else:
+            with open(self.path, "r", encoding="utf-8") as f:
+                scholarships = json.load(f)
+            # Files written by fix_scholarships.py are already normalized; raw ones are parsed here once
+            scholarships = [s if is_normalized(s) else normalize_scholarship(s) for s in scholarships]
+            columns_started = time.perf_counter()
+            # The per-record dicts are dropped once the columns exist
+            columns = ColumnarCatalog.from_records(scholarships)
+            self.source = "json"
+            # Compile the snapshot so the next worker maps it instead of parsing
+            try:
+                write_snapshot(columns, self.snapshot_path, signature)
+            except OSError as e:
+                print(f"⚠️ Could not write snapshot {self.snapshot_path}: {e}")
+        finished = time.perf_counter()
+        elapsed = finished - started
+
+        self._current = columns
+        self._signature = signature
+        self.last_columns_seconds = finished - columns_started
+        self.reload_count += 1
+        self.last_load_seconds = elapsed
+        self.total_load_seconds += elapsed
+        self.last_loaded_at = time.time()
+        print(f"📚 Loaded {len(columns)} scholarships from {self.source} ({self.path}) in {elapsed * 1000:.1f} ms")
+
+    def refresh(self, force: bool = False):
+        """Reload the catalog if the file's mtime/size changed since the last load"""
+        now = time.monotonic()
+        if not force and self._signature is not None and now - self._last_check < self.check_interval:
+            return
+
+        with self._lock:
+            if not force and self._signature is not None and now - self._last_check < self.check_interval:
+                return
+            self._last_check = now
+            self.check_count += 1
+            signature = self._file_signature()
+            if force or signature != self._signature:
+                self._load(signature)
+
+    @property
+    def scholarships(self) -> ColumnarCatalog:
+        """Current catalog; indexing a row returns its record dict (shared, treat as read-only)"""
+        self.refresh()
+        return self._current
+
+    def stats(self) -> Dict:
+        """Reload counters and timings"""
+        return {
+            "path": self.path,
+            "source": self.source,
+            "records": len(self._current),
+            "memory_kb": round(self._current.nbytes() / 1024, 1),
+            "reload_count": self.reload_count,
+            "check_count": self.check_count,
+            "last_load_ms": round(self.last_load_seconds * 1000, 2),
+            "last_columns_ms": round(self.last_columns_seconds * 1000, 2),
+            "total_load_ms": round(self.total_load_seconds * 1000, 2),
+            "last_loaded_at": self.last_loaded_at,
+        }
+
+
+_catalogs: Dict[str, ScholarshipCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_catalog(path: str = DEFAULT_CATALOG_PATH) -> ScholarshipCatalog:
+    """Return the process-wide catalog for a path, shared by every session"""
+    path = os.path.abspath(path)
+    catalog = _catalogs.get(path)
+    if catalog is None:
+        with _catalogs_lock:
+            catalog = _catalogs.get(path)
+            if catalog is None:
+                catalog = ScholarshipCatalog(path)
+                _catalogs[path] = catalog
+    return catalog
@@ -0,0 +1,280 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from typing import Dict, Iterable, List, Optional
+
+from columnar import profile_fields
+from eligibility import FAIL_CGPA, FAIL_DEGREE, FAIL_FIELD, FAIL_GENDER, FAIL_GPA
+from normalization import normalize_catalog
+from ranking import CHECKS_WEIGHT, DEGREE_FOCUS_WEIGHT, FIELD_FOCUS_WEIGHT, GENDER_MATCH_WEIGHT, REQUIREMENT_MET_WEIGHT
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scholarships.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scholarships (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    source TEXT NOT NULL DEFAULT 'catalog',
+    scholarship_name TEXT NOT NULL,
+    providing_body TEXT,
+    gender_eligibility TEXT NOT NULL DEFAULT 'All',
+    gpa_requirement TEXT,
+    min_gpa REAL,
+    min_cgpa REAL,
+    min_percentage REAL,
+    requirement_scale TEXT,
+    brief_description TEXT,
+    link TEXT,
+    deadline TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_scholarships_gender ON scholarships (gender_eligibility);
+CREATE INDEX IF NOT EXISTS idx_scholarships_min_gpa ON scholarships (min_gpa);
+CREATE INDEX IF NOT EXISTS idx_scholarships_min_cgpa ON scholarships (min_cgpa);
+CREATE INDEX IF NOT EXISTS idx_scholarships_name ON scholarships (scholarship_name);
+
+CREATE TABLE IF NOT EXISTS degree_levels (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS fields (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS disciplines (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+
+-- Link tables are keyed value-first so "which scholarships accept X" is an index range scan
+CREATE TABLE IF NOT EXISTS scholarship_degree_levels (
+    degree_level_id INTEGER NOT NULL REFERENCES degree_levels (id),
+    scholarship_rowid INTEGER NOT NULL REFERENCES scholarships (rowid) ON DELETE CASCADE,
+    position INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (degree_level_id, scholarship_rowid)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS scholarship_fields (
+    field_id INTEGER NOT NULL REFERENCES fields (id),
+    scholarship_rowid INTEGER NOT NULL REFERENCES scholarships (rowid) ON DELETE CASCADE,
+    position INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (field_id, scholarship_rowid)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS scholarship_disciplines (
+    discipline_id INTEGER NOT NULL REFERENCES disciplines (id),
+    scholarship_rowid INTEGER NOT NULL REFERENCES scholarships (rowid) ON DELETE CASCADE,
+    position INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (discipline_id, scholarship_rowid)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_degree_levels_by_scholarship ON scholarship_degree_levels (scholarship_rowid);
+CREATE INDEX IF NOT EXISTS idx_fields_by_scholarship ON scholarship_fields (scholarship_rowid);
+CREATE INDEX IF NOT EXISTS idx_disciplines_by_scholarship ON scholarship_disciplines (scholarship_rowid);
+
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+# (record key, lookup table, link table, link column)
+MULTI_VALUE_TABLES = [
+    ("degree_level", "degree_levels", "scholarship_degree_levels", "degree_level_id"),
+    ("field_of_study", "fields", "scholarship_fields", "field_id"),
+    ("engineering_discipline", "disciplines", "scholarship_disciplines", "discipline_id"),
+]
+SCALAR_COLUMNS = [
+    "id", "scholarship_name", "providing_body", "gender_eligibility", "gpa_requirement", "min_gpa",
+    "min_cgpa", "min_percentage", "requirement_scale", "brief_description", "link", "deadline",
+]
+
+# Failure bitmask computed in SQL, matching eligibility.evaluate()
+FAILURES_SQL = f"""
+    (CASE WHEN EXISTS (SELECT 1 FROM scholarship_degree_levels sd JOIN degree_levels d ON d.id = sd.degree_level_id
+                       WHERE d.name = :degree_level AND sd.scholarship_rowid = s.rowid) THEN 0 ELSE {FAIL_DEGREE} END)
+  | (CASE WHEN EXISTS (SELECT 1 FROM scholarship_fields sf JOIN fields f ON f.id = sf.field_id
+                       WHERE f.name = :field_of_study AND sf.scholarship_rowid = s.rowid) THEN 0 ELSE {FAIL_FIELD} END)
+  | (CASE WHEN s.gender_eligibility IN ('All', COALESCE(:gender, '')) THEN 0 ELSE {FAIL_GENDER} END)
+  | (CASE WHEN s.min_gpa IS NULL OR :gpa IS NULL OR s.min_gpa <= :gpa THEN 0 ELSE {FAIL_GPA} END)
+  | (CASE WHEN s.min_cgpa IS NULL OR :cgpa IS NULL OR s.min_cgpa <= :cgpa THEN 0 ELSE {FAIL_CGPA} END)
+"""
+
+# Eligible rows are found through the link-table indexes rather than by scanning every scholarship
+ELIGIBLE_WHERE = """
+    s.rowid IN (SELECT sd.scholarship_rowid FROM scholarship_degree_levels sd
+                JOIN degree_levels d ON d.id = sd.degree_level_id WHERE d.name = :degree_level)
+    AND s.rowid IN (SELECT sf.scholarship_rowid FROM scholarship_fields sf
+                    JOIN fields f ON f.id = sf.field_id WHERE f.name = :field_of_study)
+    AND s.gender_eligibility IN ('All', COALESCE(:gender, ''))
+    AND (s.min_gpa IS NULL OR :gpa IS NULL OR s.min_gpa <= :gpa)
+    AND (s.min_cgpa IS NULL OR :cgpa IS NULL OR s.min_cgpa <= :cgpa)
+"""
+
+# 0-100 match score of a row with its failure bitmask `failures`, matching ranking.match_scores()
+_APPLICABLE_SQL = "(3 + (s.min_gpa IS NOT NULL) + (s.min_cgpa IS NOT NULL))"
+_FAILED_SQL = " + ".join(f"((failures & {bit}) != 0)" for bit in (FAIL_DEGREE, FAIL_FIELD, FAIL_GENDER, FAIL_GPA, FAIL_CGPA))
+SCORE_SQL = f"""
+    {CHECKS_WEIGHT} * ({_APPLICABLE_SQL} - ({_FAILED_SQL})) / {_APPLICABLE_SQL}
+  + (CASE WHEN failures & {FAIL_FIELD} THEN 0 ELSE {FIELD_FOCUS_WEIGHT} / MAX(1,
+        (SELECT COUNT(*) FROM scholarship_fields sf WHERE sf.scholarship_rowid = s.rowid)) END)
+  + (CASE WHEN failures & {FAIL_DEGREE} THEN 0 ELSE {DEGREE_FOCUS_WEIGHT} / MAX(1,
+        (SELECT COUNT(*) FROM scholarship_degree_levels sd WHERE sd.scholarship_rowid = s.rowid)) END)
+  + (CASE WHEN s.gender_eligibility != 'All' AND NOT failures & {FAIL_GENDER} THEN {GENDER_MATCH_WEIGHT} ELSE 0 END)
+  + (CASE WHEN (:gpa IS NOT NULL AND s.min_gpa IS NOT NULL AND NOT failures & {FAIL_GPA})
+              OR (:cgpa IS NOT NULL AND s.min_cgpa IS NOT NULL AND NOT failures & {FAIL_CGPA})
+         THEN {REQUIREMENT_MET_WEIGHT} ELSE 0 END)
+"""
+
+ScholarshipPage = namedtuple("ScholarshipPage", ["rows", "failures", "total", "page", "page_size", "scores"])
+
+
+class SQLiteCatalogStore:
+    def __init__(self, path: str = DEFAULT_DB_PATH):
+        """Scholarship catalog in SQLite, queried per profile without loading every row"""
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self.query_count = 0
+        self.total_query_seconds = 0.0
+        self._connection().executescript(SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread; Streamlit runs each session's script on its own thread"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA foreign_keys=ON")
+            self._local.connection = connection
+        return connection
+
+    def _lookup_id(self, connection, table: str, name: str) -> int:
+        connection.execute(f"INSERT OR IGNORE INTO {table} (name) VALUES (?)", (name,))
+        return connection.execute(f"SELECT id FROM {table} WHERE name = ?", (name,)).fetchone()[0]
+
+    def upsert_scholarships(self, scholarships: Iterable[Dict], source: str = "catalog") -> int:
+        """Insert or replace records (normalized and validated first); returns how many were written"""
+        records, errors = normalize_catalog(list(scholarships))
+        if errors:
+            raise ValueError("Catalog validation failed:\n" + "\n".join(f"  - {error}" for error in errors))
+
+        placeholders = ", ".join("?" for _ in SCALAR_COLUMNS)
+        with self._write_lock:
+            connection = self._connection()
+            with connection:
+                for record in records:
+                    connection.execute("DELETE FROM scholarships WHERE id = ?", (record["id"],))
+                    cursor = connection.execute(
+                        f"INSERT INTO scholarships (source, {', '.join(SCALAR_COLUMNS)}) VALUES (?, {placeholders})",
+                        [source] + [record.get(column) for column in SCALAR_COLUMNS],
+                    )
+                    rowid = cursor.lastrowid
+                    for key, table, link_table, link_column in MULTI_VALUE_TABLES:
+                        for position, value in enumerate(record.get(key) or []):
+                            connection.execute(
+                                f"INSERT OR IGNORE INTO {link_table} ({link_column}, scholarship_rowid, position) VALUES (?, ?, ?)",
+                                (self._lookup_id(connection, table, value), rowid, position),
+                            )
+        return len(records)
+
+    def delete_scholarships(self, ids: Iterable[str]) -> int:
+        ids = list(ids)
+        with self._write_lock:
+            connection = self._connection()
+            with connection:
+                connection.executemany("DELETE FROM scholarships WHERE id = ?", [(i,) for i in ids])
+        return len(ids)
+
+    def sync_from_json(self, json_path: str) -> bool:
+        """Mirror a catalog JSON file into the database; a no-op when the file hasn't changed"""
+        stat = os.stat(json_path)
+        signature = json.dumps([os.path.abspath(json_path), stat.st_mtime_ns, stat.st_size])
+        row = self._connection().execute("SELECT value FROM meta WHERE key = 'json_signature'").fetchone()
+        if row is not None and row[0] == signature:
+            return False
+
+        with open(json_path, "r", encoding="utf-8") as f:
+            scholarships = json.load(f)
+        self.upsert_scholarships(scholarships, source="catalog")
+        current_ids = {record["id"] for record in normalize_catalog(scholarships)[0]}
+        stale = [
+            row[0] for row in self._connection().execute("SELECT id FROM scholarships WHERE source = 'catalog'")
+            if row[0] not in current_ids
+        ]
+        self.delete_scholarships(stale)
+        with self._write_lock:
+            connection = self._connection()
+            with connection:
+                connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('json_signature', ?)", (signature,))
+        return True
+
+    def _assemble(self, connection, rows: List[sqlite3.Row]) -> List[Dict]:
+        """Turn scholarship rows into catalog records, fetching their multi-valued fields in one query each"""
+        records = {row["rowid"]: {column: row[column] for column in SCALAR_COLUMNS} for row in rows}
+        if not records:
+            return []
+        marks = ", ".join("?" for _ in records)
+        for key, table, link_table, link_column in MULTI_VALUE_TABLES:
+            for record in records.values():
+                record[key] = []
+            for rowid, name in connection.execute(
+                f"SELECT l.scholarship_rowid, t.name FROM {link_table} l JOIN {table} t ON t.id = l.{link_column} "
+                f"WHERE l.scholarship_rowid IN ({marks}) ORDER BY l.position",
+                list(records),
+            ):
+                records[rowid][key].append(name)
+        return [records[row["rowid"]] for row in rows]
+
+    def query(self, profile, eligible: bool = True, page: int = 0, page_size: int = 20) -> ScholarshipPage:
+        """One page of eligible (or non-eligible) scholarships for a profile, best match first, with failure bitmasks"""
+        profile = profile_fields(profile)
+        params = {
+            "degree_level": profile["degree_level"],
+            "field_of_study": profile["field_of_study"],
+            "gender": profile.get("gender"),
+            "gpa": profile.get("gpa"),
+            "cgpa": profile.get("cgpa"),
+            "limit": page_size,
+            "offset": page * page_size,
+        }
+        where = ELIGIBLE_WHERE if eligible else f"NOT ({ELIGIBLE_WHERE})"
+
+        started = time.perf_counter()
+        connection = self._connection()
+        total = connection.execute(f"SELECT COUNT(*) FROM scholarships s WHERE {where}", params).fetchone()[0]
+        # Ties keep catalog (insertion) order, like ranking.RankedResults
+        rows = connection.execute(
+            f"SELECT s.*, {SCORE_SQL} AS score FROM "
+            f"(SELECT s.*, {FAILURES_SQL} AS failures FROM scholarships s WHERE {where}) s "
+            f"ORDER BY score DESC, s.rowid LIMIT :limit OFFSET :offset",
+            params,
+        ).fetchall()
+        records = self._assemble(connection, rows)
+        self.query_count += 1
+        self.total_query_seconds += time.perf_counter() - started
+
+        return ScholarshipPage(records, [row["failures"] for row in rows], total, page, page_size,
+                               [round(row["score"]) for row in rows])
+
+    def get(self, scholarship_id: str) -> Optional[Dict]:
+        connection = self._connection()
+        rows = connection.execute("SELECT * FROM scholarships WHERE id = ?", (scholarship_id,)).fetchall()
+        records = self._assemble(connection, rows)
+        return records[0] if records else None
+
+    def count(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM scholarships").fetchone()[0]
+
+    def stats(self) -> Dict:
+        return {
+            "path": self.path,
+            "records": self.count(),
+            "query_count": self.query_count,
+            "avg_query_ms": round(self.total_query_seconds / self.query_count * 1000, 2) if self.query_count else 0.0,
+        }
+
+
+_stores: Dict[str, SQLiteCatalogStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_catalog_store(path: str = DEFAULT_DB_PATH) -> SQLiteCatalogStore:
+    """Return the process-wide store for a database path"""
+    path = os.path.abspath(path)
+    store = _stores.get(path)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(path)
+            if store is None:
+                store = SQLiteCatalogStore(path)
+                _stores[path] = store
+    return store
@@ -0,0 +1,112 @@
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+DEFAULT_HISTORY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "chat_history")
+ROLE_LABELS = {"user": "🧑‍🎓 **You**", "assistant": "🎓 **Scholardeep**"}
+
+
+def render_markup(message: Dict) -> str:
+    """One archived message as a markdown block; computed once and stored with the message"""
+    label = ROLE_LABELS.get(message["role"], message["role"])
+    return f"{label}\n\n{message['content']}"
+
+
+def prune_archives(directory: str, max_age_seconds: float):
+    """Delete archives of sessions untouched for max_age_seconds"""
+    if not os.path.isdir(directory):
+        return
+    cutoff = time.time() - max_age_seconds
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if name.endswith(".jsonl") and os.path.getmtime(path) < cutoff:
+            os.remove(path)
+
+
+class ChatHistory:
+    def __init__(self, session_id: str, window: int = 20, page_size: int = 20,
+                 directory: Optional[str] = DEFAULT_HISTORY_DIR, max_cached_pages: int = 16):
+        """A session's chat messages: the newest window in memory, older ones appended to a JSONL archive.
+
+        Earlier messages are read back a page at a time by seeking to remembered line offsets, and
+        each page's joined markup is cached, so a rerun costs the same however long the chat gets.
+        Without a directory, messages leaving the window are dropped.
+        """
+        self.window = window
+        self.page_size = page_size
+        self.path = os.path.join(directory, f"{session_id}.jsonl") if directory else None
+        self.max_cached_pages = max_cached_pages
+
+        self.messages: List[Dict] = []
+        # Byte offset of every archived line, so a page is one seek and page_size readline()s
+        self._offsets: List[int] = []
+        self._end = 0
+        self._next_id = 0
+        # (page index, messages in it) -> joined markup; the last page keeps growing until full
+        self._pages: "OrderedDict[tuple, str]" = OrderedDict()
+        self.page_reads = 0
+
+        if self.path:
+            os.makedirs(directory, exist_ok=True)
+
+    def __len__(self):
+        return len(self._offsets) + len(self.messages)
+
+    @property
+    def archived(self) -> int:
+        return len(self._offsets)
+
+    def append(self, message: Dict) -> Dict:
+        """Add a message (given a stable "id"), archiving the oldest once the window is full"""
+        message["id"] = self._next_id
+        self._next_id += 1
+        self.messages.append(message)
+        if len(self.messages) > self.window:
+            self._archive(self.messages[:len(self.messages) - self.window])
+            del self.messages[:len(self.messages) - self.window]
+        return message
+
+    def _archive(self, messages: List[Dict]):
+        if not self.path:
+            return
+        with open(self.path, "ab") as f:
+            for message in messages:
+                # The UI-only cache-hit button state isn't worth keeping once a message scrolls out
+                record = {"id": message["id"], "role": message["role"], "content": message["content"],
+                          "markup": render_markup(message)}
+                line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+                self._offsets.append(self._end)
+                self._end += len(line)
+                f.write(line)
+
+    def pages(self) -> int:
+        """How many pages of archived messages there are"""
+        return -(-self.archived // self.page_size)
+
+    def _read(self, start: int, stop: int) -> List[Dict]:
+        with open(self.path, "rb") as f:
+            f.seek(self._offsets[start])
+            return [json.loads(f.readline()) for _ in range(start, stop)]
+
+    def page_markup(self, index: int) -> str:
+        """Joined markup of archived page index (0 = oldest); pages are fixed slices, so they cache"""
+        start = index * self.page_size
+        stop = min(start + self.page_size, self.archived)
+        key = (index, stop - start)
+        markup = self._pages.get(key)
+        if markup is None:
+            markup = "\n\n---\n\n".join(record["markup"] for record in self._read(start, stop))
+            self.page_reads += 1
+            self._pages[key] = markup
+            if len(self._pages) > self.max_cached_pages:
+                self._pages.popitem(last=False)
+        else:
+            self._pages.move_to_end(key)
+        return markup
+
+    def earlier(self, pages: int) -> List[str]:
+        """Markup of the newest `pages` archived pages, oldest first"""
+        total = self.pages()
+        return [self.page_markup(index) for index in range(max(0, total - pages), total)]
@@ -0,0 +1,229 @@
+import sys
+from dataclasses import asdict, is_dataclass
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+# String fields kept in the interned string table, as (record key, column name)
+STRING_FIELDS = [
+    ("id", "id"),
+    ("scholarship_name", "name"),
+    ("providing_body", "provider"),
+    ("link", "link"),
+    ("brief_description", "description"),
+    ("gpa_requirement", "requirement_text"),
+    ("deadline", "deadline"),
+]
+# Multi-valued categorical fields, as (record key, column name)
+MULTI_VALUE_FIELDS = [
+    ("degree_level", "degree_level"),
+    ("field_of_study", "field_of_study"),
+    ("engineering_discipline", "discipline"),
+]
+FLOOR_FIELDS = ["min_gpa", "min_cgpa", "min_percentage"]
+
+
+class StringTable:
+    def __init__(self, strings: Optional[List[str]] = None):
+        """Interned strings; columns store int32 codes into this table"""
+        self.strings: List[str] = list(strings or [])
+        self._codes: Dict[str, int] = {s: i for i, s in enumerate(self.strings)}
+
+    def intern(self, value) -> int:
+        """Code for value, adding it on first sight; -1 stands for None"""
+        if value is None:
+            return -1
+        value = str(value)
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.strings)
+            self.strings.append(value)
+            self._codes[value] = code
+        return code
+
+    def code(self, value: str) -> int:
+        """Existing code for value, or -1 if it never occurs"""
+        return self._codes.get(value, -1)
+
+    def get(self, code: int) -> Optional[str]:
+        return None if code < 0 else self.strings[code]
+
+    def __len__(self):
+        return len(self.strings)
+
+    def nbytes(self) -> int:
+        return sum(sys.getsizeof(s) for s in self.strings)
+
+
+class MappedStringTable:
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray):
+        """Read-only string table over a UTF-8 blob (e.g. a memory-mapped snapshot); decodes on access"""
+        self.blob = blob
+        self.offsets = offsets
+
+    def get(self, code: int) -> Optional[str]:
+        if code < 0:
+            return None
+        return self.blob[self.offsets[code]:self.offsets[code + 1]].tobytes().decode("utf-8")
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def nbytes(self) -> int:
+        return self.blob.nbytes + self.offsets.nbytes
+
+
+class MultiValueColumn:
+    def __init__(self, vocabulary: StringTable, offsets: np.ndarray, codes: np.ndarray,
+                 postings: Optional[np.ndarray] = None, posting_offsets: Optional[np.ndarray] = None):
+        """Ragged categorical column: row i holds codes[offsets[i]:offsets[i + 1]]"""
+        self.vocabulary = vocabulary
+        self.offsets = offsets
+        self.codes = codes
+        # Inverted index: the rows listing value code c are postings[posting_offsets[c]:posting_offsets[c + 1]]
+        if postings is None or posting_offsets is None:
+            postings, posting_offsets = self._build_postings()
+        self.postings = postings
+        self.posting_offsets = posting_offsets
+
+    def _build_postings(self):
+        """Entries grouped by value with one stable argsort, so each value's rows stay in row order"""
+        rows = np.repeat(np.arange(len(self.offsets) - 1, dtype=np.int32), np.diff(self.offsets))
+        order = np.argsort(self.codes, kind="stable")
+        posting_offsets = np.zeros(len(self.vocabulary) + 1, dtype=np.int32)
+        np.cumsum(np.bincount(self.codes, minlength=len(self.vocabulary)), out=posting_offsets[1:])
+        return rows[order], posting_offsets
+
+    @classmethod
+    def build(cls, values_per_row: List[List[str]]) -> "MultiValueColumn":
+        vocabulary = StringTable()
+        offsets = np.zeros(len(values_per_row) + 1, dtype=np.int32)
+        codes = []
+        for row, values in enumerate(values_per_row):
+            codes.extend(vocabulary.intern(value) for value in values)
+            offsets[row + 1] = len(codes)
+        return cls(vocabulary, offsets, np.asarray(codes, dtype=np.int16 if len(vocabulary) < 2 ** 15 else np.int32))
+
+    def rows_with(self, value: str) -> np.ndarray:
+        """Rows that list value, ascending; a slice of the postings, not a scan"""
+        code = self.vocabulary.code(value)
+        if code < 0:
+            return self.postings[:0]
+        return self.postings[self.posting_offsets[code]:self.posting_offsets[code + 1]]
+
+    def contains(self, value: str) -> np.ndarray:
+        """Boolean mask of rows that list value"""
+        mask = np.zeros(len(self.offsets) - 1, dtype=bool)
+        mask[self.rows_with(value)] = True
+        return mask
+
+    def values(self, row: int) -> List[str]:
+        return [self.vocabulary.strings[c] for c in self.codes[self.offsets[row]:self.offsets[row + 1]]]
+
+    def nbytes(self) -> int:
+        return (self.offsets.nbytes + self.codes.nbytes + self.postings.nbytes + self.posting_offsets.nbytes
+                + self.vocabulary.nbytes())
+
+
+def profile_fields(profile) -> Dict:
+    """Accept the sidebar profile dict or a models.StudentProfile"""
+    if is_dataclass(profile):
+        return asdict(profile)
+    return profile
+
+
+class ColumnarCatalog:
+    def __init__(self, size: int, strings: StringTable, string_columns: Dict[str, np.ndarray],
+                 multi_columns: Dict[str, MultiValueColumn], gender_vocabulary: StringTable,
+                 gender_codes: np.ndarray, floors: Dict[str, np.ndarray], scales: StringTable,
+                 scale_codes: np.ndarray):
+        """Scholarship catalog stored column-wise in NumPy arrays"""
+        self.size = size
+        self.strings = strings
+        self.string_columns = string_columns
+        self.multi_columns = multi_columns
+        self.gender_vocabulary = gender_vocabulary
+        self.gender_codes = gender_codes
+        # float32 floors with NaN where a scholarship states no numeric minimum
+        self.floors = floors
+        self.scales = scales
+        self.scale_codes = scale_codes
+
+    @classmethod
+    def from_records(cls, scholarships: List[Dict]) -> "ColumnarCatalog":
+        """Build the columns from normalized records (see normalization.py)"""
+        size = len(scholarships)
+        strings = StringTable()
+        string_columns = {
+            column: np.fromiter((strings.intern(s.get(key)) for s in scholarships), dtype=np.int32, count=size)
+            for key, column in STRING_FIELDS
+        }
+        multi_columns = {
+            column: MultiValueColumn.build([s.get(key) or [] for s in scholarships])
+            for key, column in MULTI_VALUE_FIELDS
+        }
+        gender_vocabulary = StringTable(["All"])
+        gender_codes = np.fromiter(
+            (gender_vocabulary.intern(s.get('gender_eligibility', "All")) for s in scholarships), dtype=np.int8, count=size
+        )
+        floors = {
+            key: np.array([np.nan if s.get(key) is None else s[key] for s in scholarships], dtype=np.float32)
+            for key in FLOOR_FIELDS
+        }
+        scales = StringTable()
+        scale_codes = np.fromiter((scales.intern(s.get('requirement_scale')) for s in scholarships), dtype=np.int8, count=size)
+        return cls(size, strings, string_columns, multi_columns, gender_vocabulary, gender_codes, floors, scales, scale_codes)
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, row: int) -> Dict:
+        return self.row(row)
+
+    def __iter__(self) -> Iterator[Dict]:
+        for row in range(self.size):
+            yield self.row(row)
+
+    def row(self, row: int) -> Dict:
+        """Rebuild the record dict that app.py renders; only done for rows being shown"""
+        record = {key: self.strings.get(int(self.string_columns[column][row])) for key, column in STRING_FIELDS}
+        for key, column in MULTI_VALUE_FIELDS:
+            record[key] = self.multi_columns[column].values(row)
+        record['gender_eligibility'] = self.gender_vocabulary.strings[self.gender_codes[row]]
+        for key in FLOOR_FIELDS:
+            value = self.floors[key][row]
+            record[key] = None if np.isnan(value) else round(float(value), 2)
+        record['requirement_scale'] = self.scales.get(int(self.scale_codes[row]))
+        return record
+
+    # Vectorized masks used by eligibility.evaluate()
+
+    def degree_mask(self, degree_level: str) -> np.ndarray:
+        return self.multi_columns['degree_level'].contains(degree_level)
+
+    def field_mask(self, field_of_study: str) -> np.ndarray:
+        return self.multi_columns['field_of_study'].contains(field_of_study)
+
+    def gender_mask(self, gender: str) -> np.ndarray:
+        """Rows open to all genders plus those restricted to this one"""
+        allowed = self.gender_codes == self.gender_vocabulary.code("All")
+        code = self.gender_vocabulary.code(gender)
+        if code >= 0:
+            allowed |= self.gender_codes == code
+        return allowed
+
+    def floor_mask(self, key: str, score: Optional[float]) -> np.ndarray:
+        """Rows whose minimum is met by score; NaN floors (no minimum) always pass"""
+        floors = self.floors[key]
+        if score is None:
+            return np.ones(self.size, dtype=bool)
+        # Compare in float32 so a floor of 3.2 isn't failed by a score of exactly 3.2
+        return ~(floors > np.float32(score))
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the columns and string tables"""
+        total = self.strings.nbytes() + self.gender_codes.nbytes + self.scale_codes.nbytes
+        total += sum(column.nbytes for column in self.string_columns.values())
+        total += sum(column.nbytes() for column in self.multi_columns.values())
+        total += sum(column.nbytes for column in self.floors.values())
+        return total
@@ -0,0 +1,102 @@
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from columnar import ColumnarCatalog, profile_fields
+from normalization import SCALE_PERCENTAGE, numeric_requirement
+
+# Failure bits, one per eligibility check
+FAIL_DEGREE = 1
+FAIL_FIELD = 2
+FAIL_GENDER = 4
+FAIL_GPA = 8
+FAIL_CGPA = 16
+
+
+class EligibilityResult:
+    def __init__(self, scholarships: ColumnarCatalog, profile: Dict, failures: np.ndarray):
+        """Per-record failure bitmasks for one profile; 0 means eligible"""
+        self.scholarships = scholarships
+        self.profile = profile
+        self.failures = failures
+        self.eligible_ids = np.flatnonzero(failures == 0)
+        self.ineligible_ids = np.flatnonzero(failures)
+
+    def eligible(self) -> List[Dict]:
+        return [self.scholarships[i] for i in self.eligible_ids]
+
+    def ineligible(self) -> List[Dict]:
+        return [self.scholarships[i] for i in self.ineligible_ids]
+
+    def is_eligible(self, record_id: int) -> bool:
+        return not self.failures[record_id]
+
+    def criteria(self, record_id: int) -> List[Tuple[bool, str]]:
+        """(passed, explanation) for every check that applies to the record"""
+        return explain(self.scholarships[record_id], self.profile, int(self.failures[record_id]))
+
+    def reasons(self, record_id: int) -> List[str]:
+        """Why the profile is not eligible for the record"""
+        return [text for passed, text in self.criteria(record_id) if not passed]
+
+    def matches(self, record_id: int) -> List[str]:
+        """Which requirements the profile satisfies for the record"""
+        return [text for passed, text in self.criteria(record_id) if passed]
+
+
+def explain(scholarship: Dict, profile: Dict, mask: int) -> List[Tuple[bool, str]]:
+    """(passed, explanation) lines for a record given its failure bitmask"""
+    lines = []
+
+    if mask & FAIL_DEGREE:
+        lines.append((False, f"Your degree level ({profile['degree_level']}) doesn't match the required level ({', '.join(scholarship['degree_level'])})"))
+    else:
+        lines.append((True, f"Your degree level ({profile['degree_level']}) matches the required level"))
+
+    if mask & FAIL_FIELD:
+        lines.append((False, f"Your field of study ({profile['field_of_study']}) doesn't match the required fields ({', '.join(scholarship['field_of_study'])})"))
+    else:
+        lines.append((True, f"Your field of study ({profile['field_of_study']}) matches the required fields"))
+
+    if mask & FAIL_GENDER:
+        lines.append((False, f"This scholarship is only available for {scholarship['gender_eligibility']} students"))
+    elif scholarship.get('gender_eligibility', "All") == "All":
+        lines.append((True, "This scholarship is available for all genders"))
+    else:
+        lines.append((True, f"Your gender ({profile['gender']}) matches the eligibility requirement"))
+
+    gpa_requirement = numeric_requirement(scholarship.get('min_gpa'))
+    if gpa_requirement is not None:
+        if mask & FAIL_GPA:
+            lines.append((False, f"Your GPA ({profile['gpa']}) is below the minimum requirement ({gpa_requirement})"))
+        else:
+            lines.append((True, f"Your GPA ({profile['gpa']}) meets the minimum requirement ({gpa_requirement})"))
+
+    cgpa_requirement = numeric_requirement(scholarship.get('min_cgpa'))
+    if cgpa_requirement is not None:
+        if scholarship.get('requirement_scale') == SCALE_PERCENTAGE:
+            cgpa_requirement = f"{cgpa_requirement}, from {scholarship['min_percentage']:g}% marks"
+        if mask & FAIL_CGPA:
+            lines.append((False, f"Your CGPA ({profile['cgpa']}) is below the minimum requirement ({cgpa_requirement})"))
+        else:
+            lines.append((True, f"Your CGPA ({profile['cgpa']}) meets the minimum requirement ({cgpa_requirement})"))
+
+    return lines
+
+
+def evaluate(scholarships: ColumnarCatalog, profile) -> EligibilityResult:
+    """Run every eligibility check once over the whole catalog as vectorized masks"""
+    profile = profile_fields(profile)
+    checks = (
+        (FAIL_DEGREE, scholarships.degree_mask(profile['degree_level'])),
+        (FAIL_FIELD, scholarships.field_mask(profile['field_of_study'])),
+        (FAIL_GENDER, scholarships.gender_mask(profile.get('gender'))),
+        (FAIL_GPA, scholarships.floor_mask('min_gpa', profile.get('gpa'))),
+        (FAIL_CGPA, scholarships.floor_mask('min_cgpa', profile.get('cgpa'))),
+    )
+
+    failures = np.zeros(len(scholarships), dtype=np.uint8)
+    for flag, passing in checks:
+        failures[~passing] |= flag
+
+    return EligibilityResult(scholarships, profile, failures)
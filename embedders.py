@@ -0,0 +1,148 @@
+import math
+import os
+import zlib
+from collections import Counter
+from typing import Dict, List
+
+import numpy as np
+
+from retrieval import QUERY_STOPWORDS, analyze
+
+
+def _features(text: str, bigrams: bool = True, stopwords=QUERY_STOPWORDS) -> List[str]:
+    """Content words plus adjacent-word bigrams"""
+    words = [w for w in analyze(text) if w not in stopwords]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])] if bigrams else words
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32)
+
+
+class HashingEmbedder:
+    name = "hashing"
+    needs_fit = False
+
+    def __init__(self, dim: int = 512, bigrams: bool = True, stopwords=QUERY_STOPWORDS):
+        """Signed feature hashing of words and bigrams; stateless, so vectors never go stale"""
+        self.dim = dim
+        self.bigrams = bigrams
+        self.stopwords = stopwords
+
+    def config(self) -> Dict:
+        return {"name": self.name, "dim": self.dim, "bigrams": self.bigrams}
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for feature, count in Counter(_features(text, self.bigrams, self.stopwords)).items():
+                digest = zlib.crc32(feature.encode("utf-8"))
+                sign = 1.0 if digest & 0x80000000 else -1.0
+                vectors[i, digest % self.dim] += sign * (1 + math.log(count))
+        return _normalize(vectors)
+
+    def state(self) -> Dict[str, np.ndarray]:
+        return {}
+
+    def load_state(self, state: Dict[str, np.ndarray]):
+        pass
+
+
+class TfidfSvdEmbedder:
+    name = "tfidf-svd"
+    needs_fit = True
+
+    def __init__(self, dim: int = 64):
+        """TF-IDF projected onto its top singular vectors (LSA), so related words land close together.
+
+        Fitted once on the catalog; rows added later are projected onto the same basis.
+        """
+        self.dim = dim
+        self.vocabulary: Dict[str, int] = {}
+        self.idf = np.zeros(0, dtype=np.float32)
+        self.components = np.zeros((0, 0), dtype=np.float32)
+
+    @property
+    def fitted(self) -> bool:
+        return bool(self.vocabulary)
+
+    def config(self) -> Dict:
+        return {"name": self.name, "dim": self.dim}
+
+    def _tfidf(self, texts: List[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), len(self.vocabulary)), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for feature, count in Counter(_features(text)).items():
+                column = self.vocabulary.get(feature)
+                if column is not None:
+                    matrix[i, column] = (1 + math.log(count)) * self.idf[column]
+        return _normalize(matrix)
+
+    def fit(self, texts: List[str]):
+        document_frequency = Counter(feature for text in texts for feature in set(_features(text)))
+        self.vocabulary = {feature: i for i, feature in enumerate(sorted(document_frequency))}
+        self.idf = np.array([math.log((1 + len(texts)) / (1 + document_frequency[f])) + 1
+                             for f in sorted(document_frequency)], dtype=np.float32)
+        _, _, vt = np.linalg.svd(self._tfidf(texts), full_matrices=False)
+        # Never more components than the catalog has rank; vectors are zero-padded up to dim
+        self.components = vt[:self.dim].astype(np.float32)
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        if not self.fitted:
+            raise RuntimeError("TfidfSvdEmbedder.fit() must be called before embed()")
+        projected = self._tfidf(texts) @ self.components.T
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        vectors[:, :projected.shape[1]] = projected
+        return _normalize(vectors)
+
+    def state(self) -> Dict[str, np.ndarray]:
+        return {
+            "vocabulary": np.array(sorted(self.vocabulary, key=self.vocabulary.get)),
+            "idf": self.idf,
+            "components": self.components,
+        }
+
+    def load_state(self, state: Dict[str, np.ndarray]):
+        self.vocabulary = {str(feature): i for i, feature in enumerate(state["vocabulary"])}
+        self.idf = state["idf"]
+        self.components = state["components"]
+
+
+class SentenceTransformerEmbedder:
+    name = "sentence-transformers"
+    needs_fit = False
+
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+        """Pretrained sentence embeddings; downloads the model on first use"""
+        from sentence_transformers import SentenceTransformer
+
+        self.model_name = model_name
+        self.model = SentenceTransformer(model_name)
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def config(self) -> Dict:
+        return {"name": self.name, "model": self.model_name, "dim": self.dim}
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        return np.asarray(self.model.encode(texts, normalize_embeddings=True), dtype=np.float32)
+
+    def state(self) -> Dict[str, np.ndarray]:
+        return {}
+
+    def load_state(self, state: Dict[str, np.ndarray]):
+        pass
+
+
+def create_embedder(name: str = None):
+    """VECTOR_EMBEDDER picks the embedder: tfidf-svd (default), hashing or sentence-transformers"""
+    name = (name or os.getenv("VECTOR_EMBEDDER", "tfidf-svd")).lower()
+    if name == "hashing":
+        return HashingEmbedder(dim=int(os.getenv("VECTOR_DIM", 512)))
+    if name == "sentence-transformers":
+        try:
+            return SentenceTransformerEmbedder(os.getenv("VECTOR_MODEL", "all-MiniLM-L6-v2"))
+        except ImportError:
+            print("⚠️ sentence-transformers is not installed; using the offline tfidf-svd embedder")
+    return TfidfSvdEmbedder(dim=int(os.getenv("VECTOR_DIM", 64)))
@@ -0,0 +1,90 @@
+import asyncio
+import re
+import time
+from typing import Any, AsyncIterator, Callable, Iterator, List, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+DEFAULT_RESPONSE = """## 🎯 Scholarship Recommendations
+
+### 1. Example Merit Scholarship
+- **Provider:** Example Foundation
+- **Amount:** $5,000
+- **Eligibility:** Strong academic record in your field
+- **Deadline:** Various
+- **Match Score:** 8/10
+- **Why Perfect for You:** Matches your field of study and degree level
+
+This is a canned answer from the local fake LLM (SCHOLARSHIP_FAKE_LLM=1)."""
+
+
+class FakeStreamingLLM(BaseChatModel):
+    """Offline stand-in for Gemini: cycles through canned responses and streams them word by word"""
+
+    responses: List[str] = [DEFAULT_RESPONSE]
+    # Simulated latency: time to first token, then per streamed chunk
+    first_token_delay: float = 0.0
+    token_delay: float = 0.0
+    # Optional latency distribution: called once per request for its time to first token
+    latency_sampler: Optional[Callable[[], float]] = None
+    call_count: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-streaming"
+
+    def _next_response(self) -> str:
+        response = self.responses[self.call_count % len(self.responses)]
+        self.call_count += 1
+        return response
+
+    def _first_token_wait(self) -> float:
+        return self.latency_sampler() if self.latency_sampler else self.first_token_delay
+
+    def _tokens(self) -> List[str]:
+        # Split after whitespace so the chunks concatenate back to the exact response
+        return re.findall(r"\S+\s*|\s+", self._next_response())
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        time.sleep(self._first_token_wait())
+        message = AIMessage(content=self._next_response())
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self._first_token_wait())
+        for index, token in enumerate(self._tokens()):
+            if index:
+                time.sleep(self.token_delay)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Optional[AsyncCallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        # asyncio.sleep, so a hedged request that loses the race really is cancelled
+        await asyncio.sleep(self._first_token_wait())
+        message = AIMessage(content=self._next_response())
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                       run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+                       **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self._first_token_wait())
+        for index, token in enumerate(self._tokens()):
+            if index:
+                await asyncio.sleep(self.token_delay)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                await run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+    def get_num_tokens(self, text: str) -> int:
+        """Whitespace token count, so health probes need no tokenizer download"""
+        time.sleep(self.first_token_delay)
+        return len(text.split())
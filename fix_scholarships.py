@@ -1,28 +1,49 @@
 import json
+import os
+import sys
+
+from catalog import DEFAULT_CATALOG_PATH
+from normalization import normalize_catalog, parse_requirement
+from snapshot import build_snapshot, snapshot_path_for
+from materialize import build_materialized, materialized_path_for
 
 def convert_gpa_cgpa(value):
-    try:
-        # Attempt to convert to float
-        return float(value)
-    except (ValueError, TypeError):
-        # If conversion fails, return a default or handle as needed
-        # For now, let's return None or a specific default if it's not a number
-        return None # Or a sensible default like 0.0 or 1.0
+    """Numeric floor of a requirement on its own scale, or None if the text has none"""
+    parsed = parse_requirement(value)
+    if parsed['min_gpa'] is not None:
+        return parsed['min_gpa']
+    return parsed['min_cgpa']
+
+def write_catalog(scholarships, output_path):
+    """Write atomically so a running app never reads a half-written catalog"""
+    tmp_path = output_path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(scholarships, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, output_path)
 
-def fix_scholarships_json(file_path):
-    with open(file_path, 'r') as f:
+def fix_scholarships_json(file_path, output_path=None):
+    """Ingest stage: parse requirement text into numeric floors, validate, and write the catalog"""
+    with open(file_path, 'r', encoding='utf-8') as f:
         scholarships = json.load(f)
 
-    for scholarship in scholarships:
-        if 'gpa_requirement' in scholarship and isinstance(scholarship['gpa_requirement'], str):
-            scholarship['gpa_requirement'] = convert_gpa_cgpa(scholarship['gpa_requirement'])
-        if 'cgpa_requirement' in scholarship and isinstance(scholarship['cgpa_requirement'], str):
-            scholarship['cgpa_requirement'] = convert_gpa_cgpa(scholarship['cgpa_requirement'])
+    normalized, errors = normalize_catalog(scholarships)
+    if errors:
+        raise ValueError("Catalog validation failed:\n" + "\n".join(f"  - {error}" for error in errors))
 
-    with open(file_path, 'w') as f:
-        json.dump(scholarships, f, indent=2)
+    output_path = output_path or file_path
+    write_catalog(normalized, output_path)
+    # Compile the memory-mappable snapshot the app starts from
+    build_snapshot(output_path)
+    # Precompute every sidebar profile bucket and verify it against the live filter
+    _, mismatches = build_materialized(output_path)
+    if mismatches:
+        raise ValueError("Materialized results disagree with the live filter:\n" + "\n".join(f"  - {m}" for m in mismatches[:20]))
+    return normalized
 
 if __name__ == "__main__":
-    json_file_path = "/Users/rdxhimadri/Desktop/AI SF/scholarships.json"
-    fix_scholarships_json(json_file_path)
-    print(f"Processed {json_file_path} to convert GPA/CGPA requirements.")
\ No newline at end of file
+    json_file_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_CATALOG_PATH
+    scholarships = fix_scholarships_json(json_file_path)
+    with_floor = sum(1 for s in scholarships if s['requirement_scale'])
+    print(f"Processed {json_file_path}: {len(scholarships)} scholarships, {with_floor} with numeric GPA/CGPA floors.")
+    print(f"Snapshot: {snapshot_path_for(json_file_path)}")
+    print(f"Materialized results: {materialized_path_for(json_file_path)}")
@@ -0,0 +1,184 @@
+import asyncio
+import os
+import queue
+import threading
+import time
+from collections import defaultdict, deque
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterator, Optional
+
+
+def hedging_enabled() -> bool:
+    """LLM_HEDGING=1 turns hedged requests on"""
+    return os.getenv("LLM_HEDGING", "").lower() in ("1", "true", "yes")
+
+
+class LatencyTracker:
+    def __init__(self, window: int = 500, min_samples: int = 20):
+        """Recent latencies per call type, for online percentile estimates"""
+        self.window = window
+        self.min_samples = min_samples
+        self._samples = defaultdict(lambda: deque(maxlen=self.window))
+        self._lock = threading.Lock()
+
+    def record(self, key: str, seconds: float):
+        with self._lock:
+            self._samples[key].append(seconds)
+
+    def percentile(self, key: str, percentile: float) -> Optional[float]:
+        """None until min_samples latencies have been seen for key"""
+        with self._lock:
+            samples = sorted(self._samples[key])
+        if len(samples) < self.min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * percentile / 100))]
+
+
+class Hedger:
+    def __init__(self, percentile: float = 95.0, max_hedge_rate: float = 0.05, min_delay: float = 0.05,
+                 tracker: Optional[LatencyTracker] = None):
+        """Fires a second identical request when the first is slower than the call type's latency percentile.
+
+        The first answer wins and the other request is cancelled. At most max_hedge_rate of calls
+        are hedged, so a slow upstream can't double our quota use.
+        """
+        self.percentile = percentile
+        self.max_hedge_rate = max_hedge_rate
+        self.min_delay = min_delay
+        self.tracker = tracker or LatencyTracker()
+        self._counters = defaultdict(lambda: defaultdict(int))
+        self._lock = threading.Lock()
+
+        # One long-lived event loop, so async LLM clients stay bound to a single loop
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, name="hedging-loop", daemon=True).start()
+
+    def _count(self, call_type: str, name: str, amount: int = 1):
+        with self._lock:
+            self._counters[call_type][name] += amount
+
+    def hedge_delay(self, key: str) -> Optional[float]:
+        """Time to wait before hedging; None while there are too few samples to know the tail"""
+        threshold = self.tracker.percentile(key, self.percentile)
+        return None if threshold is None else max(threshold, self.min_delay)
+
+    def _take_hedge(self, call_type: str) -> bool:
+        """Reserve a hedge if the call type is still under its hedge-rate cap"""
+        with self._lock:
+            counts = self._counters[call_type]
+            if counts["hedged"] + 1 > self.max_hedge_rate * counts["calls"]:
+                counts["hedges_capped"] += 1
+                return False
+            counts["hedged"] += 1
+            return True
+
+    async def _timed(self, key: str, awaitable: Awaitable):
+        started = time.perf_counter()
+        result = await awaitable
+        self.tracker.record(key, time.perf_counter() - started)
+        return result
+
+    async def _race(self, start: Callable[[], Awaitable], key: str, call_type: str):
+        """Await start(), adding one hedged duplicate past the percentile delay.
+
+        Returns (index, task) of the first success: index 0 is the original request, 1 the hedge.
+        """
+        self._count(call_type, "calls")
+        tasks = [asyncio.ensure_future(self._timed(key, start()))]
+        delay = self.hedge_delay(key)
+        if delay is not None:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done and self._take_hedge(call_type):
+                tasks.append(asyncio.ensure_future(self._timed(key, start())))
+
+        error = None
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not tasks[0]:
+                            self._count(call_type, "hedge_wins")
+                        return tasks.index(task), task
+                    error = error or task.exception()
+            raise error
+        finally:
+            # Cancel the loser and let the cancellation land before returning
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    def invoke(self, start: Callable[[], Awaitable], call_type: str = "default"):
+        """Blocking hedged call; start() returns a fresh awaitable request, e.g. lambda: llm.ainvoke(prompt)"""
+        async def run():
+            _, task = await self._race(start, call_type, call_type)
+            return task.result()
+
+        return asyncio.run_coroutine_threadsafe(run(), self._loop).result()
+
+    def stream(self, start: Callable[[], AsyncIterator], call_type: str = "default") -> Iterator:
+        """Hedged stream, e.g. lambda: llm.astream(prompt); the race is on time to first chunk"""
+        chunks = queue.Queue()
+
+        async def run():
+            streams = []
+
+            def first_chunk():
+                stream = start()
+                streams.append(stream)
+                return stream.__anext__()
+
+            try:
+                index, task = await self._race(first_chunk, f"{call_type}:first_chunk", call_type)
+                chunks.put(("chunk", task.result()))
+                async for chunk in streams[index]:
+                    chunks.put(("chunk", chunk))
+                chunks.put(("done", None))
+            except StopAsyncIteration:
+                chunks.put(("done", None))
+            except BaseException as e:
+                chunks.put(("error", e))
+                raise
+            finally:
+                for stream in streams:
+                    try:
+                        await stream.aclose()
+                    except Exception:
+                        pass
+
+        future = asyncio.run_coroutine_threadsafe(run(), self._loop)
+        try:
+            while True:
+                kind, value = chunks.get()
+                if kind == "error":
+                    raise value
+                if kind == "done":
+                    return
+                yield value
+        finally:
+            # The reader stopped early (or finished): stop the upstream stream too
+            future.cancel()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counters = {call_type: dict(counts) for call_type, counts in self._counters.items()}
+        for call_type, counts in counters.items():
+            counts["hedge_rate"] = round(counts.get("hedged", 0) / counts["calls"], 3) if counts.get("calls") else 0.0
+        return counters
+
+
+_hedger: Optional[Hedger] = None
+_hedger_lock = threading.Lock()
+
+
+def get_hedger() -> Hedger:
+    """Process-wide hedger, so latency percentiles and the hedge-rate cap cover every session"""
+    global _hedger
+    if _hedger is None:
+        with _hedger_lock:
+            if _hedger is None:
+                _hedger = Hedger(
+                    percentile=float(os.getenv("LLM_HEDGE_PERCENTILE", 95)),
+                    max_hedge_rate=float(os.getenv("LLM_HEDGE_MAX_RATE", 0.05)),
+                )
+    return _hedger
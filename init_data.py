@@ -1,10 +1,13 @@
 import pandas as pd
 from datetime import datetime, timedelta
+import hashlib
 import json
 import requests
 from bs4 import BeautifulSoup
 import time
 import random
+from catalog_db import get_catalog_store
+from vector_index import get_catalog_vectors
 
 def scrape_scholarships_from_web():
     """Internet से real scholarship data scrape करें"""
@@ -64,6 +67,10 @@ def scrape_scholarships_from_web():
     print(f"✅ {len(scholarships)} scholarships generate किए गए।")
     return scholarships
 
+def url_scholarship_id(url):
+    """URL से stable id बनाएं (hash() हर process में बदलता है, sha1 नहीं)"""
+    return "GOOGLE_" + hashlib.sha1(url.strip().rstrip('/').lower().encode("utf-8")).hexdigest()[:12]
+
 def fetch_google_search_scholarships():
     """Google Custom Search API से scholarships fetch करें"""
     try:
@@ -100,7 +107,7 @@ def fetch_google_search_scholarships():
             
             for i, result in enumerate(results[:5]):  # Top 5 from each query
                 scholarship = {
-                    "id": f"GOOGLE_{hash(result['url']) % 10000}",
+                    "id": url_scholarship_id(result['url']),
                     "title": result['title'],
                     "provider": result.get('provider', 'Various'),
                     "description": result['description'],
@@ -172,16 +179,48 @@ def create_comprehensive_scholarship_database():
     
     all_scholarships.extend(popular_scholarships)
     
-    # Remove duplicates based on title
+    # Remove duplicates based on title (and id: same URL from two queries)
     seen_titles = set()
+    seen_ids = set()
     unique_scholarships = []
     for scholarship in all_scholarships:
-        if scholarship['title'] not in seen_titles:
+        if scholarship['title'] not in seen_titles and scholarship['id'] not in seen_ids:
             seen_titles.add(scholarship['title'])
+            seen_ids.add(scholarship['id'])
             unique_scholarships.append(scholarship)
     
     return unique_scholarships
 
+def to_catalog_record(scholarship):
+    """Scraped/generated rows का shape app catalog (scholarships.json) जैसा बनाएं"""
+    degree_level = scholarship.get('degree_level', [])
+    return {
+        "id": scholarship['id'],
+        "scholarship_name": scholarship['title'],
+        "providing_body": scholarship.get('provider', 'Various'),
+        "degree_level": [degree_level] if isinstance(degree_level, str) else degree_level,
+        "field_of_study": scholarship.get('field_of_study', []),
+        "engineering_discipline": [],
+        "gender_eligibility": "All",
+        "gpa_requirement": scholarship.get('gpa_requirement'),
+        "brief_description": scholarship.get('description', ''),
+        "link": scholarship.get('application_url', ''),
+        "deadline": scholarship.get('deadline'),
+    }
+
+def save_to_catalog_db(scholarships):
+    """SQLite catalog में upsert करें ताकि app paged queries चला सके"""
+    store = get_catalog_store()
+    written = store.upsert_scholarships([to_catalog_record(s) for s in scholarships], source="init_data")
+    return store.path, written
+
+def save_to_vector_index(scholarships):
+    """Vector index में सिर्फ़ नए/बदले rows embed करें और हटाए गए rows निकालें (पूरा rebuild नहीं)"""
+    index = get_catalog_vectors().synced()
+    embedded, removed = index.sync([to_catalog_record(s) for s in scholarships], source="init_data")
+    index.save()
+    return index.path, embedded, removed
+
 def save_scholarship_data():
     """Scholarship data को save करें"""
     scholarships = create_comprehensive_scholarship_database()
@@ -194,9 +233,17 @@ def save_scholarship_data():
     df = pd.DataFrame(scholarships)
     df.to_csv('scholarships_database.csv', index=False)
     
+    # SQLite catalog backend
+    db_path, _ = save_to_catalog_db(scholarships)
+    
+    # "Find scholarships like X" search
+    vector_path, embedded, removed = save_to_vector_index(scholarships)
+    
     print(f"💾 {len(scholarships)} scholarships saved to:")
     print("  - sample_scholarships.json")
     print("  - scholarships_database.csv")
+    print(f"  - {db_path}")
+    print(f"  - {vector_path} ({embedded} embedded, {removed} removed)")
     
     return scholarships
 
@@ -0,0 +1,290 @@
+import math
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from columnar import ColumnarCatalog
+from metrics import get_timings
+from retrieval import CatalogRetriever, extract_facets, get_retriever
+from vector_index import CatalogVectors, get_catalog_vectors
+
+GUIDANCE = "guidance"
+ELIGIBILITY = "eligibility"
+CATALOG = "catalog"
+SIMILAR = "similar"
+OPEN = "open"
+
+# A few phrasings per intent; questions are matched to the nearest one by TF-IDF cosine
+INTENT_EXAMPLES = {
+    GUIDANCE: [
+        "how do I apply for a scholarship",
+        "tips for my scholarship application",
+        "how to write a scholarship essay",
+        "how to write a personal statement or statement of purpose",
+        "what documents do I need to apply",
+        "how do I get good recommendation letters",
+        "when should I start preparing my application",
+        "common mistakes in scholarship applications",
+        "how to prepare for a scholarship interview",
+    ],
+    ELIGIBILITY: [
+        "am I eligible for this scholarship",
+        "check my eligibility",
+        "what are the eligibility criteria",
+        "do I qualify for scholarships",
+        "what GPA do I need to qualify",
+        "what are the requirements to be eligible",
+        "what information do you need to check eligibility",
+    ],
+    CATALOG: [
+        "list scholarships for engineering students",
+        "show me scholarships for women",
+        "which scholarships are available for PhD students",
+        "scholarships for computer science undergraduates",
+        "what is the deadline for the scholarship",
+        "give me the link for the scholarship",
+        "who provides the scholarship",
+        "scholarships in your database for postgraduate students",
+        "show scholarships for mechanical engineering",
+    ],
+    SIMILAR: [
+        "find scholarships like the Rolls-Royce scholarship",
+        "scholarships similar to this one",
+        "show me other scholarships like it",
+        "alternatives to the Google PhD fellowship",
+        "anything similar to the SWE scholarship",
+        "more scholarships like that",
+    ],
+}
+# Phrases that are strong evidence for an intent on their own
+INTENT_KEYWORDS = {
+    GUIDANCE: ["how to apply", "how do i apply", "application tips", "tips for", "tips on", "how to write",
+               "how do i write", "essay", "personal statement", "statement of purpose", "recommendation letter",
+               "letter of recommendation", "documents", "interview tips"],
+    ELIGIBILITY: ["eligible", "eligibility", "qualify", "criteria"],
+    CATALOG: ["list ", "show me", "deadline", "link for", "who provides", "in your database", "available for"],
+    SIMILAR: ["similar to", "similar scholarships", "scholarships like", "like the ", "alternatives to", "more like"],
+}
+# A local handler that declines (returns None) hands the question to this intent's handler next;
+# a declined guidance question goes to the LLM, since a list of scholarships doesn't answer "how do I..."
+FALLBACK_INTENTS = {ELIGIBILITY: CATALOG}
+KEYWORD_BONUS = 0.25
+MIN_SCORE = 0.35
+MIN_MARGIN = 0.05
+
+STOPWORDS = {
+    "a", "an", "the", "is", "are", "am", "i", "me", "my", "for", "to", "of", "in", "on", "and", "or", "do",
+    "does", "what", "which", "can", "you", "your", "with", "be", "it", "this", "that", "there", "any", "some",
+    "please", "about", "need", "want", "get", "like",
+}
+# Words too common in scholarship names to identify one
+NAME_STOPWORDS = STOPWORDS | {"scholarship", "scholarships", "program", "programme", "scheme", "foundation",
+                              "fellowship", "award", "india", "indian", "students", "student", "deadline",
+                              "link", "provides", "provider", "apply", "who", "when", "eligibility"}
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in re.findall(r"[a-z0-9]+", text.lower()) if t not in STOPWORDS]
+
+
+class TfidfIntentClassifier:
+    def __init__(self, examples: Dict[str, List[str]]):
+        """Nearest-example TF-IDF classifier; tiny and dependency-free"""
+        documents = [(intent, Counter(tokenize(text))) for intent, texts in examples.items() for text in texts]
+        document_frequency = Counter(term for _, counts in documents for term in counts)
+        self.idf = {term: math.log((1 + len(documents)) / (1 + df)) + 1 for term, df in document_frequency.items()}
+        self.examples = [(intent, self._vector(counts)) for intent, counts in documents]
+
+    def _vector(self, counts: Counter) -> Dict[str, float]:
+        vector = {term: count * self.idf.get(term, 0.0) for term, count in counts.items()}
+        norm = math.sqrt(sum(w * w for w in vector.values())) or 1.0
+        return {term: w / norm for term, w in vector.items()}
+
+    def scores(self, text: str) -> Dict[str, float]:
+        """Best cosine similarity to any example of each intent"""
+        query = self._vector(Counter(tokenize(text)))
+        best = defaultdict(float)
+        for intent, example in self.examples:
+            similarity = sum(w * example.get(term, 0.0) for term, w in query.items())
+            best[intent] = max(best[intent], similarity)
+        return dict(best)
+
+
+def _words(text: str) -> set:
+    return set(re.findall(r"[a-z0-9]+", text.lower()))
+
+
+def has_trigger_phrase(text: str, intent: str) -> bool:
+    lowered = f" {text.lower()} "
+    return any(phrase in lowered for phrase in INTENT_KEYWORDS[intent])
+
+
+def is_generic_eligibility_question(text: str, columns: ColumnarCatalog) -> bool:
+    """Asks about eligibility and states no profile (degree level, field, gender).
+
+    "What am I eligible for as a female engineering student?" names a profile, so it deserves
+    matching scholarships rather than a checklist asking for the details it already gave.
+    """
+    return has_trigger_phrase(text, ELIGIBILITY) and not extract_facets(text, columns)
+
+
+class NameIndex:
+    def __init__(self, columns: ColumnarCatalog):
+        """Words of every scholarship's name and provider, with rows per word, for one catalog load"""
+        self.columns = columns
+        self.rows = defaultdict(list)
+        for row in range(len(columns)):
+            words = _words(f"{columns.strings.get(int(columns.string_columns['name'][row])) or ''} "
+                           f"{columns.strings.get(int(columns.string_columns['provider'][row])) or ''}")
+            for word in words:
+                self.rows[word].append(row)
+        facet_words = set()
+        for key in ("degree_level", "field_of_study", "discipline"):
+            for value in columns.multi_columns[key].vocabulary.strings:
+                facet_words |= _words(value)
+        self.ignored = NAME_STOPWORDS | facet_words | {"women", "woman", "girls", "female", "phd", "ug", "pg"}
+
+    def match(self, text: str, max_name_frequency: int = 3) -> Optional[int]:
+        overlap = Counter()
+        for word in _words(text) - self.ignored:
+            rows = self.rows.get(word, ())
+            if len(rows) <= max_name_frequency:
+                overlap.update(rows)
+        if not overlap:
+            return None
+        # Most shared words first, then the earliest row
+        return min(overlap.items(), key=lambda item: (-item[1], item[0]))[0]
+
+
+_name_index: Optional[NameIndex] = None
+_name_index_lock = threading.Lock()
+
+
+def name_index(columns: ColumnarCatalog) -> NameIndex:
+    """The name index of columns, rebuilt only when the catalog is reloaded"""
+    global _name_index
+    index = _name_index
+    if index is None or index.columns is not columns:
+        with _name_index_lock:
+            if _name_index is None or _name_index.columns is not columns:
+                _name_index = NameIndex(columns)
+            index = _name_index
+    return index
+
+
+def match_scholarship_name(text: str, columns: ColumnarCatalog, max_name_frequency: int = 3) -> Optional[int]:
+    """Row whose name (or provider) shares the most distinctive words with the question.
+
+    Words that are facet values (e.g. "engineering", "women") or appear in many names identify nothing.
+    """
+    return name_index(columns).match(text, max_name_frequency)
+
+
+def format_scholarship_line(scholarship: Dict) -> str:
+    return (f"- **{scholarship['scholarship_name']}** ({scholarship['providing_body']}) · "
+            f"{', '.join(scholarship['degree_level'])} · [link]({scholarship['link']})")
+
+
+def format_scholarship_card(scholarship: Dict) -> str:
+    return "\n".join([
+        f"### 🎓 {scholarship['scholarship_name']}",
+        f"- **Provider:** {scholarship['providing_body']}",
+        f"- **Degree Level:** {', '.join(scholarship['degree_level'])}",
+        f"- **Field of Study:** {', '.join(scholarship['field_of_study'])}",
+        f"- **Gender Eligibility:** {scholarship['gender_eligibility']}",
+        f"- **Requirement:** {scholarship['gpa_requirement']}",
+        f"- **Deadline:** {scholarship['deadline']}",
+        f"- **About:** {scholarship['brief_description']}",
+        f"- **Link:** [{scholarship['link']}]({scholarship['link']})",
+    ])
+
+
+def answer_catalog_query(question: str, retriever: Optional[CatalogRetriever] = None, limit: int = 8) -> Optional[str]:
+    """Answer a lookup from scholarships.json; None if the question names nothing we can look up"""
+    retriever = retriever or get_retriever()
+    columns = retriever.index().columns
+    row = match_scholarship_name(question, columns)
+    if row is not None:
+        return format_scholarship_card(columns[row])
+
+    result = retriever.search(question, k=limit)
+    if not result:
+        return None
+    if result.facets:
+        heading = f"📋 **{result.candidates} scholarships in our database** match {' · '.join(dict.fromkeys(result.facets.values()))}:"
+    else:
+        heading = f"📋 **{result.candidates} scholarships in our database** match your question:"
+    lines = [heading, ""] + [format_scholarship_line(record) for record in result.records()]
+    if result.candidates > limit:
+        lines.append(f"\n…and {result.candidates - limit} more in the **🎯 Eligible Scholarships** tab.")
+    return "\n".join(lines)
+
+
+def answer_similar_query(question: str, vectors: Optional[CatalogVectors] = None, limit: int = 5,
+                         min_similarity: float = 0.1) -> Optional[str]:
+    """Nearest scholarships by embedding, to the one named in the question or else to the question itself"""
+    vectors = vectors or get_catalog_vectors()
+    columns = vectors.catalog.scholarships
+    row = match_scholarship_name(question, columns)
+    anchor = columns[row] if row is not None else None
+    hits = vectors.similar(question, k=limit, anchor_id=anchor['id'] if anchor else None)
+    # "More like that one" names nothing the index knows; the LLM has the conversation to resolve it
+    if not hits or (anchor is None and hits[0][1] < min_similarity):
+        return None
+    heading = f"most like {anchor['scholarship_name']}" if anchor else "closest to your question"
+    lines = [f"🧭 **Scholarships {heading}:**", ""]
+    lines += [f"- **{entry['scholarship_name']}** ({entry['providing_body']}) · similarity {score:.2f} · "
+              f"[link]({entry['link']})" for entry, score in hits]
+    return "\n".join(lines)
+
+
+class IntentRouter:
+    def __init__(self, handlers: Dict[str, Callable[[str], Optional[str]]],
+                 examples: Dict[str, List[str]] = INTENT_EXAMPLES, keywords: Dict[str, List[str]] = INTENT_KEYWORDS):
+        """Answers recognisable questions with a local handler; everything else is routed to the LLM"""
+        self.handlers = handlers
+        self.keywords = keywords
+        self.classifier = TfidfIntentClassifier(examples)
+        self.counts = Counter()
+
+    def classify(self, text: str) -> Tuple[str, float]:
+        """(intent, score); OPEN when no intent is clearly ahead"""
+        scores = self.classifier.scores(text)
+        lowered = f" {text.lower()} "
+        for intent, phrases in self.keywords.items():
+            if any(phrase in lowered for phrase in phrases):
+                scores[intent] = scores.get(intent, 0.0) + KEYWORD_BONUS
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        if not ranked or ranked[0][1] < MIN_SCORE:
+            return OPEN, ranked[0][1] if ranked else 0.0
+        if len(ranked) > 1 and ranked[0][1] - ranked[1][1] < MIN_MARGIN:
+            return OPEN, ranked[0][1]
+        return ranked[0]
+
+    def answer(self, text: str) -> Optional[Tuple[str, str]]:
+        """(intent, answer) from a local handler, or None if the question should go to the LLM.
+
+        A handler returns None to decline; the question then falls through FALLBACK_INTENTS.
+        """
+        started = time.perf_counter()
+        intent, _ = self.classify(text)
+        reply = None
+        while intent is not None:
+            handler = self.handlers.get(intent)
+            reply = handler(text) if handler else None
+            if reply is not None:
+                break
+            intent = FALLBACK_INTENTS.get(intent)
+        if reply is None:
+            return None
+        self.record(intent, time.perf_counter() - started)
+        return intent, reply
+
+    def record(self, route: str, seconds: float):
+        self.counts[route] += 1
+        get_timings().record(f"route.{route}", seconds)
+
+    def stats(self) -> Dict[str, Dict]:
+        return {route: dict(get_timings().summary(f"route.{route}") or {}, count=count)
+                for route, count in self.counts.items()}
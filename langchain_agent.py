@@ -1,68 +1,36 @@
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain.agents import initialize_agent, Tool, AgentType
-from langchain.memory import ConversationBufferWindowMemory
-from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
 import os
-from typing import List, Dict
+import threading
+import time
+from typing import Iterator, List, Dict
 import streamlit as st
+from fake_llm import FakeStreamingLLM
+from llm_cache import PROFILE_KEY_FIELDS, get_response_cache, make_cache_key
+from resilience import get_resilient_caller
+from hedging import get_hedger, hedging_enabled
+from singleflight import get_singleflight, prompt_key
+from admission import get_admission_controller
+from intent_router import CATALOG, ELIGIBILITY, GUIDANCE, OPEN, SIMILAR, IntentRouter, answer_catalog_query, \
+    answer_similar_query, format_scholarship_card, has_trigger_phrase, is_generic_eligibility_question, \
+    match_scholarship_name
+from retrieval import get_retriever
+from semantic_cache import CACHE_ROUTE, get_semantic_cache
+from token_memory import TokenBudgetMemory, approximate_tokens
+from session_pool import create_session_pool
+from catalog import get_catalog
+from agent_streaming import DirectAnswerParser, StreamedChatModel, stream_agent
 
-class ScholarshipChatAgent:
-    def __init__(self):
-        """Initialize the scholarship chat agent with Scholardeep"""
-        try:
-            # Validate API key first
-            api_key = os.getenv('GOOGLE_API_KEY')
-            if not api_key:
-                raise ValueError("GOOGLE_API_KEY not found in environment variables")
-            
-            # Initialize Gemini with correct model name
-            self.llm = ChatGoogleGenerativeAI(
-                google_api_key=api_key,
-                model="gemini-2.5-flash",  # Fixed: Use valid model name
-                temperature=0.3,  # Slightly higher for more creative responses
-                max_output_tokens=96000,  # Reduced for better reliability
-                convert_system_message_to_human=True
-            )
-            
-            # Test the connection
-            test_response = self.llm.invoke("Hello")
-            print("✅ Scholardeep initialized and tested successfully")
-            
-        except Exception as e:
-            print(f"❌ Gemini API Error: {e}")
-            st.error(f"Failed to initialize Gemini: {e}")
-            raise e
-        
-        # Configure memory for conversations
-        self.memory = ConversationBufferWindowMemory(
-            k=5,
-            memory_key="chat_history",
-            return_messages=True,
-            input_key="input",
-            output_key="output"
-        )
-        
-        # Initialize other components
-        self.tools = self._create_tools()
-        try:
-            self.agent = self._initialize_agent()
-        except Exception as e:
-            print(f"Warning: Agent initialization failed: {e}")
-            self.agent = None
-    
-    def get_scholarships_for_profile(self, profile):
-        """Get scholarships specifically for a student profile with enhanced error handling"""
-        try:
-            # Create a more focused prompt
-            prompt = f"""You are a scholarship expert. A student with the following profile needs scholarship recommendations:
+# Prompt templates are module-level so their hash can key the response cache.
+# The student's name is deliberately left out: it doesn't change the advice and
+# would stop identical profiles from sharing cached responses.
+PROFILE_RECOMMENDATIONS_PROMPT = """You are a scholarship expert. A student with the following profile needs scholarship recommendations:
 
 **Student Profile:**
-- Name: {profile.get('name', 'Student')}
-- Gender: {profile.get('gender', 'Not specified')}
-- Field of Study: {profile.get('field_of_study', 'Not specified')}
-- Degree Level: {profile.get('degree_level', 'Not specified')}
-- Country: {profile.get('country', 'Not specified')}
+- Gender: {gender}
+- Field of Study: {field_of_study}
+- Degree Level: {degree_level}
+- Country: {country}
 
 **Please provide EXACTLY 5 specific scholarships in this format:**
 
@@ -81,14 +49,168 @@ class ScholarshipChatAgent:
 
 **Important:** Provide real, existing scholarships that match this student's profile. Focus on current opportunities."""
 
-            # Make the API call with better error handling
-            response = self.llm.invoke(prompt)
+PROFILE_ANALYSIS_PROMPT = """As an expert scholarship advisor with access to current scholarship information, provide a comprehensive analysis of scholarship opportunities for this student profile:
+
+**Student Profile:**
+- Gender: {gender}
+- Field of Study: {field_of_study}
+- Degree Level: {degree_level}
+- Country: {country}
+
+**Please provide:**
+
+1. **🎯 TOP 5 ELIGIBLE SCHOLARSHIPS** - List specific scholarships this student is eligible for, including:
+   - Scholarship name and provider
+   - Award amount (if known)
+   - Eligibility requirements
+   - Application deadline (if known)
+   - Application process overview
+
+2. **📊 ELIGIBILITY ANALYSIS** - For each scholarship, provide:
+   - ✅ Eligible / ⚠️ Potentially Eligible / ❌ Not Eligible
+   - Match score (1-10) based on profile alignment
+   - Specific requirements they meet/don't meet
+
+3. **💡 PERSONALIZED RECOMMENDATIONS**:
+   - Scholarship categories most suitable for this profile
+   - Ways to strengthen their application
+   - Timeline suggestions for applications
+   - Additional opportunities to explore
+
+4. **🚀 ACTION PLAN**:
+   - Immediate next steps
+   - Documents to prepare
+   - Deadlines to watch
+   - Tips for success
+
+Please use current scholarship information and be specific about opportunities available in {country} and internationally for {field_of_study} students at the {degree_level} level. Format your response with clear headings, bullet points, and emoji indicators for easy reading."""
+
+# Streaming chat answers straight from the LLM, with the memory window as context
+CHAT_PROMPT = """You are Scholardeep, an expert scholarship advisor. Help the student with their question.
+
+{context}{history}Student: {input}
+Advisor:"""
+# Retrieved catalog entries are put in front of the LLM so answers name real scholarships
+CATALOG_CONTEXT = """Scholarships from our database that may be relevant (recommend these before any others):
+{snippets}
+
+"""
+# Older turns are folded into this running summary once they no longer fit the memory's token budget
+SUMMARY_PROMPT = """Update the summary of a conversation between a student and a scholarship advisor.
+Keep the student's profile details (degree level, field, gender, GPA, country), the scholarships discussed and any open questions. Reply with the summary only, in at most 120 words.
+
+Current summary: {summary}
+
+New lines:
+{transcript}
+
+Updated summary:"""
+
+def use_fake_llm() -> bool:
+    """SCHOLARSHIP_FAKE_LLM=1 runs the app and agent against the offline fake LLM"""
+    return os.getenv('SCHOLARSHIP_FAKE_LLM', '').lower() in ('1', 'true', 'yes')
+
+def create_llm():
+    """Gemini chat model, or the local fake one when SCHOLARSHIP_FAKE_LLM is set"""
+    if use_fake_llm():
+        return FakeStreamingLLM(
+            first_token_delay=float(os.getenv('FAKE_LLM_FIRST_TOKEN_DELAY', 0.5)),
+            token_delay=float(os.getenv('FAKE_LLM_TOKEN_DELAY', 0.02)),
+        )
+    
+    # Validate API key first
+    api_key = os.getenv('GOOGLE_API_KEY')
+    if not api_key:
+        raise ValueError("GOOGLE_API_KEY not found in environment variables")
+    
+    # Initialize Gemini with correct model name
+    return ChatGoogleGenerativeAI(
+        google_api_key=api_key,
+        model="gemini-2.5-flash",  # Fixed: Use valid model name
+        temperature=0.3,  # Slightly higher for more creative responses
+        max_output_tokens=96000,  # Reduced for better reliability
+        convert_system_message_to_human=True,
+        # One attempt per request: retries, backoff and deadlines live in resilience.py
+        max_retries=1,
+        timeout=float(os.getenv('LLM_REQUEST_TIMEOUT_SECONDS', 60)),
+    )
+
+def response_text(response) -> str:
+    """Text of an LLM response or streamed chunk"""
+    return response.content if hasattr(response, 'content') else str(response)
+
+class ScholarshipChatAgent:
+    def __init__(self, response_cache=None, llm=None, caller=None, hedger=None, singleflight=None, admission=None,
+                 router=None, semantic_cache=None, sessions=None):
+        """Initialize the scholarship chat agent with Scholardeep (or an injected LLM, e.g. FakeStreamingLLM)"""
+        # Profile prompts are answered from this cache (in-memory LRU + SQLite) when possible
+        self.response_cache = response_cache or get_response_cache()
+        # Every LLM call goes through this: deadline budget, retries and circuit breaker
+        self.caller = caller or get_resilient_caller()
+        # Optional hedged requests against tail latency (LLM_HEDGING=1)
+        self.hedger = hedger or (get_hedger() if hedging_enabled() else None)
+        # Concurrent identical prompts (e.g. many students with the same profile) share one call
+        self.singleflight = singleflight or get_singleflight()
+        # Global rate limit, concurrency cap and priority queue shared by every session
+        self.admission = admission or get_admission_controller()
+        # Guidance, eligibility-checklist, catalog and "like X" questions are answered locally, without the agent
+        self.router = router or IntentRouter({
+            GUIDANCE: self._route_guidance,
+            ELIGIBILITY: self._route_eligibility,
+            CATALOG: answer_catalog_query,
+            SIMILAR: answer_similar_query,
+        })
+        # Paraphrases of earlier open questions are answered from here instead of the LLM
+        self.semantic_cache = semantic_cache or get_semantic_cache()
+        # Per-thread (i.e. per Streamlit session) cache hit of the last chat turn, for the UI
+        self._turn = threading.local()
+        
+        try:
+            # No test generation here: agent_health warms the agent up off the request
+            # path and checks the connection with cheap probe() calls instead
+            self.llm = llm or create_llm()
+            print("✅ Scholardeep initialized successfully")
             
-            # Extract and validate response
-            if hasattr(response, 'content'):
-                content = response.content
-            else:
-                content = str(response)
+        except Exception as e:
+            print(f"❌ Gemini API Error: {e}")
+            raise e
+        
+        # One conversation memory per browser session; the LLM, tools and agent below are shared
+        self.sessions = sessions or create_session_pool(self._new_memory)
+        
+        # Initialize other components
+        self.tools = self._create_tools()
+        try:
+            self.agent = self._initialize_agent()
+        except Exception as e:
+            print(f"Warning: Agent initialization failed: {e}")
+            self.agent = None
+    
+    def _new_memory(self) -> TokenBudgetMemory:
+        """Conversation memory: recent turns verbatim up to a token budget, older ones summarized in the background"""
+        return TokenBudgetMemory(
+            max_tokens=int(os.getenv('CHAT_MEMORY_TOKENS', 1000)),
+            summarizer=self._summarize,
+            memory_key="chat_history",
+            return_messages=True,
+            input_key="input",
+            output_key="output"
+        )
+    
+    @property
+    def memory(self) -> TokenBudgetMemory:
+        """Memory of the default session, for callers that don't pass a session id"""
+        return self.sessions.get()
+    
+    def probe(self):
+        """Cheap liveness check: a token-count round-trip instead of a billed generation"""
+        return self.llm.get_num_tokens("ping")
+    
+    def get_scholarships_for_profile(self, profile):
+        """Get scholarships specifically for a student profile with enhanced error handling"""
+        try:
+            # Make the API call (or reuse a cached answer for an identical profile)
+            content = self._generate_for_profile(PROFILE_RECOMMENDATIONS_PROMPT, profile)
             
             # Check if response is meaningful
             if not content or len(content.strip()) < 50:
@@ -100,6 +222,98 @@ class ScholarshipChatAgent:
             print(f"Error in get_scholarships_for_profile: {e}")
             return self._get_fallback_response(profile, error=str(e))
     
+    def analyze_profile(self, profile):
+        """Comprehensive scholarship analysis for the recommendations tab (cached per profile)"""
+        return self._generate_for_profile(PROFILE_ANALYSIS_PROMPT, profile)
+    
+    def analyze_profile_stream(self, profile, fallback=True) -> Iterator[str]:
+        """analyze_profile() as text chunks, yielded as the LLM produces them.
+        
+        fallback=False lets an upstream failure raise instead of ending in the static advice,
+        so a background prefetch fails (and is retried) rather than caching the fallback text.
+        """
+        stream = self._stream_for_profile(PROFILE_ANALYSIS_PROMPT, profile)
+        return self.with_fallback(stream, profile) if fallback else stream
+    
+    def analysis_key(self, profile) -> str:
+        """Cache key of analyze_profile(); identical profiles share it"""
+        return make_cache_key(PROFILE_ANALYSIS_PROMPT, profile)
+    
+    def _prompt_fields(self, profile):
+        """Profile values a prompt template is filled with"""
+        return {field: profile.get(field) or 'Not specified' for field in PROFILE_KEY_FIELDS}
+    
+    def _generate_for_profile(self, template, profile):
+        """Fill a profile prompt template and return the LLM's text, served from the response cache when possible"""
+        return "".join(self.with_fallback(self._stream_for_profile(template, profile), profile))
+    
+    def with_fallback(self, chunks: Iterator[str], profile) -> Iterator[str]:
+        """Pass a profile answer's chunks through; if generation fails, end with the static advice instead"""
+        started = False
+        try:
+            for text in chunks:
+                started = True
+                yield text
+        except Exception as e:
+            print(f"Error generating profile recommendations: {e}")
+            # Upstream unhealthy, over budget or out of retries: fail fast to the static advice
+            if not started:
+                yield self._get_fallback_response(profile, error=str(e))
+            else:
+                yield f"\n\n⚠️ **Note:** The response was cut short. Error: {str(e)[:100]}"
+    
+    def _stream_for_profile(self, template, profile) -> Iterator[str]:
+        """Stream the LLM's answer to a profile prompt; a cached answer is yielded in one piece. Raises on failure."""
+        key = make_cache_key(template, profile)
+        cached = self.response_cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+        
+        parts = []
+        for text in self._stream_llm(template.format(**self._prompt_fields(profile)), "recommendations"):
+            parts.append(text)
+            yield text
+        content = "".join(parts)
+        
+        # Short or empty answers aren't cached so the next request tries again
+        if content and len(content.strip()) >= 50:
+            self.response_cache.set(key, content)
+    
+    def _call_llm(self, prompt, call_type):
+        """llm.invoke through single-flight and the shared resilience layer (hedged if enabled); returns the response text"""
+        if self.hedger:
+            invoke = lambda: self.hedger.invoke(lambda: self.llm.ainvoke(prompt), call_type)
+        else:
+            invoke = lambda: self.llm.invoke(prompt)
+        
+        def admitted_call():
+            with self.admission.slot(call_type):
+                return response_text(self.caller.call(invoke, call_type, on_abandon=self._hold_slot(call_type)))
+        
+        return self.singleflight.do(prompt_key(call_type, prompt), admitted_call)
+    
+    def _stream_llm(self, prompt, call_type, stop=None) -> Iterator[str]:
+        """llm.stream through single-flight and the shared resilience layer (hedged if enabled), as text chunks"""
+        key = prompt_key(call_type, "\0".join([prompt, *stop]) if stop else prompt)
+        return self.singleflight.stream(key, lambda: self._resilient_stream(prompt, call_type, stop))
+    
+    def _resilient_stream(self, prompt, call_type, stop=None) -> Iterator[str]:
+        if self.hedger:
+            stream = lambda: self.hedger.stream(lambda: self.llm.astream(prompt, stop=stop), call_type)
+        else:
+            stream = lambda: self.llm.stream(prompt, stop=stop)
+        # The slot is held for the whole generation
+        with self.admission.slot(call_type):
+            for chunk in self.caller.stream(stream, call_type, on_abandon=self._hold_slot(call_type)):
+                text = response_text(chunk)
+                if text:
+                    yield text
+    
+    def _hold_slot(self, call_type):
+        """on_abandon for the resilience layer: an attempt left running past its deadline keeps occupying a slot"""
+        return lambda finished: self.admission.hold_until(finished, call_type)
+    
     def _get_fallback_response(self, profile, error=None):
         """Provide a fallback response when API fails"""
         field = profile.get('field_of_study', 'your field')
@@ -156,8 +370,6 @@ class ScholarshipChatAgent:
         
         return fallback
     
-    # ... (rest of your existing methods remain the same)
-    
     def _create_tools(self) -> List[Tool]:
         """Create tools optimized for Scholardeep"""
         tools = [
@@ -184,24 +396,29 @@ class ScholarshipChatAgent:
         try:
             return initialize_agent(
                 tools=self.tools,
-                llm=self.llm,
+                # Each reasoning step is a streamed "chat" call through single-flight, admission and
+                # the resilience layer, so the final answer reaches the reader token by token
+                llm=StreamedChatModel(stream_text=lambda prompt, stop: self._stream_llm(prompt, "chat", stop)),
                 agent=AgentType.CONVERSATIONAL_REACT_DESCRIPTION,
-                memory=self.memory,
+                # No memory of its own: it is shared by every session, so chat_stream() passes the history in
                 verbose=False,
                 max_iterations=2,
                 early_stopping_method="generate",
-                handle_parsing_errors=True
+                handle_parsing_errors=True,
+                agent_kwargs={"output_parser": DirectAnswerParser()},
             )
         except Exception as e:
             print(f"Agent initialization failed: {e}")
             return None
     
     def search_scholarships_tool(self, query: str) -> str:
-        """Search tool with fallback"""
+        """Search tool: our own catalog first, the LLM only when nothing in it matches"""
         try:
+            result = get_retriever().search(query, k=5)
+            if result:
+                return f"Matching scholarships from our database:\n{result.snippets()}"
             prompt = f"Provide 3-5 specific scholarships for: {query}. Include names, amounts, and eligibility."
-            response = self.llm.invoke(prompt)
-            return response.content if hasattr(response, 'content') else str(response)
+            return self._call_llm(prompt, "tool")
         except Exception as e:
             return f"Search temporarily unavailable. Please try: 1) Check university websites 2) Visit Fastweb.com 3) Contact financial aid offices. Error: {e}"
     
@@ -253,18 +470,115 @@ class ScholarshipChatAgent:
 - Poor proofreading
 - Not following instructions exactly"""
 
-    def chat(self, user_input: str) -> str:
-        """Enhanced chat with better fallback"""
+    def _route_guidance(self, question: str):
+        """Application guide, for the scholarship named in the question if there is one; None unless it asks how to apply"""
+        # A stated profile ("as a PhD student") doesn't change how to apply, so only the phrasing matters here
+        if not has_trigger_phrase(question, GUIDANCE):
+            return None
+        columns = get_catalog().scholarships
+        row = match_scholarship_name(question, columns)
+        return self.application_guidance_tool(columns[row]['scholarship_name'] if row is not None else "Scholarships")
+    
+    def _route_eligibility(self, question: str):
+        """Eligibility checklist, plus the requirements of the scholarship named in the question; None if it states a profile"""
+        columns = get_catalog().scholarships
+        if not is_generic_eligibility_question(question, columns):
+            return None
+        row = match_scholarship_name(question, columns)
+        if row is None:
+            return self.check_eligibility_tool(question)
+        return format_scholarship_card(columns[row]) + "\n\n" + self.check_eligibility_tool(question)
+    
+    def _summarize(self, summary: str, transcript: str) -> str:
+        """Fold transcript lines into the running conversation summary (runs off the request path)"""
+        return self._call_llm(SUMMARY_PROMPT.format(summary=summary or "(none yet)", transcript=transcript), "summary")
+    
+    def _route_locally(self, user_input: str, memory: TokenBudgetMemory):
+        """Local answer for a recognised question (saved to memory), or None"""
+        routed = self.router.answer(user_input)
+        if routed is None:
+            return None
+        _, answer = routed
+        memory.save_context({"input": user_input}, {"output": answer})
+        return answer
+    
+    def _cached_answer(self, user_input: str, history: str, memory: TokenBudgetMemory):
+        """Semantic cache hit for a paraphrase of an earlier question (saved to memory), or None"""
+        started = time.perf_counter()
+        hit = self.semantic_cache.lookup(user_input, history)
+        self._turn.cache_hit = hit
+        if hit is None:
+            return None
+        self.router.record(CACHE_ROUTE, time.perf_counter() - started)
+        memory.save_context({"input": user_input}, {"output": hit.answer})
+        return hit
+    
+    def last_cache_hit(self):
+        """SemanticHit behind this thread's last chat answer, or None if it wasn't served from the cache"""
+        return getattr(self._turn, "cache_hit", None)
+    
+    def chat(self, user_input: str, session_id: str = None) -> str:
+        """chat_stream() collected into one string, for callers that don't render tokens as they arrive"""
+        return "".join(self.chat_stream(user_input, session_id=session_id))
+    
+    def chat_stream(self, user_input: str, session_id: str = None) -> Iterator[str]:
+        """Chat answer streamed token by token for st.write_stream.
+        
+        Recognised questions are answered locally and paraphrases from the semantic cache; open
+        questions go to the ReAct agent with the session's conversation, and its final answer is
+        streamed as it is generated. Without an agent the LLM is asked directly, with the most
+        relevant catalog entries as context. The exchange is recorded in that session's memory.
+        """
+        self._turn.cache_hit = None
+        memory = self.sessions.get(session_id)
+        answer = self._route_locally(user_input, memory)
+        if answer is not None:
+            yield answer
+            return
+        history = self._format_history(memory)
+        hit = self._cached_answer(user_input, history, memory)
+        if hit is not None:
+            yield hit.answer
+            return
+        started = time.perf_counter()
+        parts = []
         try:
-            if self.agent:
-                response = self.agent.run(input=user_input)
-                return response
-            else:
-                # Direct LLM call if agent failed
-                response = self.llm.invoke(f"As a scholarship advisor, help with: {user_input}")
-                return response.content if hasattr(response, 'content') else str(response)
+            for text in self._open_answer_stream(user_input, history, memory):
+                parts.append(text)
+                yield text
         except Exception as e:
-            return f"""I apologize for the technical difficulty. Here's what you can do:
+            # Shown once but never remembered: it would otherwise ride along in every later prompt
+            yield self._chat_error_message(e)
+            return
+        finally:
+            self.router.record(OPEN, time.perf_counter() - started)
+        memory.save_context({"input": user_input}, {"output": "".join(parts)})
+        self.semantic_cache.store(user_input, history, "".join(parts))
+    
+    def _open_answer_stream(self, user_input: str, history: str, memory: TokenBudgetMemory) -> Iterator[str]:
+        """Answer to an open question: the agent's if it is available, otherwise the LLM's"""
+        if self.agent:
+            # The agent wraps the history in its own (fixed) scaffolding, so history + question is what varies
+            memory.record_prompt(approximate_tokens(history + user_input))
+            return stream_agent(self.agent, {"input": user_input, "chat_history": history})
+        prompt = CHAT_PROMPT.format(context=self._catalog_context(user_input), history=history, input=user_input)
+        memory.record_prompt(approximate_tokens(prompt))
+        return self._stream_llm(prompt, "chat")
+    
+    def _catalog_context(self, user_input: str) -> str:
+        """Compact snippets of the catalog entries most relevant to the question, if any"""
+        result = get_retriever().search(user_input, k=3)
+        return CATALOG_CONTEXT.format(snippets=result.snippets()) if result else ""
+    
+    def _format_history(self, memory: TokenBudgetMemory) -> str:
+        """Conversation summary and recent turns as 'Student:'/'Advisor:' lines"""
+        messages = memory.load_memory_variables({})["chat_history"]
+        speakers = {'human': 'Student', 'system': 'Context'}
+        lines = [f"{speakers.get(message.type, 'Advisor')}: {message.content}" for message in messages]
+        return "".join(line + "\n" for line in lines)
+    
+    def _chat_error_message(self, e: Exception) -> str:
+        return f"""I apologize for the technical difficulty. Here's what you can do:
 
 **🔧 Immediate Solutions:**
 1. **Refresh the page** and try again
@@ -0,0 +1,185 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "llm_cache.db")
+
+# Profile fields that shape a recommendation; anything else (name, GPA) doesn't change the prompt
+PROFILE_KEY_FIELDS = ("gender", "field_of_study", "degree_level", "country")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses (last_access);
+"""
+
+
+def template_hash(template: str) -> str:
+    """Changing a prompt template invalidates every response cached under it"""
+    return hashlib.sha256(template.encode("utf-8")).hexdigest()[:16]
+
+
+def normalize_profile(profile: Dict, fields: Iterable[str] = PROFILE_KEY_FIELDS) -> Dict:
+    """Only the fields the prompt uses, trimmed and case-folded"""
+    return {field: str(profile.get(field) or "").strip().casefold() for field in fields}
+
+
+def make_cache_key(template: str, profile: Dict, fields: Iterable[str] = PROFILE_KEY_FIELDS) -> str:
+    payload = json.dumps([template_hash(template), normalize_profile(profile, fields)], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    def __init__(self, path: Optional[str] = DEFAULT_CACHE_PATH, max_memory_entries: int = 256,
+                 max_disk_bytes: int = 50 * 1024 * 1024, ttl_seconds: float = 24 * 3600):
+        """Two-tier response cache: in-memory LRU in front of an on-disk SQLite table, both with a TTL"""
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.ttl_seconds = ttl_seconds
+
+        self._memory = OrderedDict()  # key -> (value, created_at)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+
+        if self.path:
+            self._connection().executescript(SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    def _remember(self, key: str, value: str, created_at: float):
+        with self._lock:
+            self._memory[key] = (value, created_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+                self.evictions += 1
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        expired = False
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, created_at = entry
+                if now - created_at <= self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return value
+                del self._memory[key]
+                self.expirations += 1
+                expired = True
+
+        if self.path:
+            connection = self._connection()
+            row = connection.execute("SELECT value, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                value, created_at = row
+                with connection:
+                    if now - created_at <= self.ttl_seconds:
+                        connection.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+                    else:
+                        connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                if now - created_at <= self.ttl_seconds:
+                    self._remember(key, value, created_at)
+                    with self._lock:
+                        self.disk_hits += 1
+                    return value
+                if not expired:
+                    with self._lock:
+                        self.expirations += 1
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, value: str):
+        now = time.time()
+        self._remember(key, value, now)
+        if not self.path:
+            return
+        size = len(value.encode("utf-8"))
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now),
+            )
+            self._evict_disk(connection, now)
+
+    def _evict_disk(self, connection: sqlite3.Connection, now: float):
+        """Drop expired rows, then least recently used rows until under the byte budget"""
+        expired = connection.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,)).rowcount
+        total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        evicted = 0
+        if total > self.max_disk_bytes:
+            for key, size in connection.execute("SELECT key, size FROM responses ORDER BY last_access").fetchall():
+                if total <= self.max_disk_bytes:
+                    break
+                connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                total -= size
+                evicted += 1
+        with self._lock:
+            self.expirations += max(expired, 0)
+            self.evictions += evicted
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        if self.path:
+            connection = self._connection()
+            with connection:
+                connection.execute("DELETE FROM responses")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "memory_entries": len(self._memory),
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "expirations": self.expirations,
+                "evictions": self.evictions,
+            }
+
+
+_cache: Optional[LLMResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> LLMResponseCache:
+    """Process-wide response cache shared by every session"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = LLMResponseCache(
+                    path=os.getenv("LLM_CACHE_PATH", DEFAULT_CACHE_PATH),
+                    ttl_seconds=float(os.getenv("LLM_CACHE_TTL_SECONDS", 24 * 3600)),
+                )
+    return _cache
@@ -0,0 +1,253 @@
+import hashlib
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from catalog import ScholarshipCatalog, get_catalog
+from columnar import ColumnarCatalog, profile_fields
+from eligibility import evaluate
+from metrics import get_timings
+from models import DEGREE_LEVELS, FIELDS_OF_STUDY, GENDERS
+
+FORMAT_VERSION = 1
+# Country doesn't enter eligibility, so the buckets are gender x field x degree level only
+BUCKETS: List[Tuple[str, str, str]] = list(itertools.product(GENDERS, FIELDS_OF_STUDY, DEGREE_LEVELS))
+
+
+def materialized_path_for(catalog_path: str) -> str:
+    """scholarships.json -> scholarships.mat"""
+    return os.path.splitext(catalog_path)[0] + ".mat"
+
+
+def eligibility_fingerprint(columns: ColumnarCatalog) -> str:
+    """Hash of everything eligibility depends on, so the side file is rebuilt when any of it changes"""
+    digest = hashlib.sha256(json.dumps([FORMAT_VERSION, BUCKETS, columns.gender_vocabulary.strings]).encode("utf-8"))
+    for name in ("degree_level", "field_of_study"):
+        column = columns.multi_columns[name]
+        digest.update(json.dumps(column.vocabulary.strings).encode("utf-8"))
+        digest.update(np.ascontiguousarray(column.offsets).tobytes())
+        digest.update(np.ascontiguousarray(column.codes).tobytes())
+    digest.update(np.ascontiguousarray(columns.gender_codes).tobytes())
+    for key in ("min_gpa", "min_cgpa"):
+        digest.update(np.ascontiguousarray(columns.floors[key]).tobytes())
+    return digest.hexdigest()
+
+
+def _sorted_by_floor(ids: np.ndarray, floors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """ids ordered by their floor; no floor sorts first (as -inf), so it passes every cut-off"""
+    keys = np.where(np.isnan(floors[ids]), -np.inf, floors[ids]).astype(np.float32)
+    order = np.argsort(keys, kind="stable")
+    return ids[order].astype(np.int32), keys[order]
+
+
+class MaterializedEligibility:
+    def __init__(self, fingerprint: str, offsets: np.ndarray, gpa_ids: np.ndarray, gpa_floors: np.ndarray,
+                 cgpa_ids: np.ndarray, cgpa_floors: np.ndarray):
+        """Eligible ids of every sidebar bucket, each listed twice: by GPA floor and by CGPA floor.
+
+        Bucket b spans [offsets[b], offsets[b + 1]) in both lists. A lookup binary-searches each
+        list for the student's score and intersects the two prefixes.
+        """
+        self.fingerprint = fingerprint
+        self.offsets = offsets
+        self.gpa_ids = gpa_ids
+        self.gpa_floors = gpa_floors
+        self.cgpa_ids = cgpa_ids
+        self.cgpa_floors = cgpa_floors
+        self.buckets = {bucket: index for index, bucket in enumerate(BUCKETS)}
+
+    @classmethod
+    def build(cls, columns: ColumnarCatalog) -> "MaterializedEligibility":
+        """Run the categorical checks once per bucket; GPA/CGPA are left to lookup time"""
+        offsets = np.zeros(len(BUCKETS) + 1, dtype=np.int32)
+        gpa_ids, gpa_floors, cgpa_ids, cgpa_floors = [], [], [], []
+        for index, (gender, field, degree) in enumerate(BUCKETS):
+            mask = columns.degree_mask(degree) & columns.field_mask(field) & columns.gender_mask(gender)
+            ids = np.flatnonzero(mask)
+            for id_list, floor_list, key in ((gpa_ids, gpa_floors, "min_gpa"), (cgpa_ids, cgpa_floors, "min_cgpa")):
+                ordered_ids, ordered_floors = _sorted_by_floor(ids, columns.floors[key])
+                id_list.append(ordered_ids)
+                floor_list.append(ordered_floors)
+            offsets[index + 1] = offsets[index] + len(ids)
+
+        def join(parts, dtype):
+            return np.concatenate(parts).astype(dtype) if parts else np.zeros(0, dtype=dtype)
+
+        return cls(eligibility_fingerprint(columns), offsets, join(gpa_ids, np.int32), join(gpa_floors, np.float32),
+                   join(cgpa_ids, np.int32), join(cgpa_floors, np.float32))
+
+    def _passing(self, ids: np.ndarray, floors: np.ndarray, start: int, stop: int, score) -> np.ndarray:
+        if score is None:
+            return ids[start:stop]
+        # Same float32 comparison as ColumnarCatalog.floor_mask, so a floor equal to the score passes
+        cut = np.searchsorted(floors[start:stop], np.float32(score), side="right")
+        return ids[start:start + cut]
+
+    def eligible_ids(self, profile) -> Optional[np.ndarray]:
+        """Eligible record ids in catalog order, or None for a profile outside the sidebar's buckets"""
+        profile = profile_fields(profile)
+        bucket = self.buckets.get((profile.get('gender'), profile.get('field_of_study'), profile.get('degree_level')))
+        if bucket is None:
+            return None
+        start, stop = int(self.offsets[bucket]), int(self.offsets[bucket + 1])
+        by_gpa = self._passing(self.gpa_ids, self.gpa_floors, start, stop, profile.get('gpa'))
+        by_cgpa = self._passing(self.cgpa_ids, self.cgpa_floors, start, stop, profile.get('cgpa'))
+        return np.intersect1d(by_gpa, by_cgpa, assume_unique=True)
+
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in (self.offsets, self.gpa_ids, self.gpa_floors, self.cgpa_ids, self.cgpa_floors))
+
+    def save(self, path: str):
+        """One compact .npz; written atomically so a running app never reads half of it"""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, meta=np.array(json.dumps({"version": FORMAT_VERSION, "fingerprint": self.fingerprint})),
+                     offsets=self.offsets, gpa_ids=self.gpa_ids, gpa_floors=self.gpa_floors,
+                     cgpa_ids=self.cgpa_ids, cgpa_floors=self.cgpa_floors)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, expected_fingerprint: Optional[str] = None) -> Optional["MaterializedEligibility"]:
+        """Read a side file; None if it was built from a different catalog (or format)"""
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta.get("version") != FORMAT_VERSION:
+                return None
+            if expected_fingerprint is not None and meta["fingerprint"] != expected_fingerprint:
+                return None
+            return cls(meta["fingerprint"], data["offsets"], data["gpa_ids"], data["gpa_floors"],
+                       data["cgpa_ids"], data["cgpa_floors"])
+
+
+def _cutoffs(floors: np.ndarray) -> List[Optional[float]]:
+    """Scores that land on every side of every distinct floor, plus "no score given" """
+    values = sorted({float(v) for v in floors[~np.isnan(floors)]})
+    scores = {0.0}
+    for value in values:
+        scores.update((value - 0.01, value, value + 0.01))
+    return [None] + sorted(scores)
+
+
+def check_consistency(columns: ColumnarCatalog, table: MaterializedEligibility) -> List[str]:
+    """Compare every bucket against the live eligibility.evaluate() at every GPA/CGPA cut-off.
+
+    Returns one line per mismatching profile; an empty list means the side file agrees everywhere.
+    """
+    mismatches = []
+    gpa_scores = _cutoffs(columns.floors['min_gpa'])
+    cgpa_scores = _cutoffs(columns.floors['min_cgpa'])
+    for gender, field, degree in BUCKETS:
+        for gpa, cgpa in itertools.product(gpa_scores, cgpa_scores):
+            profile = {'gender': gender, 'field_of_study': field, 'degree_level': degree, 'gpa': gpa, 'cgpa': cgpa}
+            expected = evaluate(columns, profile).eligible_ids
+            actual = table.eligible_ids(profile)
+            if actual is None or not np.array_equal(expected, actual):
+                mismatches.append(f"{profile}: live {expected.tolist()} vs materialized "
+                                  f"{None if actual is None else actual.tolist()}")
+    return mismatches
+
+
+class MaterializedResults:
+    def __init__(self, catalog: Optional[ScholarshipCatalog] = None):
+        """The side file for the shared catalog, reloaded or rebuilt whenever the catalog changes"""
+        self.catalog = catalog or get_catalog()
+        self.path = materialized_path_for(self.catalog.path)
+        self._columns: Optional[ColumnarCatalog] = None
+        self._table: Optional[MaterializedEligibility] = None
+        self._lock = threading.Lock()
+        self.builds = 0
+        self.loads = 0
+        self.last_build_seconds = 0.0
+
+    def table(self) -> MaterializedEligibility:
+        columns = self.catalog.scholarships
+        if self._table is None or self._columns is not columns:
+            with self._lock:
+                if self._table is None or self._columns is not columns:
+                    self._table = self._load_or_build(columns)
+                    self._columns = columns
+        return self._table
+
+    def _load_or_build(self, columns: ColumnarCatalog) -> MaterializedEligibility:
+        fingerprint = eligibility_fingerprint(columns)
+        if os.path.exists(self.path):
+            try:
+                table = MaterializedEligibility.load(self.path, expected_fingerprint=fingerprint)
+                if table is not None:
+                    self.loads += 1
+                    return table
+            except Exception as e:
+                print(f"⚠️ Ignoring unreadable materialized results {self.path}: {e}")
+        started = time.perf_counter()
+        table = MaterializedEligibility.build(columns)
+        self.last_build_seconds = time.perf_counter() - started
+        self.builds += 1
+        try:
+            table.save(self.path)
+        except OSError as e:
+            print(f"⚠️ Could not write materialized results {self.path}: {e}")
+        return table
+
+    def eligible_ids(self, profile) -> Optional[np.ndarray]:
+        """Eligible ids for a sidebar profile, or None when the caller should run evaluate() instead"""
+        started = time.perf_counter()
+        ids = self.table().eligible_ids(profile)
+        get_timings().record("materialized.lookup", time.perf_counter() - started)
+        return ids
+
+    def stats(self) -> Dict:
+        table = self._table
+        return {
+            "buckets": len(BUCKETS),
+            "entries": int(table.offsets[-1]) if table else 0,
+            "kb": round(table.nbytes() / 1024, 1) if table else 0,
+            "builds": self.builds,
+            "loads": self.loads,
+            "last_build_ms": round(self.last_build_seconds * 1000, 2),
+            "lookup": get_timings().summary("materialized.lookup"),
+        }
+
+
+_materialized: Optional[MaterializedResults] = None
+_materialized_lock = threading.Lock()
+
+
+def get_materialized() -> MaterializedResults:
+    """Process-wide materialized results for the shared catalog"""
+    global _materialized
+    if _materialized is None:
+        with _materialized_lock:
+            if _materialized is None:
+                _materialized = MaterializedResults()
+    return _materialized
+
+
+def build_materialized(catalog_path: str) -> Tuple[str, List[str]]:
+    """Batch job: materialize a catalog file's buckets, write the side file, then check it against evaluate()"""
+    columns = ScholarshipCatalog(catalog_path).scholarships
+    table = MaterializedEligibility.build(columns)
+    path = materialized_path_for(catalog_path)
+    table.save(path)
+    return path, check_consistency(columns, table)
+
+
+if __name__ == "__main__":
+    from catalog import DEFAULT_CATALOG_PATH
+
+    source = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_CATALOG_PATH
+    started = time.perf_counter()
+    path, mismatches = build_materialized(source)
+    print(f"Materialized {len(BUCKETS)} profile buckets to {path} "
+          f"({os.path.getsize(path) / 1024:.1f} KB, built and checked in {time.perf_counter() - started:.1f} s)")
+    for line in mismatches[:20]:
+        print(f"  ✗ {line}")
+    if mismatches:
+        print(f"❌ {len(mismatches)} profiles disagree with the live filter")
+        sys.exit(1)
+    print("✅ Every bucket agrees with the live filter at every GPA/CGPA cut-off")
@@ -0,0 +1,59 @@
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+
+class Timings:
+    def __init__(self, window: int = 200):
+        """Named wall-clock timings (e.g. per rerun scope), keeping the last `window` samples of each"""
+        self.window = window
+        self._samples = defaultdict(lambda: deque(maxlen=self.window))
+        self._counts = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(self, name: str, seconds: float):
+        with self._lock:
+            self._samples[name].append(seconds * 1000)
+            self._counts[name] += 1
+
+    @contextmanager
+    def track(self, name: str):
+        """Time the body of a with-block under name"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def summary(self, name: str) -> Optional[Dict]:
+        with self._lock:
+            samples = sorted(self._samples.get(name, ()))
+            if not samples:
+                return None
+            return {
+                "count": self._counts[name],
+                "last_ms": round(self._samples[name][-1], 1),
+                "avg_ms": round(sum(samples) / len(samples), 1),
+                "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 1),
+            }
+
+    def stats(self) -> Dict[str, Dict]:
+        with self._lock:
+            names = list(self._samples)
+        return {name: self.summary(name) for name in names}
+
+
+_timings: Optional[Timings] = None
+_timings_lock = threading.Lock()
+
+
+def get_timings() -> Timings:
+    """Process-wide timing registry"""
+    global _timings
+    if _timings is None:
+        with _timings_lock:
+            if _timings is None:
+                _timings = Timings()
+    return _timings
@@ -2,6 +2,12 @@ from dataclasses import dataclass
 from typing import List, Optional, Dict
 from datetime import datetime
 
+# Choices offered in the Streamlit sidebar; materialize.py precomputes results for every combination
+GENDERS = ["Male", "Female", "Other", "Prefer not to say"]
+FIELDS_OF_STUDY = ["Engineering", "Medicine", "Business", "Computer Science", "Arts", "Science", "Law", "Education", "Mathematics"]
+DEGREE_LEVELS = ["Undergraduate", "Postgraduate", "PhD"]
+COUNTRIES = ["India", "USA", "UK", "Canada", "Australia", "Germany", "Other"]
+
 @dataclass
 class Scholarship:
     id: str
@@ -26,4 +32,6 @@ class StudentProfile:
     country: str
     financial_need: str
     achievements: List[str]
-    interests: List[str] 
\ No newline at end of file
+    interests: List[str]
+    gender: Optional[str] = None  # matched against scholarship gender_eligibility
+    cgpa: Optional[float] = None  # 10.0 scale 
\ No newline at end of file
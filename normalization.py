@@ -0,0 +1,156 @@
+import hashlib
+import re
+from typing import Dict, List, Optional, Tuple
+
+# Scales a requirement can be expressed in
+SCALE_GPA_4 = "gpa_4"
+SCALE_CGPA_10 = "cgpa_10"
+SCALE_PERCENTAGE = "percentage"
+
+# Same conversion the sidebar uses: GPA (4.0) = CGPA (10.0) / 2.5
+CGPA_PER_GPA_POINT = 2.5
+# Percentage marks are mapped onto the 10-point CGPA scale
+PERCENT_PER_CGPA_POINT = 10.0
+
+GENDER_VALUES = {"All", "Male", "Female", "Other", "Prefer not to say"}
+REQUIRED_FIELDS = [
+    "scholarship_name", "providing_body", "degree_level", "field_of_study",
+    "gender_eligibility", "brief_description", "link",
+]
+
+_NUMBER = r"(\d+(?:\.\d+)?)"
+_CGPA_PATTERNS = [
+    re.compile(_NUMBER + r"\s*(?:/\s*10(?:\.0+)?\s*)?(?:CGPA|CPI)", re.IGNORECASE),
+    re.compile(r"(?:CGPA|CPI)\s*(?:of\s*|:\s*)?" + _NUMBER, re.IGNORECASE),
+]
+_GPA_PATTERNS = [
+    re.compile(_NUMBER + r"\s*(?:/\s*4(?:\.0+)?\s*)?(?<![A-Z])GPA", re.IGNORECASE),
+    re.compile(r"(?<![A-Z])GPA\s*(?:of\s*|:\s*)?" + _NUMBER, re.IGNORECASE),
+]
+_PERCENT_PATTERN = re.compile(_NUMBER + r"\s*(?:%|percent\b)", re.IGNORECASE)
+
+
+def _first_number(patterns, text: str) -> Optional[float]:
+    for pattern in patterns:
+        match = pattern.search(text)
+        if match:
+            return float(match.group(1))
+    return None
+
+
+def parse_requirement(value) -> Dict:
+    """Parse a GPA/CGPA requirement (number or prose) into numeric floors"""
+    parsed = {
+        "min_gpa": None,
+        "min_cgpa": None,
+        "min_percentage": None,
+        "requirement_scale": None,
+    }
+    if value is None or isinstance(value, bool):
+        return parsed
+
+    if isinstance(value, (int, float)):
+        number = float(value)
+        # Bare numbers are read by magnitude: 4.0 scale, 10.0 scale, then percentage
+        if number <= 4.0:
+            parsed.update(min_gpa=number, requirement_scale=SCALE_GPA_4)
+        elif number <= 10.0:
+            parsed.update(min_cgpa=number, requirement_scale=SCALE_CGPA_10)
+        elif number <= 100.0:
+            parsed.update(min_percentage=number, min_cgpa=round(number / PERCENT_PER_CGPA_POINT, 2),
+                          requirement_scale=SCALE_PERCENTAGE)
+        return parsed
+
+    text = str(value)
+    cgpa = _first_number(_CGPA_PATTERNS, text)
+    if cgpa is not None and cgpa <= 10.0:
+        parsed.update(min_cgpa=cgpa, requirement_scale=SCALE_CGPA_10)
+        return parsed
+
+    gpa = _first_number(_GPA_PATTERNS, text)
+    if gpa is not None:
+        if gpa <= 4.0:
+            parsed.update(min_gpa=gpa, requirement_scale=SCALE_GPA_4)
+        elif gpa <= 10.0:
+            parsed.update(min_cgpa=gpa, requirement_scale=SCALE_CGPA_10)
+        return parsed
+
+    percentage = _first_number([_PERCENT_PATTERN], text)
+    if percentage is not None and percentage <= 100.0:
+        parsed.update(min_percentage=percentage, min_cgpa=round(percentage / PERCENT_PER_CGPA_POINT, 2),
+                      requirement_scale=SCALE_PERCENTAGE)
+    return parsed
+
+
+def numeric_requirement(value) -> Optional[float]:
+    """Return the requirement as a float, or None when it isn't a number"""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return float(value)
+
+
+def make_scholarship_id(scholarship: Dict) -> str:
+    """Stable id derived from the scholarship's name and provider"""
+    key = f"{scholarship.get('scholarship_name', '')}|{scholarship.get('providing_body', '')}"
+    return "SCH_" + hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+
+
+def is_normalized(scholarship: Dict) -> bool:
+    return "requirement_scale" in scholarship and "id" in scholarship
+
+
+def normalize_scholarship(scholarship: Dict) -> Dict:
+    """Return a copy with typed requirement floors; the original text is kept in gpa_requirement"""
+    record = dict(scholarship)
+    record.setdefault("id", make_scholarship_id(record))
+    for key in ("degree_level", "field_of_study", "engineering_discipline"):
+        if isinstance(record.get(key), str):
+            record[key] = [part.strip() for part in record[key].split(",") if part.strip()]
+    record.setdefault("gender_eligibility", "All")
+
+    parsed = parse_requirement(record.get("gpa_requirement"))
+    # An explicit cgpa_requirement wins over one parsed from the GPA prose
+    cgpa = parse_requirement(record.get("cgpa_requirement"))
+    if cgpa["requirement_scale"] is not None:
+        if cgpa["requirement_scale"] == SCALE_GPA_4:
+            # cgpa_requirement values are on the 10-point scale even when small
+            cgpa.update(min_cgpa=cgpa["min_gpa"], min_gpa=None, requirement_scale=SCALE_CGPA_10)
+        parsed["min_cgpa"] = cgpa["min_cgpa"]
+        parsed["min_percentage"] = cgpa["min_percentage"] or parsed["min_percentage"]
+        parsed["requirement_scale"] = parsed["requirement_scale"] or cgpa["requirement_scale"]
+    record.update(parsed)
+    return record
+
+
+def validate_scholarship(record: Dict) -> List[str]:
+    """Problems that would make a normalized record unusable at query time"""
+    name = record.get("scholarship_name", "<unnamed>")
+    errors = []
+    for key in REQUIRED_FIELDS:
+        if not record.get(key):
+            errors.append(f"{name}: missing {key}")
+    for key in ("degree_level", "field_of_study"):
+        if key in record and not isinstance(record[key], list):
+            errors.append(f"{name}: {key} must be a list")
+    if record.get("gender_eligibility") not in GENDER_VALUES:
+        errors.append(f"{name}: unknown gender_eligibility {record.get('gender_eligibility')!r}")
+    for key, upper in (("min_gpa", 4.0), ("min_cgpa", 10.0), ("min_percentage", 100.0)):
+        value = record.get(key)
+        if value is not None and not 0.0 <= value <= upper:
+            errors.append(f"{name}: {key}={value} outside 0-{upper}")
+    return errors
+
+
+def normalize_catalog(scholarships: List[Dict]) -> Tuple[List[Dict], List[str]]:
+    """Normalize every record; returns the records and any validation errors"""
+    normalized = []
+    errors = []
+    seen_ids = set()
+    for scholarship in scholarships:
+        record = normalize_scholarship(scholarship)
+        errors.extend(validate_scholarship(record))
+        if record["id"] in seen_ids:
+            errors.append(f"{record.get('scholarship_name')}: duplicate id {record['id']}")
+        seen_ids.add(record["id"])
+        normalized.append(record)
+    return normalized, errors
@@ -0,0 +1,145 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+
+class PrefetchJob:
+    def __init__(self, key: str):
+        """Text being generated in the background; readers can replay it while it grows"""
+        self.key = key
+        self.parts = []
+        self.done = False
+        self.finished_at: Optional[float] = None
+        self.error: Optional[Exception] = None
+        self.future = None
+        self._condition = threading.Condition()
+
+    def _run(self, stream_factory: Callable[[], Iterable[str]]):
+        try:
+            for text in stream_factory():
+                with self._condition:
+                    self.parts.append(text)
+                    self._condition.notify_all()
+        except Exception as e:
+            self.error = e
+        finally:
+            with self._condition:
+                self.finished_at = time.monotonic()
+                self.done = True
+                self._condition.notify_all()
+
+    def text(self) -> str:
+        """Everything generated so far"""
+        with self._condition:
+            return "".join(self.parts)
+
+    def stream(self, timeout: Optional[float] = None) -> Iterator[str]:
+        """Chunks generated so far, then new ones as they arrive; re-raises a generation error"""
+        index = 0
+        while True:
+            with self._condition:
+                if not self._condition.wait_for(lambda: self.done or len(self.parts) > index, timeout):
+                    raise TimeoutError(f"No new text for {self.key} within {timeout}s")
+                chunks = self.parts[index:]
+                index = len(self.parts)
+                finished = self.done
+            yield from chunks
+            if finished:
+                if self.error is not None:
+                    raise self.error
+                return
+
+
+class Prefetcher:
+    def __init__(self, max_workers: int = 2, max_pending: int = 16, max_jobs: int = 64,
+                 ttl_seconds: float = 24 * 3600):
+        """Bounded background executor for LLM generations, one job per key.
+
+        A finished job is handed out once and then forgotten, so later reads go through the
+        response cache and its TTL; one nobody reads is dropped after ttl_seconds.
+        """
+        self.max_pending = max_pending
+        self.max_jobs = max_jobs
+        self.ttl_seconds = ttl_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        self._jobs = OrderedDict()  # key -> PrefetchJob, oldest first
+        self._lock = threading.Lock()
+
+        self.submitted = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self.expired = 0
+
+    def submit(self, key: str, stream_factory: Callable[[], Iterable[str]]) -> Optional[PrefetchJob]:
+        """Start generating key in the background; returns None when the queue is full"""
+        with self._lock:
+            self._drop_expired()
+            job = self._jobs.get(key)
+            # Only a generation still running is shared; a finished one may be stale or failed
+            if job is not None and not job.done:
+                self.coalesced += 1
+                return job
+            if self._pending() >= self.max_pending:
+                self.rejected += 1
+                return None
+
+            job = PrefetchJob(key)
+            self._jobs[key] = job
+            self._jobs.move_to_end(key)
+            self.submitted += 1
+            # Forget the oldest finished jobs; their text is in the response cache by now
+            for old_key in [k for k, j in self._jobs.items() if j.done][:max(0, len(self._jobs) - self.max_jobs)]:
+                del self._jobs[old_key]
+        job.future = self._executor.submit(job._run, stream_factory)
+        return job
+
+    def get(self, key: str) -> Optional[PrefetchJob]:
+        """Running job for key, or its finished one once; failed and expired jobs are dropped so the caller retries"""
+        with self._lock:
+            self._drop_expired()
+            job = self._jobs.get(key)
+            if job is None or not job.done:
+                return job
+            del self._jobs[key]
+            return job if job.error is None else None
+
+    def _drop_expired(self):
+        now = time.monotonic()
+        for key in [k for k, j in self._jobs.items() if j.done and now - j.finished_at > self.ttl_seconds]:
+            del self._jobs[key]
+            self.expired += 1
+
+    def _pending(self) -> int:
+        return sum(1 for job in self._jobs.values() if not job.done)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "pending": self._pending(),
+                "jobs": len(self._jobs),
+                "submitted": self.submitted,
+                "coalesced": self.coalesced,
+                "rejected": self.rejected,
+                "expired": self.expired,
+            }
+
+
+_prefetcher: Optional[Prefetcher] = None
+_prefetcher_lock = threading.Lock()
+
+
+def get_prefetcher() -> Prefetcher:
+    """Process-wide prefetcher shared by every session"""
+    global _prefetcher
+    if _prefetcher is None:
+        with _prefetcher_lock:
+            if _prefetcher is None:
+                _prefetcher = Prefetcher(
+                    max_workers=int(os.getenv("PREFETCH_WORKERS", 2)),
+                    # Same lifetime as a cached response, so a prefetched answer is never older than one
+                    ttl_seconds=float(os.getenv("LLM_CACHE_TTL_SECONDS", 24 * 3600)),
+                )
+    return _prefetcher
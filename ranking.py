@@ -0,0 +1,76 @@
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from columnar import ColumnarCatalog
+from eligibility import FAIL_CGPA, FAIL_DEGREE, FAIL_FIELD, FAIL_GENDER, FAIL_GPA
+
+# Points out of 100: passing the checks dominates, the rest prefers scholarships aimed squarely at the profile
+CHECKS_WEIGHT = 70.0
+FIELD_FOCUS_WEIGHT = 15.0
+DEGREE_FOCUS_WEIGHT = 5.0
+GENDER_MATCH_WEIGHT = 5.0
+REQUIREMENT_MET_WEIGHT = 5.0
+
+
+def match_scores(columns: ColumnarCatalog, profile: Dict, ids: np.ndarray, failures: np.ndarray) -> np.ndarray:
+    """0-100 match score of records ids (with their failure bitmasks) for a profile, as whole-array math"""
+    has_gpa = ~np.isnan(columns.floors['min_gpa'][ids])
+    has_cgpa = ~np.isnan(columns.floors['min_cgpa'][ids])
+
+    applicable = 3 + has_gpa.astype(np.int32) + has_cgpa
+    failed = np.unpackbits(failures.astype(np.uint8)[:, None], axis=1).sum(axis=1)
+    scores = CHECKS_WEIGHT * (applicable - failed) / applicable
+
+    # A scholarship for one field (or degree level) beats one spread over many
+    field_counts = np.maximum(np.diff(columns.multi_columns['field_of_study'].offsets)[ids], 1)
+    scores += np.where(failures & FAIL_FIELD, 0.0, FIELD_FOCUS_WEIGHT / field_counts)
+    degree_counts = np.maximum(np.diff(columns.multi_columns['degree_level'].offsets)[ids], 1)
+    scores += np.where(failures & FAIL_DEGREE, 0.0, DEGREE_FOCUS_WEIGHT / degree_counts)
+
+    # Reserved for the student's gender, so fewer applicants compete for it
+    reserved = columns.gender_codes[ids] != columns.gender_vocabulary.code("All")
+    scores += GENDER_MATCH_WEIGHT * (reserved & ~(failures & FAIL_GENDER).astype(bool))
+
+    met = np.zeros(len(ids), dtype=bool)
+    if profile.get('gpa') is not None:
+        met |= has_gpa & ~(failures & FAIL_GPA).astype(bool)
+    if profile.get('cgpa') is not None:
+        met |= has_cgpa & ~(failures & FAIL_CGPA).astype(bool)
+    scores += REQUIREMENT_MET_WEIGHT * met
+    return scores.astype(np.float32)
+
+
+def scholarship_name(columns: ColumnarCatalog, row: int) -> str:
+    """Just the name of a record, without rebuilding the whole row"""
+    return columns.strings.get(int(columns.string_columns['name'][row])) or ""
+
+
+class RankedResults:
+    def __init__(self, ids: np.ndarray, scores: np.ndarray):
+        """Records to show (ids) ranked by their scores (same order); only rows up to the requested page are ever ordered"""
+        self.ids = ids
+        self.scores = scores
+
+    def __len__(self):
+        return len(self.ids)
+
+    def pages(self, page_size: int) -> int:
+        return max(1, -(-len(self.ids) // page_size))
+
+    def page(self, page: int, page_size: int) -> List[Tuple[int, float]]:
+        """(record id, score) for one page, best first; ties keep catalog order.
+
+        np.partition finds the score of the last row on the page in linear time, and only rows
+        scoring at least that much are sorted.
+        """
+        k = min((page + 1) * page_size, len(self.ids))
+        if page * page_size >= k:
+            return []
+        # Every row tied with the k-th best is kept, so ties at the cut are still broken by id
+        kth = np.partition(self.scores, len(self.scores) - k)[len(self.scores) - k]
+        candidates = np.flatnonzero(self.scores >= kth)
+        order = np.lexsort((self.ids[candidates], -self.scores[candidates]))
+        top = candidates[order[page * page_size:k]]
+        return [(int(self.ids[i]), round(float(self.scores[i]))) for i in top]
+
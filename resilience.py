@@ -0,0 +1,323 @@
+import os
+import queue
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+from metrics import get_timings
+
+try:
+    from google.api_core import exceptions as google_exceptions
+except ImportError:  # only needed to classify Gemini errors
+    google_exceptions = None
+
+# Total time budget per call type, retries and backoff included
+DEFAULT_BUDGETS = {
+    "chat": 60.0,
+    "recommendations": 90.0,
+    "tool": 30.0,
+    "summary": 30.0,
+}
+DEFAULT_BUDGET = 60.0
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class ResilienceError(Exception):
+    """Base class for calls refused or abandoned by the resilience layer"""
+
+
+class CircuitOpenError(ResilienceError):
+    """The upstream is unhealthy; the call was not attempted"""
+
+
+class DeadlineExceededError(ResilienceError, TimeoutError):
+    """The call's time budget ran out"""
+
+
+def is_transient(error: Exception) -> bool:
+    """Errors worth retrying and counting against the upstream's health"""
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    if google_exceptions is not None and isinstance(error, (
+        google_exceptions.TooManyRequests,
+        google_exceptions.ServiceUnavailable,
+        google_exceptions.InternalServerError,
+        google_exceptions.DeadlineExceeded,
+    )):
+        return True
+    return False
+
+
+class Deadline:
+    def __init__(self, seconds: float):
+        """Absolute time budget shared by every attempt of one call"""
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """Opens after failure_threshold transient failures in a row; after reset_timeout one trial call is let through"""
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+            self._trial_in_flight = False
+        return self._state
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    self.times_opened += 1
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+
+def _run_in_thread(fn: Callable, name: str) -> Future:
+    """Run fn on its own daemon thread so a hung upstream call can be abandoned at the deadline"""
+    future = Future()
+
+    def target():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=target, name=name, daemon=True).start()
+    return future
+
+
+class ResilientCaller:
+    def __init__(self, breaker: Optional[CircuitBreaker] = None, max_attempts: int = 3, base_delay: float = 0.5,
+                 max_delay: float = 8.0, budgets: Optional[Dict[str, float]] = None):
+        """Deadline budgets, jittered exponential retry and a circuit breaker around upstream LLM calls"""
+        self.breaker = breaker or CircuitBreaker()
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budgets = dict(DEFAULT_BUDGETS, **(budgets or {}))
+        self._counters = defaultdict(lambda: defaultdict(int))
+        self._lock = threading.Lock()
+
+    def _count(self, call_type: str, name: str):
+        with self._lock:
+            self._counters[call_type][name] += 1
+
+    def deadline_for(self, call_type: str, timeout: Optional[float] = None) -> Deadline:
+        return Deadline(timeout if timeout is not None else self.budgets.get(call_type, DEFAULT_BUDGET))
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff before retry number attempt (1-based)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def _admit(self, call_type: str):
+        if not self.breaker.allow():
+            self._count(call_type, "short_circuited")
+            raise CircuitOpenError("LLM upstream is unhealthy; failing fast")
+
+    def _failed(self, call_type: str, error: Exception, attempt: int, deadline: Deadline) -> bool:
+        """Record a failed attempt; True if it should be retried"""
+        transient = is_transient(error)
+        if transient:
+            self.breaker.record_failure()
+        else:
+            # The upstream answered (e.g. a bad request), so it isn't held against its health
+            self.breaker.record_success()
+        if isinstance(error, DeadlineExceededError):
+            self._count(call_type, "deadline_exceeded")
+        if not transient or attempt >= self.max_attempts:
+            self._count(call_type, "failures")
+            return False
+        delay = self.backoff(attempt)
+        if delay >= deadline.remaining():
+            self._count(call_type, "failures")
+            return False
+        self._count(call_type, "retries")
+        time.sleep(delay)
+        return True
+
+    def _abandon(self, call_type: str, attempt: Future, on_abandon: Optional[Callable[[Future], None]]):
+        """Leave a still-running attempt behind; on_abandon can track it until it really finishes"""
+        self._count(call_type, "abandoned")
+        if on_abandon is not None:
+            on_abandon(attempt)
+
+    def call(self, fn: Callable, call_type: str = "default", timeout: Optional[float] = None,
+             on_abandon: Optional[Callable[[Future], None]] = None):
+        """fn() with retries inside the call type's deadline budget.
+
+        An attempt that outlives the deadline can't be stopped, only abandoned: on_abandon gets its
+        future, e.g. so admission control keeps counting it until the upstream lets go.
+        """
+        deadline = self.deadline_for(call_type, timeout)
+        self._count(call_type, "calls")
+        started = time.perf_counter()
+        attempt = 0
+        while True:
+            self._admit(call_type)
+            attempt += 1
+            future = _run_in_thread(fn, f"llm-{call_type}")
+            try:
+                result = future.result(timeout=deadline.remaining())
+            except Exception as e:
+                if not future.done():
+                    # Cancelling only works if the attempt hasn't started; otherwise it runs on unattended
+                    if not future.cancel():
+                        self._abandon(call_type, future, on_abandon)
+                    e = DeadlineExceededError(f"{call_type} call exceeded its {deadline.seconds:g}s budget")
+                if self._failed(call_type, e, attempt, deadline):
+                    continue
+                raise e
+            self.breaker.record_success()
+            self._count(call_type, "successes")
+            get_timings().record(f"llm.{call_type}", time.perf_counter() - started)
+            return result
+
+    def stream(self, factory: Callable[[], Iterable], call_type: str = "default",
+               timeout: Optional[float] = None, on_abandon: Optional[Callable[[Future], None]] = None) -> Iterator:
+        """Chunks of factory()'s stream within the deadline budget; retried only until the first chunk arrives.
+
+        on_abandon gets a future that resolves when the upstream stream of an abandoned attempt
+        (deadline, error or a reader that stopped early) has actually ended; see call().
+        """
+        deadline = self.deadline_for(call_type, timeout)
+        self._count(call_type, "calls")
+        started = time.perf_counter()
+        attempt = 0
+        while True:
+            self._admit(call_type)
+            attempt += 1
+            chunks = queue.Queue()
+            stop = threading.Event()
+            finished = Future()
+
+            def pump():
+                outcome = ("done", None)
+                try:
+                    for chunk in factory():
+                        if stop.is_set():
+                            return
+                        chunks.put(("chunk", chunk))
+                except BaseException as e:
+                    outcome = ("error", e)
+                finally:
+                    # Resolved before the reader hears the outcome, so a finished stream is never "abandoned"
+                    finished.set_result(None)
+                chunks.put(outcome)
+
+            threading.Thread(target=pump, name=f"llm-{call_type}-stream", daemon=True).start()
+            received = 0
+            try:
+                while True:
+                    try:
+                        kind, value = chunks.get(timeout=deadline.remaining())
+                    except queue.Empty:
+                        raise DeadlineExceededError(f"{call_type} stream exceeded its {deadline.seconds:g}s budget")
+                    if kind == "error":
+                        raise value
+                    if kind == "done":
+                        break
+                    received += 1
+                    yield value
+            except GeneratorExit:
+                # The reader stopped early; the upstream was answering, so free a half-open trial
+                self.breaker.record_success()
+                raise
+            except Exception as e:
+                stop.set()
+                # Once text has reached the caller a retry would repeat it
+                if received == 0 and self._failed(call_type, e, attempt, deadline):
+                    continue
+                if received:
+                    if is_transient(e):
+                        self.breaker.record_failure()
+                    else:
+                        self.breaker.record_success()
+                    self._count(call_type, "failures")
+                raise
+            finally:
+                stop.set()
+                if not finished.done():
+                    self._abandon(call_type, finished, on_abandon)
+            self.breaker.record_success()
+            self._count(call_type, "successes")
+            get_timings().record(f"llm.{call_type}", time.perf_counter() - started)
+            return
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counters = {call_type: dict(counts) for call_type, counts in self._counters.items()}
+        for call_type, counts in counters.items():
+            counts["latency"] = get_timings().summary(f"llm.{call_type}")
+        return {
+            "breaker_state": self.breaker.state,
+            "breaker_opened": self.breaker.times_opened,
+            "calls": counters,
+        }
+
+
+_caller: Optional[ResilientCaller] = None
+_caller_lock = threading.Lock()
+
+
+def get_resilient_caller() -> ResilientCaller:
+    """Process-wide resilience layer, so every session shares one view of the upstream's health"""
+    global _caller
+    if _caller is None:
+        with _caller_lock:
+            if _caller is None:
+                _caller = ResilientCaller(
+                    breaker=CircuitBreaker(
+                        failure_threshold=int(os.getenv("LLM_BREAKER_FAILURES", 5)),
+                        reset_timeout=float(os.getenv("LLM_BREAKER_RESET_SECONDS", 30)),
+                    ),
+                    max_attempts=int(os.getenv("LLM_MAX_ATTEMPTS", 3)),
+                )
+    return _caller
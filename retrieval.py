@@ -0,0 +1,230 @@
+import math
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from catalog import ScholarshipCatalog, get_catalog
+from columnar import ColumnarCatalog
+from metrics import get_timings
+
+# Indexed text, as (column, weight); a term in the name counts three times as much as one in the description
+TEXT_FIELDS = [("name", 3.0), ("provider", 1.0), ("description", 1.0)]
+FACET_FIELDS = [("field_of_study", 2.0), ("discipline", 2.0)]
+
+# Words that say what kind of answer is wanted rather than what it is about
+QUERY_STOPWORDS = {
+    "a", "an", "the", "is", "are", "am", "i", "me", "my", "for", "to", "of", "in", "on", "and", "or", "do",
+    "does", "what", "which", "can", "you", "your", "with", "be", "it", "this", "that", "there", "any", "some",
+    "please", "about", "need", "want", "get", "give", "show", "list", "find", "search", "tell", "who", "when",
+    "how", "scholarship", "scholarships", "student", "students", "available", "database", "deadline", "link",
+    "provide", "provides", "offer", "offers", "study", "studying",
+}
+
+DEGREE_PATTERNS = [
+    (r"\b(phd|ph\.d|doctoral|doctorate)\b", "PhD"),
+    (r"\b(postgraduates?|post-graduates?|masters?|m\.?tech|mba|pg)\b", "Postgraduate"),
+    (r"\b(undergraduates?|under-graduates?|ug|b\.?tech|bachelors?|degree students?)\b", "Undergraduate"),
+]
+FEMALE_PATTERN = r"\b(women|woman|girls?|female)\b"
+
+
+def analyze(text: str) -> List[str]:
+    """Lowercased word terms with plural 's' stripped, so "engineers" finds "engineer" """
+    terms = []
+    for word in re.findall(r"[a-z0-9]+", text.lower()):
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        terms.append(word)
+    return terms
+
+
+def extract_facets(text: str, columns: ColumnarCatalog) -> Dict[str, str]:
+    """Degree level, field/discipline and gender mentioned in a question, in catalog vocabulary"""
+    lowered = text.lower()
+    facets = {}
+    for pattern, degree in DEGREE_PATTERNS:
+        if re.search(pattern, lowered):
+            facets["degree_level"] = degree
+            break
+    if re.search(FEMALE_PATTERN, lowered):
+        facets["gender"] = "Female"
+    # Longest vocabulary entries first, so "Computer Science" wins over "Science"; a matched
+    # phrase is consumed so "data science" doesn't also count as the field "Science"
+    for key in ("discipline", "field_of_study"):
+        vocabulary = sorted(columns.multi_columns[key].vocabulary.strings, key=len, reverse=True)
+        for value in vocabulary:
+            pattern = rf"\b{re.escape(value.lower())}\b"
+            if re.search(pattern, lowered):
+                facets[key] = value
+                lowered = re.sub(pattern, " ", lowered)
+                break
+    return facets
+
+
+def facet_mask(columns: ColumnarCatalog, facets: Dict[str, str]) -> np.ndarray:
+    """Rows matching every facet; a gender facet keeps only scholarships reserved for that gender"""
+    mask = np.ones(len(columns), dtype=bool)
+    if "degree_level" in facets:
+        mask &= columns.degree_mask(facets["degree_level"])
+    if "field_of_study" in facets:
+        mask &= columns.field_mask(facets["field_of_study"])
+    if "discipline" in facets:
+        mask &= columns.multi_columns["discipline"].contains(facets["discipline"])
+    if "gender" in facets:
+        mask &= columns.gender_codes == columns.gender_vocabulary.code(facets["gender"])
+    return mask
+
+
+class BM25Index:
+    def __init__(self, columns: ColumnarCatalog, k1: float = 1.5, b: float = 0.75):
+        """Inverted index with precomputed BM25 weights; a query just sums the postings of its terms"""
+        self.columns = columns
+        self.size = len(columns)
+        documents = []
+        for row in range(self.size):
+            counts = Counter()
+            for column, weight in TEXT_FIELDS:
+                for term in analyze(columns.strings.get(int(columns.string_columns[column][row])) or ""):
+                    counts[term] += weight
+            for column, weight in FACET_FIELDS:
+                for value in columns.multi_columns[column].values(row):
+                    for term in analyze(value):
+                        counts[term] += weight
+            documents.append(counts)
+
+        lengths = np.array([sum(counts.values()) for counts in documents], dtype=np.float32)
+        average_length = float(lengths.mean()) if self.size else 1.0
+        postings = defaultdict(list)
+        for row, counts in enumerate(documents):
+            for term, tf in counts.items():
+                postings[term].append((row, tf))
+
+        # term -> (rows, BM25 weights) as NumPy arrays
+        self.postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for term, entries in postings.items():
+            rows = np.array([row for row, _ in entries], dtype=np.int32)
+            tf = np.array([tf for _, tf in entries], dtype=np.float32)
+            idf = math.log(1 + (self.size - len(entries) + 0.5) / (len(entries) + 0.5))
+            norm = k1 * (1 - b + b * lengths[rows] / average_length)
+            self.postings[term] = (rows, (idf * tf * (k1 + 1) / (tf + norm)).astype(np.float32))
+
+    def query_terms(self, text: str) -> List[str]:
+        """Distinct query terms the index knows about"""
+        terms = [t for t in analyze(text) if t not in QUERY_STOPWORDS and t in self.postings]
+        return list(dict.fromkeys(terms))
+
+    def scores(self, text: str) -> np.ndarray:
+        scores = np.zeros(self.size, dtype=np.float32)
+        for term in self.query_terms(text):
+            rows, weights = self.postings[term]
+            scores[rows] += weights
+        return scores
+
+
+class SearchResult:
+    def __init__(self, columns: ColumnarCatalog, facets: Dict[str, str], candidates: int,
+                 hits: List[Tuple[int, float]]):
+        """Top rows for one query, best first; candidates is how many rows passed the facet filter"""
+        self.columns = columns
+        self.facets = facets
+        self.candidates = candidates
+        self.hits = hits
+
+    @property
+    def rows(self) -> List[int]:
+        return [row for row, _ in self.hits]
+
+    def records(self) -> List[Dict]:
+        return [self.columns[row] for row in self.rows]
+
+    def snippets(self) -> str:
+        """One compact line per hit, small enough to put in a prompt"""
+        return "\n".join(snippet(record) for record in self.records())
+
+    def __len__(self):
+        return len(self.hits)
+
+
+def snippet(scholarship: Dict, description_chars: int = 120) -> str:
+    description = scholarship['brief_description'] or ""
+    if len(description) > description_chars:
+        description = description[:description_chars].rsplit(" ", 1)[0] + "…"
+    return (f"- {scholarship['scholarship_name']} ({scholarship['providing_body']}): "
+            f"{', '.join(scholarship['degree_level'])}; {', '.join(scholarship['field_of_study'])}; "
+            f"gender {scholarship['gender_eligibility']}; requires {scholarship['gpa_requirement']}; "
+            f"deadline {scholarship['deadline']}; {scholarship['link']}. {description}")
+
+
+class CatalogRetriever:
+    def __init__(self, catalog: Optional[ScholarshipCatalog] = None):
+        """BM25 search over the catalog, rebuilt when the catalog reloads"""
+        self.catalog = catalog or get_catalog()
+        self._index: Optional[BM25Index] = None
+        self._lock = threading.Lock()
+        self.builds = 0
+        self.last_build_seconds = 0.0
+
+    def index(self) -> BM25Index:
+        columns = self.catalog.scholarships
+        index = self._index
+        if index is None or index.columns is not columns:
+            with self._lock:
+                if self._index is None or self._index.columns is not columns:
+                    started = time.perf_counter()
+                    self._index = BM25Index(columns)
+                    self.last_build_seconds = time.perf_counter() - started
+                    self.builds += 1
+                index = self._index
+        return index
+
+    def search(self, query: str, k: int = 5, use_facets: bool = True) -> SearchResult:
+        """Top-k rows for query, restricted to the degree level, field and gender it mentions.
+
+        Every row passing the facet filter qualifies, ranked by BM25; without facets a row needs
+        at least one matching term.
+        """
+        started = time.perf_counter()
+        index = self.index()
+        columns = index.columns
+        facets = extract_facets(query, columns) if use_facets else {}
+        mask = facet_mask(columns, facets)
+        candidates = np.flatnonzero(mask)
+
+        scores = index.scores(query)
+        if not facets:
+            candidates = candidates[scores[candidates] > 0]
+        # argpartition keeps this O(n) however large the catalog gets
+        if len(candidates) > k:
+            top = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        else:
+            top = candidates
+        hits = sorted(((int(row), float(scores[row])) for row in top), key=lambda hit: (-hit[1], hit[0]))
+        get_timings().record("retrieval.search", time.perf_counter() - started)
+        return SearchResult(columns, facets, len(candidates), hits)
+
+    def stats(self) -> Dict:
+        index = self._index
+        return {
+            "terms": len(index.postings) if index else 0,
+            "builds": self.builds,
+            "last_build_ms": round(self.last_build_seconds * 1000, 2),
+            "search": get_timings().summary("retrieval.search"),
+        }
+
+
+_retriever: Optional[CatalogRetriever] = None
+_retriever_lock = threading.Lock()
+
+
+def get_retriever() -> CatalogRetriever:
+    """Process-wide retriever over the shared catalog"""
+    global _retriever
+    if _retriever is None:
+        with _retriever_lock:
+            if _retriever is None:
+                _retriever = CatalogRetriever()
+    return _retriever
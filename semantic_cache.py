@@ -0,0 +1,260 @@
+import hashlib
+import itertools
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from catalog import get_catalog
+from embedders import HashingEmbedder
+from llm_cache import DEFAULT_CACHE_PATH
+from retrieval import analyze, extract_facets
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS semantic_responses (
+    id INTEGER PRIMARY KEY,
+    question TEXT NOT NULL,
+    guard TEXT NOT NULL,
+    vector BLOB NOT NULL,
+    answer TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+"""
+
+# Spellings that mean the same thing to the cache; keys are analyze()d (plural 's' already stripped)
+SYNONYMS = {
+    "girl": "female", "women": "female", "woman": "female", "ladie": "female",
+    "ug": "undergraduate", "undergrad": "undergraduate", "bachelor": "undergraduate", "btech": "undergraduate",
+    "pg": "postgraduate", "master": "postgraduate", "mtech": "postgraduate", "postgrad": "postgraduate",
+    "doctoral": "phd", "doctorate": "phd",
+    "engineer": "engineering", "engg": "engineering",
+    "fellowship": "scholarship", "grant": "scholarship", "funding": "scholarship",
+}
+# Only function words are dropped; words like "deadline" or "how" change what is being asked
+STOPWORDS = {
+    "a", "an", "the", "is", "are", "am", "i", "me", "my", "for", "to", "of", "in", "on", "and", "or", "do",
+    "does", "can", "you", "your", "be", "there", "any", "some", "please", "tell", "show", "give", "list",
+    "find", "want", "need", "looking", "scholarship", "student", "available", "which", "what", "get", "about",
+    "with", "know",
+}
+# A follow-up using one of these only makes sense together with the conversation before it
+REFERRING_WORDS = {"it", "its", "that", "this", "those", "these", "them", "they", "one", "ones", "more", "else",
+                   "also", "above", "previous", "same", "another", "other", "again"}
+DEFAULT_THRESHOLD = 0.85
+NEAR_MISS_MARGIN = 0.1
+# Router stats name for answers served from this cache
+CACHE_ROUTE = "cache"
+
+SemanticHit = namedtuple("SemanticHit", ["entry_id", "question", "answer", "similarity"])
+
+
+def canonical_text(question: str) -> str:
+    """Content words with synonyms folded, e.g. "girls in engineering" -> "female engineering" """
+    words = (SYNONYMS.get(word, word) for word in analyze(question))
+    return " ".join(word for word in words if word not in STOPWORDS)
+
+
+def context_key(question: str, history: str) -> str:
+    """"" for a standalone question; otherwise a hash of the conversation it depends on"""
+    # "scholarships that fit ..." is a relative clause, not a reference back
+    words = set(re.findall(r"[a-z]+", re.sub(r"\b(\w+s) that\b", r"\1", question.lower())))
+    if not history or not REFERRING_WORDS & words:
+        return ""
+    return hashlib.sha256(history.encode("utf-8")).hexdigest()[:16]
+
+
+class SemanticCache:
+    def __init__(self, path: Optional[str] = DEFAULT_CACHE_PATH, threshold: float = DEFAULT_THRESHOLD,
+                 max_entries: int = 2000, ttl_seconds: float = 24 * 3600, embedder=None):
+        """Chat answers keyed by question meaning: a paraphrase above threshold cosine is a hit.
+
+        A hit also needs the same degree level, gender, field and numbers as the cached question, and a
+        follow-up question only matches after the same conversation. Standalone answers are persisted
+        in SQLite next to the response cache; follow-up ones live in memory only.
+        """
+        self.path = path
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.embedder = embedder or HashingEmbedder(dim=1024, bigrams=False, stopwords=frozenset())
+
+        # Row i of _vectors belongs to _entries[i]
+        self._vectors = np.zeros((0, self.embedder.dim), dtype=np.float32)
+        self._entries: List[Dict] = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+        self.lookups = 0
+        self.hits = 0
+        self.misses = 0
+        self.near_misses = 0
+        self.guard_rejections = 0
+        self.false_hits = 0
+        self.stores = 0
+        self.hit_similarity_total = 0.0
+
+        if self.path:
+            self._connection().executescript(SCHEMA)
+            self._load()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    def _load(self):
+        """Warm the in-memory index with the newest unexpired standalone answers"""
+        rows = self._connection().execute(
+            "SELECT id, question, guard, vector, answer, created_at FROM semantic_responses "
+            "WHERE created_at >= ? ORDER BY created_at DESC LIMIT ?",
+            (time.time() - self.ttl_seconds, self.max_entries),
+        ).fetchall()
+        vectors = []
+        for entry_id, question, guard, vector, answer, created_at in reversed(rows):
+            self._entries.append({"id": entry_id, "scope": "", "question": question, "guard": guard,
+                                  "answer": answer, "created_at": created_at, "last_access": created_at})
+            vectors.append(np.frombuffer(vector, dtype=np.float32))
+        if vectors:
+            self._vectors = np.vstack(vectors)
+            self._ids = itertools.count(max(entry["id"] for entry in self._entries) + 1)
+
+    def _guard(self, question: str) -> str:
+        """What must match exactly for a hit: the catalog facets and any numbers (GPA, year) in the question"""
+        facets = extract_facets(question, get_catalog().scholarships)
+        numbers = re.findall(r"\d+(?:\.\d+)?", question)
+        return json.dumps([sorted(facets.items()), numbers])
+
+    def _embed(self, question: str) -> np.ndarray:
+        return self.embedder.embed([canonical_text(question)])[0]
+
+    def lookup(self, question: str, history: str = "") -> Optional[SemanticHit]:
+        """Cached answer to a near-duplicate question asked in the same context, or None"""
+        scope = context_key(question, history)
+        vector = self._embed(question)
+        guard = self._guard(question)
+        now = time.time()
+        with self._lock:
+            self.lookups += 1
+            if not self._entries:
+                self.misses += 1
+                return None
+            similarities = self._vectors @ vector
+            in_scope = np.array([e["scope"] == scope and now - e["created_at"] <= self.ttl_seconds
+                                 for e in self._entries])
+            similarities[~in_scope] = -1.0
+            # Best guarded match above the threshold; the nearest one may be for another degree level etc.
+            for row in np.argsort(-similarities):
+                similarity = float(similarities[row])
+                if similarity < self.threshold:
+                    if similarity >= self.threshold - NEAR_MISS_MARGIN:
+                        self.near_misses += 1
+                    break
+                entry = self._entries[row]
+                if entry["guard"] != guard:
+                    self.guard_rejections += 1
+                    continue
+                entry["last_access"] = now
+                self.hits += 1
+                self.hit_similarity_total += similarity
+                return SemanticHit(entry["id"], entry["question"], entry["answer"], similarity)
+            self.misses += 1
+            return None
+
+    def store(self, question: str, history: str, answer: str) -> Optional[int]:
+        """Cache an answer under the context it was given in; returns its entry id (None if not cached)"""
+        scope = context_key(question, history)
+        if history and not scope:
+            # A standalone question answered mid-conversation may lean on (and leak) that conversation
+            return None
+        vector = self._embed(question)
+        now = time.time()
+        entry = {"id": next(self._ids), "scope": scope, "question": question, "guard": self._guard(question),
+                 "answer": answer, "created_at": now, "last_access": now}
+        with self._lock:
+            self._entries.append(entry)
+            self._vectors = np.vstack([self._vectors, vector])
+            self.stores += 1
+            if len(self._entries) > self.max_entries:
+                # Least recently used first
+                keep = np.argsort([-e["last_access"] for e in self._entries])[:self.max_entries]
+                keep.sort()
+                self._entries = [self._entries[i] for i in keep]
+                self._vectors = self._vectors[keep]
+        if self.path and not scope:
+            connection = self._connection()
+            with connection:
+                connection.execute(
+                    "INSERT INTO semantic_responses (id, question, guard, vector, answer, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (entry["id"], question, entry["guard"], vector.astype(np.float32).tobytes(), answer, now),
+                )
+                connection.execute("DELETE FROM semantic_responses WHERE created_at < ?", (now - self.ttl_seconds,))
+        return entry["id"]
+
+    def report_false_hit(self, entry_id: int):
+        """A user said a cached answer didn't fit their question: count it and drop the entry"""
+        with self._lock:
+            self.false_hits += 1
+            rows = [i for i, e in enumerate(self._entries) if e["id"] == entry_id]
+            if rows:
+                keep = np.ones(len(self._entries), dtype=bool)
+                keep[rows] = False
+                self._entries = [e for i, e in enumerate(self._entries) if keep[i]]
+                self._vectors = self._vectors[keep]
+        if self.path:
+            connection = self._connection()
+            with connection:
+                connection.execute("DELETE FROM semantic_responses WHERE id = ?", (entry_id,))
+
+    def clear(self):
+        with self._lock:
+            self._entries = []
+            self._vectors = np.zeros((0, self.embedder.dim), dtype=np.float32)
+        if self.path:
+            connection = self._connection()
+            with connection:
+                connection.execute("DELETE FROM semantic_responses")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / self.lookups, 3) if self.lookups else 0.0,
+                "avg_hit_similarity": round(self.hit_similarity_total / self.hits, 3) if self.hits else None,
+                "near_misses": self.near_misses,
+                "guard_rejections": self.guard_rejections,
+                "false_hits": self.false_hits,
+                "false_hit_rate": round(self.false_hits / self.hits, 3) if self.hits else 0.0,
+                "stores": self.stores,
+            }
+
+
+_cache: Optional[SemanticCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_semantic_cache() -> SemanticCache:
+    """Process-wide, so one student's question can answer another's paraphrase"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SemanticCache(
+                    path=os.getenv("LLM_CACHE_PATH", DEFAULT_CACHE_PATH),
+                    threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", DEFAULT_THRESHOLD)),
+                    ttl_seconds=float(os.getenv("LLM_CACHE_TTL_SECONDS", 24 * 3600)),
+                )
+    return _cache
@@ -0,0 +1,232 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+DEFAULT_SESSIONS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "chat_sessions.db")
+DEFAULT_SESSION = "default"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS chat_sessions (
+    session_id TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+class SessionMemoryPool:
+    def __init__(self, factory: Callable, max_sessions: int = 1000, max_tokens: int = 2_000_000,
+                 idle_seconds: float = 3600, path: Optional[str] = None, spill_ttl_seconds: float = 7 * 24 * 3600):
+        """One conversation memory per browser session, bounded in count and total tokens.
+
+        The least recently used sessions are evicted first, and sessions idle for idle_seconds
+        always are. With a path, evicted conversations are spilled to SQLite and restored when
+        their session comes back; without one they are dropped.
+        """
+        self.factory = factory
+        self.max_sessions = max_sessions
+        self.max_tokens = max_tokens
+        self.idle_seconds = idle_seconds
+        self.path = path
+        self.spill_ttl_seconds = spill_ttl_seconds
+
+        # session id -> [memory, last access, footprint in tokens], least recently used first
+        self._sessions: "OrderedDict[str, list]" = OrderedDict()
+        # Evicted but not yet written to SQLite; a request in between takes the memory back from here
+        self._spilling: Dict[str, object] = {}
+        # Sessions being read back from SQLite, so concurrent requests for one wait instead of starting over
+        self._restoring: Dict[str, threading.Event] = {}
+        self._tokens = 0
+        self._lock = threading.Lock()
+        # Serializes spill writes, so an older snapshot can never land after a newer one (or after drop())
+        self._spill_lock = threading.Lock()
+        self._local = threading.local()
+
+        self.created = 0
+        self.restored = 0
+        self.revived = 0
+        self.evicted_idle = 0
+        self.evicted_capacity = 0
+        self.spilled = 0
+
+        if self.path:
+            self._connection().executescript(SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    def get(self, session_id: Optional[str] = None):
+        """The session's memory: resident, restored from the spill store, or new"""
+        session_id = session_id or DEFAULT_SESSION
+        while True:
+            with self._lock:
+                memory = self._take(session_id)
+                if memory is not None:
+                    evicted = self._evict(time.time(), keep=session_id)
+                    break
+                restoring = self._restoring.get(session_id)
+                if restoring is None:
+                    restoring = self._restoring[session_id] = threading.Event()
+                    break
+            restoring.wait()
+        if memory is None:
+            # SQLite I/O happens outside the pool lock; other sessions aren't held up by it
+            try:
+                memory = self._restore(session_id)
+            finally:
+                with self._lock:
+                    del self._restoring[session_id]
+                    if memory is not None:
+                        self._admit(session_id, memory)
+                        evicted = self._evict(time.time(), keep=session_id)
+                restoring.set()
+        for evicted_id, evicted_memory in evicted:
+            self._spill(evicted_id, evicted_memory)
+        return memory
+
+    def _take(self, session_id: str):
+        """Resident memory (marked as used), or one still waiting to be spilled (made resident again); else None"""
+        entry = self._sessions.get(session_id)
+        if entry is not None:
+            self._sessions.move_to_end(session_id)
+            entry[1] = time.time()
+            return entry[0]
+        memory = self._spilling.pop(session_id, None)
+        if memory is not None:
+            self.revived += 1
+            self._admit(session_id, memory)
+        return memory
+
+    def _admit(self, session_id: str, memory):
+        # Re-measured after every turn, so the token cap sees conversations grow
+        memory.on_save = lambda: self._measure(session_id, memory)
+        entry = [memory, time.time(), memory.footprint_tokens()]
+        self._sessions[session_id] = entry
+        self._tokens += entry[2]
+
+    def _measure(self, session_id: str, memory):
+        """Update a session's footprint after a turn, evicting others if that crossed the token cap"""
+        footprint = memory.footprint_tokens()
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None or entry[0] is not memory:
+                return
+            self._tokens += footprint - entry[2]
+            entry[2] = footprint
+            evicted = self._evict(time.time(), keep=session_id)
+        for evicted_id, evicted_memory in evicted:
+            self._spill(evicted_id, evicted_memory)
+
+    def _restore(self, session_id: str):
+        memory = self.factory()
+        row = None
+        if self.path:
+            connection = self._connection()
+            with connection:
+                row = connection.execute("SELECT state FROM chat_sessions WHERE session_id = ?",
+                                         (session_id,)).fetchone()
+                if row:
+                    connection.execute("DELETE FROM chat_sessions WHERE session_id = ?", (session_id,))
+        if row:
+            memory.load_state(json.loads(row[0]))
+            self.restored += 1
+        else:
+            self.created += 1
+        return memory
+
+    def _evict(self, now: float, keep: str):
+        """Pop idle sessions, then least recently used ones while over a cap; returns what was popped"""
+        evicted = []
+        for session_id, (memory, last_access, footprint) in list(self._sessions.items()):
+            if session_id == keep or now - last_access <= self.idle_seconds:
+                # Ordered by access, so everything after this is fresher
+                break
+            evicted.append((session_id, memory))
+            self._tokens -= footprint
+            del self._sessions[session_id]
+            self.evicted_idle += 1
+        while len(self._sessions) > 1 and (len(self._sessions) > self.max_sessions or self._tokens > self.max_tokens):
+            session_id, (memory, _, footprint) = next(iter(self._sessions.items()))
+            if session_id == keep:
+                break
+            evicted.append((session_id, memory))
+            self._tokens -= footprint
+            del self._sessions[session_id]
+            self.evicted_capacity += 1
+        if self.path:
+            self._spilling.update(evicted)
+        return evicted
+
+    def _spill(self, session_id: str, memory):
+        """Write an evicted memory to SQLite, unless its session was taken back (or dropped) first"""
+        if not self.path:
+            return
+        with self._spill_lock:
+            with self._lock:
+                if self._spilling.get(session_id) is not memory:
+                    return
+            now = time.time()
+            connection = self._connection()
+            with connection:
+                if memory.footprint_tokens():
+                    connection.execute("INSERT OR REPLACE INTO chat_sessions (session_id, state, updated_at) "
+                                       "VALUES (?, ?, ?)", (session_id, json.dumps(memory.state()), now))
+                else:
+                    # An emptied conversation mustn't leave an older spilled copy behind to be restored
+                    connection.execute("DELETE FROM chat_sessions WHERE session_id = ?", (session_id,))
+                connection.execute("DELETE FROM chat_sessions WHERE updated_at < ?", (now - self.spill_ttl_seconds,))
+            with self._lock:
+                if self._spilling.get(session_id) is memory:
+                    del self._spilling[session_id]
+                self.spilled += 1
+
+    def drop(self, session_id: str):
+        """Forget a session entirely, resident and spilled"""
+        with self._lock:
+            entry = self._sessions.pop(session_id, None)
+            if entry is not None:
+                self._tokens -= entry[2]
+            self._spilling.pop(session_id, None)
+        if self.path:
+            with self._spill_lock:
+                connection = self._connection()
+                with connection:
+                    connection.execute("DELETE FROM chat_sessions WHERE session_id = ?", (session_id,))
+
+    def stats(self) -> Dict:
+        spilled_sessions = 0
+        if self.path:
+            spilled_sessions = self._connection().execute("SELECT COUNT(*) FROM chat_sessions").fetchone()[0]
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "resident_tokens": self._tokens,
+                "spilling": len(self._spilling),
+                "spilled_sessions": spilled_sessions,
+                "created": self.created,
+                "restored": self.restored,
+                "revived": self.revived,
+                "evicted_idle": self.evicted_idle,
+                "evicted_capacity": self.evicted_capacity,
+                "spilled": self.spilled,
+            }
+
+
+def create_session_pool(factory: Callable) -> SessionMemoryPool:
+    """Pool sized from CHAT_SESSIONS_* settings; CHAT_SESSIONS_PATH="" keeps evicted sessions out of SQLite"""
+    return SessionMemoryPool(
+        factory,
+        max_sessions=int(os.getenv("CHAT_SESSIONS_MAX", 1000)),
+        max_tokens=int(os.getenv("CHAT_SESSIONS_MAX_TOKENS", 2_000_000)),
+        idle_seconds=float(os.getenv("CHAT_SESSIONS_IDLE_SECONDS", 3600)),
+        path=os.getenv("CHAT_SESSIONS_PATH", DEFAULT_SESSIONS_PATH) or None,
+    )
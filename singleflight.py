@@ -0,0 +1,101 @@
+import hashlib
+import threading
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+from prefetch import PrefetchJob
+
+
+def prompt_key(call_type: str, prompt: str) -> str:
+    """Identical prompts of the same call type share a flight"""
+    return hashlib.sha256(f"{call_type}\0{prompt}".encode("utf-8")).hexdigest()
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    def __init__(self):
+        """Coalesces concurrent identical requests: one executes, the rest wait for and share its outcome"""
+        self._calls: Dict[str, _Call] = {}
+        self._streams: Dict[str, PrefetchJob] = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key: str, fn: Callable):
+        """fn() unless an identical call is already in flight, in which case its result (or error) is shared"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stream(self, key: str, factory: Callable[[], Iterable]) -> Iterator:
+        """Chunks of factory()'s stream, shared with every concurrent reader of the same key.
+
+        The stream is pumped on its own thread, so a reader that stops early doesn't stall the others;
+        late joiners replay the chunks produced so far.
+        """
+        with self._lock:
+            job = self._streams.get(key)
+            if job is None:
+                job = self._streams[key] = PrefetchJob(key)
+                self.executed += 1
+                threading.Thread(target=self._pump, args=(job, factory), name="singleflight-stream", daemon=True).start()
+            else:
+                self.coalesced += 1
+        return job.stream()
+
+    def _pump(self, job: PrefetchJob, factory: Callable[[], Iterable]):
+        try:
+            job._run(factory)
+        finally:
+            with self._lock:
+                if self._streams.get(job.key) is job:
+                    del self._streams[job.key]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "in_flight": len(self._calls) + len(self._streams),
+                "executed": self.executed,
+                "coalesced": self.coalesced,
+            }
+
+
+_singleflight: Optional[SingleFlight] = None
+_singleflight_lock = threading.Lock()
+
+
+def get_singleflight() -> SingleFlight:
+    """Process-wide, so identical prompts coalesce across sessions and threads"""
+    global _singleflight
+    if _singleflight is None:
+        with _singleflight_lock:
+            if _singleflight is None:
+                _singleflight = SingleFlight()
+    return _singleflight
@@ -0,0 +1,171 @@
+import json
+import mmap
+import os
+import struct
+import sys
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from columnar import ColumnarCatalog, MappedStringTable, MultiValueColumn, StringTable
+from normalization import is_normalized, normalize_scholarship
+
+# File layout:
+#   8 bytes   magic
+#   4 bytes   header length (little-endian uint32)
+#   N bytes   header JSON: source signature, vocabularies and the offset table of every array
+#   ...       array data, each array starting on an ALIGNMENT boundary
+MAGIC = b"SCHSNAP1"
+FORMAT_VERSION = 2
+ALIGNMENT = 64
+
+
+def snapshot_path_for(catalog_path: str) -> str:
+    """scholarships.json -> scholarships.snap"""
+    return os.path.splitext(catalog_path)[0] + ".snap"
+
+
+def _collect_arrays(columns: ColumnarCatalog) -> Tuple[Dict[str, np.ndarray], Dict]:
+    """Every array in the catalog plus the small vocabularies stored in the header"""
+    strings = [columns.strings.get(code) for code in range(len(columns.strings))]
+    encoded = [s.encode("utf-8") for s in strings]
+    string_offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(e) for e in encoded], out=string_offsets[1:])
+
+    arrays = {
+        "strings.blob": np.frombuffer(b"".join(encoded), dtype=np.uint8),
+        "strings.offsets": string_offsets,
+        "gender_codes": columns.gender_codes,
+        "scale_codes": columns.scale_codes,
+    }
+    for name, column in columns.string_columns.items():
+        arrays[f"string_columns.{name}"] = column
+    for name, floor in columns.floors.items():
+        arrays[f"floors.{name}"] = floor
+    vocabularies = {
+        "gender": columns.gender_vocabulary.strings,
+        "scales": columns.scales.strings,
+    }
+    for name, column in columns.multi_columns.items():
+        arrays[f"multi.{name}.offsets"] = column.offsets
+        arrays[f"multi.{name}.codes"] = column.codes
+        # The value -> rows posting index is prebuilt so workers don't re-sort it
+        arrays[f"multi.{name}.postings"] = column.postings
+        arrays[f"multi.{name}.posting_offsets"] = column.posting_offsets
+        vocabularies[f"multi.{name}"] = column.vocabulary.strings
+    return arrays, vocabularies
+
+
+def write_snapshot(columns: ColumnarCatalog, path: str, source_signature=None):
+    """Serialize a columnar catalog; written atomically so mapped readers are never torn"""
+    arrays, vocabularies = _collect_arrays(columns)
+
+    table = {}
+    offset = 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        arrays[name] = array
+        offset = (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+        table[name] = {"dtype": array.dtype.str, "length": int(array.size), "offset": offset}
+        offset += array.nbytes
+
+    header = {
+        "version": FORMAT_VERSION,
+        "size": columns.size,
+        "source_signature": list(source_signature) if source_signature else None,
+        "vocabularies": vocabularies,
+        "multi_columns": list(columns.multi_columns),
+        "arrays": table,
+    }
+    header_bytes = json.dumps(header).encode("utf-8")
+    # Array offsets in the header are relative to the first aligned byte after it
+    data_start = (len(MAGIC) + 4 + len(header_bytes) + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header_bytes)))
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.seek(data_start + table[name]["offset"])
+            f.write(array.tobytes())
+    os.replace(tmp_path, path)
+
+
+def read_header(buffer) -> Tuple[Dict, int]:
+    """Parse the header; returns it with the absolute offset of the data section"""
+    if buffer[:len(MAGIC)] != MAGIC:
+        raise ValueError("Not a scholarship snapshot")
+    (header_length,) = struct.unpack_from("<I", buffer, len(MAGIC))
+    start = len(MAGIC) + 4
+    header = json.loads(bytes(buffer[start:start + header_length]).decode("utf-8"))
+    if header.get("version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported snapshot version {header.get('version')}")
+    data_start = (start + header_length + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+    return header, data_start
+
+
+def load_snapshot(path: str, expected_signature=None) -> Optional[ColumnarCatalog]:
+    """Memory-map a snapshot; arrays are zero-copy views shared by every process mapping the file.
+
+    Returns None if the snapshot was built from a different version of the source catalog.
+    """
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    header, data_start = read_header(mapped)
+    if expected_signature is not None and header["source_signature"] != list(expected_signature):
+        mapped.close()
+        return None
+
+    def array(name):
+        entry = header["arrays"][name]
+        if entry["length"] == 0:
+            return np.empty(0, dtype=np.dtype(entry["dtype"]))
+        return np.frombuffer(mapped, dtype=np.dtype(entry["dtype"]), count=entry["length"],
+                             offset=data_start + entry["offset"])
+
+    vocabularies = header["vocabularies"]
+    multi_columns = {
+        name: MultiValueColumn(
+            StringTable(vocabularies[f"multi.{name}"]),
+            array(f"multi.{name}.offsets"),
+            array(f"multi.{name}.codes"),
+            array(f"multi.{name}.postings"),
+            array(f"multi.{name}.posting_offsets"),
+        )
+        for name in header["multi_columns"]
+    }
+    prefix = "string_columns."
+    string_columns = {name[len(prefix):]: array(name) for name in header["arrays"] if name.startswith(prefix)}
+    prefix = "floors."
+    floors = {name[len(prefix):]: array(name) for name in header["arrays"] if name.startswith(prefix)}
+
+    return ColumnarCatalog(
+        size=header["size"],
+        strings=MappedStringTable(array("strings.blob"), array("strings.offsets")),
+        string_columns=string_columns,
+        multi_columns=multi_columns,
+        gender_vocabulary=StringTable(vocabularies["gender"]),
+        gender_codes=array("gender_codes"),
+        floors=floors,
+        scales=StringTable(vocabularies["scales"]),
+        scale_codes=array("scale_codes"),
+    )
+
+
+def build_snapshot(catalog_path: str, snapshot_path: Optional[str] = None) -> str:
+    """Compile a normalized catalog JSON file into its snapshot"""
+    with open(catalog_path, "r", encoding="utf-8") as f:
+        scholarships = json.load(f)
+    scholarships = [s if is_normalized(s) else normalize_scholarship(s) for s in scholarships]
+    stat = os.stat(catalog_path)
+    snapshot_path = snapshot_path or snapshot_path_for(catalog_path)
+    write_snapshot(ColumnarCatalog.from_records(scholarships), snapshot_path, (stat.st_mtime_ns, stat.st_size))
+    return snapshot_path
+
+
+if __name__ == "__main__":
+    from catalog import DEFAULT_CATALOG_PATH
+
+    source = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_CATALOG_PATH
+    print(f"Snapshot written to {build_snapshot(source)}")
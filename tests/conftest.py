@@ -0,0 +1,71 @@
+import itertools
+import json
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Anything that builds the chat agent runs against the offline fake LLM, with throwaway caches
+os.environ.setdefault("SCHOLARSHIP_FAKE_LLM", "1")
+os.environ.setdefault("FAKE_LLM_FIRST_TOKEN_DELAY", "0")
+os.environ.setdefault("FAKE_LLM_TOKEN_DELAY", "0")
+os.environ.setdefault("CHAT_SESSIONS_PATH", "")
+os.environ.setdefault("LLM_CACHE_PATH", os.path.join(tempfile.mkdtemp(prefix="scholarship-tests-"), "llm_cache.db"))
+
+from catalog import DEFAULT_CATALOG_PATH  # noqa: E402
+from catalog_db import SQLiteCatalogStore  # noqa: E402
+from columnar import ColumnarCatalog  # noqa: E402
+from models import DEGREE_LEVELS, FIELDS_OF_STUDY, GENDERS  # noqa: E402
+from normalization import normalize_catalog  # noqa: E402
+
+# The shipped catalog has CGPA floors but no GPA ones, so a few records with GPA floors are added
+EXTRA_RECORDS = [
+    {"scholarship_name": "Test GPA Merit Award", "providing_body": "Test Trust", "degree_level": ["Undergraduate"],
+     "field_of_study": ["Engineering"], "engineering_discipline": [], "gender_eligibility": "All",
+     "gpa_requirement": "Minimum 3.5 GPA", "brief_description": "Test record.",
+     "link": "https://example.org/a", "deadline": ""},
+    {"scholarship_name": "Test Women in Science Grant", "providing_body": "Test Trust",
+     "degree_level": ["Postgraduate", "PhD"], "field_of_study": ["Science", "Engineering"],
+     "engineering_discipline": [], "gender_eligibility": "Female", "gpa_requirement": "Minimum 3.0 GPA",
+     "brief_description": "Test record.", "link": "https://example.org/b", "deadline": ""},
+    {"scholarship_name": "Test CGPA Excellence Award", "providing_body": "Test Trust", "degree_level": ["PhD"],
+     "field_of_study": ["Computer Science"], "engineering_discipline": [], "gender_eligibility": "Male",
+     "gpa_requirement": "Minimum 8.5 CGPA", "brief_description": "Test record.",
+     "link": "https://example.org/c", "deadline": ""},
+]
+
+
+@pytest.fixture(scope="session")
+def catalog_records():
+    with open(DEFAULT_CATALOG_PATH, "r", encoding="utf-8") as f:
+        records, errors = normalize_catalog(json.load(f) + EXTRA_RECORDS)
+    assert not errors
+    return records
+
+
+@pytest.fixture(scope="session")
+def columns(catalog_records):
+    return ColumnarCatalog.from_records(catalog_records)
+
+
+@pytest.fixture(scope="session")
+def sqlite_store(catalog_records, tmp_path_factory):
+    store = SQLiteCatalogStore(str(tmp_path_factory.mktemp("catalog") / "scholarships.db"))
+    store.upsert_scholarships(catalog_records)
+    return store
+
+
+@pytest.fixture(scope="session")
+def sidebar_profiles():
+    """Every sidebar bucket at the given scores; by default below, on and above the catalog's floors"""
+    def profiles(gpas=(None, 2.9, 3.0, 3.5), cgpas=(None, 7.5, 8.0, 8.5)):
+        return [
+            {"gender": gender, "field_of_study": field, "degree_level": degree, "gpa": gpa, "cgpa": cgpa}
+            for gender, field, degree, gpa, cgpa in itertools.product(GENDERS, FIELDS_OF_STUDY, DEGREE_LEVELS,
+                                                                      gpas, cgpas)
+        ]
+    return profiles
@@ -0,0 +1,89 @@
+import threading
+import time
+
+from admission import AdmissionController, LoadShedError
+
+
+def controller(**kwargs):
+    """One slot, and a rate limit too generous to matter"""
+    options = dict(rate=1000.0, burst=1000, max_concurrency=1, max_queue=8, queue_timeout=5.0)
+    options.update(kwargs)
+    return AdmissionController(**options)
+
+
+def queue_behind(admission, call_types, admitted, errors):
+    """Start one waiting request per call type, in order, each once the previous one is queued"""
+    threads = []
+    for call_type in call_types:
+        def request(call_type=call_type):
+            try:
+                with admission.slot(call_type):
+                    admitted.append(call_type)
+            except LoadShedError:
+                errors.append(call_type)
+
+        queued = admission.stats()["queued"]
+        thread = threading.Thread(target=request)
+        thread.start()
+        threads.append(thread)
+        deadline = time.monotonic() + 2
+        while admission.stats()["queued"] == queued and thread.is_alive() and time.monotonic() < deadline:
+            time.sleep(0.005)
+    return threads
+
+
+def test_higher_priority_is_served_first():
+    admission = controller()
+    admitted, errors = [], []
+    with admission.slot("chat"):
+        threads = queue_behind(admission, ["summary", "recommendations", "chat"], admitted, errors)
+    for thread in threads:
+        thread.join()
+    assert admitted == ["chat", "recommendations", "summary"]
+    assert not errors
+
+
+def test_same_priority_is_first_come_first_served():
+    admission = controller()
+    admitted, errors = [], []
+    with admission.slot("chat"):
+        threads = queue_behind(admission, ["summary", "summary", "summary"], admitted, errors)
+    for thread in threads:
+        thread.join()
+    assert len(admitted) == 3 and not errors
+
+
+def test_low_priority_is_shed_first():
+    # max_queue 4: summaries give up at 2 queued, recommendations at 3, chat at 4
+    admission = controller(max_queue=4)
+    admitted, errors = [], []
+    with admission.slot("chat"):
+        threads = queue_behind(admission, ["chat", "chat", "summary", "recommendations", "recommendations",
+                                           "chat", "chat"], admitted, errors)
+        assert errors == ["summary", "recommendations", "chat"]
+    for thread in threads:
+        thread.join()
+    assert sorted(admitted) == ["chat", "chat", "chat", "recommendations"]
+    assert admission.stats()["calls"]["summary"]["shed"] == 1
+
+
+def test_waiting_too_long_is_shed():
+    admission = controller(queue_timeout=0.1)
+    with admission.slot("chat"):
+        started = time.monotonic()
+        errors = []
+        thread = threading.Thread(target=lambda: queue_behind(admission, ["recommendations"], [], errors)[0].join())
+        thread.start()
+        thread.join()
+    assert errors == ["recommendations"]
+    assert time.monotonic() - started < 2
+
+
+def test_rate_limit_spaces_out_admissions():
+    admission = controller(rate=20.0, burst=1, max_concurrency=4)
+    started = time.monotonic()
+    for _ in range(4):
+        with admission.slot("chat"):
+            pass
+    # The first call uses the burst token; the other three wait ~50 ms each
+    assert time.monotonic() - started >= 0.12
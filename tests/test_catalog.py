@@ -0,0 +1,58 @@
+import json
+import os
+
+from catalog import ScholarshipCatalog, get_catalog
+
+
+def write_catalog(path, records):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(records, f)
+
+
+def bump_mtime(path):
+    """Make an edit visible even on filesystems with coarse mtimes"""
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_one_catalog_per_path(tmp_path):
+    path = tmp_path / "scholarships.json"
+    write_catalog(path, [])
+    assert get_catalog(str(path)) is get_catalog(str(tmp_path / "." / "scholarships.json"))
+
+
+def test_unchanged_file_is_not_reparsed(catalog_records, tmp_path):
+    path = str(tmp_path / "scholarships.json")
+    write_catalog(path, catalog_records[:3])
+    catalog = ScholarshipCatalog(path, check_interval=0)
+    assert len(catalog.scholarships) == 3
+    for _ in range(5):
+        catalog.scholarships
+    assert catalog.reload_count == 1
+    assert catalog.check_count == 6
+
+
+def test_edited_file_is_reloaded(catalog_records, tmp_path):
+    path = str(tmp_path / "scholarships.json")
+    write_catalog(path, catalog_records[:3])
+    catalog = ScholarshipCatalog(path, check_interval=0)
+    first = catalog.scholarships
+    write_catalog(path, catalog_records[:5])
+    bump_mtime(path)
+    assert len(catalog.scholarships) == 5
+    assert catalog.reload_count == 2
+    # Readers holding the old columns keep a consistent view
+    assert len(first) == 3
+
+
+def test_checks_are_throttled(catalog_records, tmp_path):
+    path = str(tmp_path / "scholarships.json")
+    write_catalog(path, catalog_records[:3])
+    catalog = ScholarshipCatalog(path, check_interval=60)
+    catalog.scholarships
+    write_catalog(path, catalog_records[:5])
+    bump_mtime(path)
+    assert len(catalog.scholarships) == 3
+    catalog.refresh(force=True)
+    assert len(catalog.scholarships) == 5
+
@@ -0,0 +1,74 @@
+from fake_llm import DEFAULT_RESPONSE, FakeStreamingLLM
+from resilience import CircuitBreaker, ResilientCaller
+from semantic_cache import SemanticCache
+
+OPEN_QUESTION = "Why do scholarship committees care about volunteering?"
+
+
+class BrokenLLM(FakeStreamingLLM):
+    """Fails every request, like an unreachable upstream"""
+
+    def _stream(self, *args, **kwargs):
+        raise ConnectionError("upstream down")
+
+    def _generate(self, *args, **kwargs):
+        raise ConnectionError("upstream down")
+
+
+def make_agent(llm):
+    from langchain_agent import ScholarshipChatAgent
+    return ScholarshipChatAgent(
+        llm=llm,
+        caller=ResilientCaller(breaker=CircuitBreaker(failure_threshold=100), max_attempts=1),
+        semantic_cache=SemanticCache(path=None),
+    )
+
+
+def test_open_question_is_streamed_in_pieces():
+    agent = make_agent(FakeStreamingLLM())
+    chunks = list(agent.chat_stream(OPEN_QUESTION, session_id="s"))
+    assert len(chunks) > 1
+    assert "".join(chunks) == DEFAULT_RESPONSE
+    assert [message.content for message in agent.sessions.get("s").messages()] == [OPEN_QUESTION, DEFAULT_RESPONSE]
+
+
+def test_chat_collects_the_stream():
+    agent = make_agent(FakeStreamingLLM())
+    assert agent.chat(OPEN_QUESTION, session_id="s") == DEFAULT_RESPONSE
+
+
+def test_error_is_shown_but_not_remembered():
+    agent = make_agent(BrokenLLM())
+    answer = agent.chat(OPEN_QUESTION, session_id="s")
+    assert "technical difficulty" in answer
+    assert agent.sessions.get("s").messages() == []
+    assert agent.semantic_cache.lookup(OPEN_QUESTION, "") is None
+
+
+def react_llm(action_input):
+    """Fake LLM that looks something up with the search tool, then answers in the ReAct format"""
+    return FakeStreamingLLM(responses=[
+        f"Thought: Do I need to use a tool? Yes\nAction: search_scholarships\nAction Input: {action_input}",
+        "Thought: Do I need to use a tool? No\nAI: The Example Engineering Grant fits you well.",
+        "Scholarships like that are offered by engineering foundations.",
+    ])
+
+
+def test_agent_answer_is_streamed_after_its_tool_steps():
+    llm = react_llm("engineering scholarships")
+    agent = make_agent(llm)
+    assert agent.agent is not None
+    chunks = list(agent.chat_stream(OPEN_QUESTION, session_id="s"))
+    # Only the final answer reaches the reader, word by word, without the ReAct scaffolding
+    assert len(chunks) > 1
+    assert "".join(chunks) == "The Example Engineering Grant fits you well."
+    # The catalog answered the search; no LLM call was spent on it
+    assert llm.call_count == 2
+
+
+def test_agent_search_falls_back_to_a_tool_call():
+    llm = react_llm("scholarships for underwater basket weaving")
+    agent = make_agent(llm)
+    agent.chat(OPEN_QUESTION, session_id="s")
+    assert llm.call_count == 3
+    assert agent.admission.stats()["calls"]["tool"]["admitted"] >= 1
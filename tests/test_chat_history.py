@@ -0,0 +1,60 @@
+import os
+import time
+
+from chat_history import ChatHistory, prune_archives
+
+
+def fill(history, count):
+    for n in range(count):
+        history.append({"role": "user" if n % 2 == 0 else "assistant", "content": f"message {n}"})
+
+
+def test_only_the_window_stays_in_memory(tmp_path):
+    history = ChatHistory("session", window=4, page_size=3, directory=str(tmp_path))
+    fill(history, 10)
+    assert [m["content"] for m in history.messages] == [f"message {n}" for n in range(6, 10)]
+    assert [m["id"] for m in history.messages] == [6, 7, 8, 9]
+    assert len(history) == 10 and history.archived == 6 and history.pages() == 2
+
+
+def test_earlier_pages_come_back_oldest_first(tmp_path):
+    history = ChatHistory("session", window=4, page_size=3, directory=str(tmp_path))
+    fill(history, 11)
+    # 7 archived: pages [0-2], [3-5], [6]
+    assert history.pages() == 3
+    newest, = history.earlier(1)
+    assert "message 6" in newest and "message 5" not in newest
+    pages = history.earlier(10)
+    assert len(pages) == 3
+    assert pages[0].index("message 0") < pages[0].index("message 2")
+    assert "🎓 **Scholardeep**\n\nmessage 1" in pages[0]
+
+
+def test_full_pages_are_read_once(tmp_path):
+    history = ChatHistory("session", window=2, page_size=2, directory=str(tmp_path))
+    fill(history, 7)
+    history.earlier(3)
+    reads = history.page_reads
+    history.earlier(3)
+    assert history.page_reads == reads
+
+    # The partial last page is re-read once it has grown
+    fill(history, 1)
+    history.earlier(3)
+    assert history.page_reads == reads + 1
+
+
+def test_without_a_directory_old_messages_are_dropped():
+    history = ChatHistory("session", window=3, directory=None)
+    fill(history, 5)
+    assert len(history.messages) == 3 and history.archived == 0 and history.earlier(5) == []
+
+
+def test_prune_removes_only_stale_archives(tmp_path):
+    for session in ("old", "new"):
+        fill(ChatHistory(session, window=1, directory=str(tmp_path)), 3)
+    old = str(tmp_path / "old.jsonl")
+    stale = time.time() - 3600
+    os.utime(old, (stale, stale))
+    prune_archives(str(tmp_path), max_age_seconds=600)
+    assert not os.path.exists(old) and os.path.exists(tmp_path / "new.jsonl")
@@ -0,0 +1,29 @@
+import numpy as np
+
+from columnar import MultiValueColumn
+
+
+def scan(column, value):
+    """Rows listing value, found the slow way"""
+    return np.array([row for row in range(len(column.offsets) - 1) if value in column.values(row)], dtype=np.int32)
+
+
+def test_postings_match_a_scan(columns):
+    for column in columns.multi_columns.values():
+        for value in column.vocabulary.strings:
+            assert np.array_equal(column.rows_with(value), scan(column, value)), value
+            assert np.array_equal(np.flatnonzero(column.contains(value)), scan(column, value)), value
+
+
+def test_unknown_value_matches_nothing(columns):
+    column = columns.multi_columns["degree_level"]
+    assert len(column.rows_with("Kindergarten")) == 0
+    assert not column.contains("Kindergarten").any()
+
+
+def test_rows_without_values():
+    column = MultiValueColumn.build([[], ["PhD"], [], ["PhD", "Postgraduate"], []])
+    assert column.rows_with("PhD").tolist() == [1, 3]
+    assert column.rows_with("Postgraduate").tolist() == [3]
+    empty = MultiValueColumn.build([[], []])
+    assert not empty.contains("PhD").any()
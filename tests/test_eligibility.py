@@ -0,0 +1,46 @@
+import numpy as np
+
+from eligibility import FAIL_CGPA, FAIL_GPA, evaluate
+
+
+def sqlite_failures(store, profile):
+    """Record id -> failure bitmask from FAILURES_SQL, eligible and non-eligible rows together"""
+    failures = {}
+    for eligible in (True, False):
+        page = store.query(profile, eligible=eligible, page=0, page_size=store.count())
+        assert len(page.rows) == page.total
+        failures.update((row["id"], mask) for row, mask in zip(page.rows, page.failures))
+    return failures
+
+
+def test_columnar_evaluate_matches_failures_sql(columns, sqlite_store, sidebar_profiles):
+    for profile in sidebar_profiles():
+        result = evaluate(columns, profile)
+        expected = {columns[row]["id"]: int(mask) for row, mask in enumerate(result.failures)}
+        assert sqlite_failures(sqlite_store, profile) == expected, profile
+
+
+def test_eligible_counts_match(columns, sqlite_store, sidebar_profiles):
+    for profile in sidebar_profiles(gpas=(None, 3.5), cgpas=(None, 8.0)):
+        result = evaluate(columns, profile)
+        assert sqlite_store.query(profile, eligible=True).total == len(result.eligible_ids)
+        assert sqlite_store.query(profile, eligible=False).total == len(result.ineligible_ids)
+
+
+def test_floor_equal_to_score_passes(columns):
+    profile = {"gender": "Female", "field_of_study": "Engineering", "degree_level": "Postgraduate",
+               "gpa": 3.0, "cgpa": None}
+    failures = evaluate(columns, profile).failures
+    gpa_floors = columns.floors["min_gpa"]
+    at_floor = np.flatnonzero(gpa_floors == np.float32(3.0))
+    assert len(at_floor)
+    assert not (failures[at_floor] & FAIL_GPA).any()
+    above = np.flatnonzero(gpa_floors > np.float32(3.0))
+    assert (failures[above] & FAIL_GPA).all()
+
+
+def test_missing_score_skips_the_check(columns):
+    profile = {"gender": "Male", "field_of_study": "Computer Science", "degree_level": "PhD",
+               "gpa": None, "cgpa": None}
+    failures = evaluate(columns, profile).failures
+    assert not (failures & (FAIL_GPA | FAIL_CGPA)).any()
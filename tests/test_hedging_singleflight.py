@@ -0,0 +1,125 @@
+import threading
+import time
+
+import pytest
+
+from fake_llm import DEFAULT_RESPONSE, FakeStreamingLLM
+from hedging import Hedger
+from singleflight import SingleFlight
+
+
+def sequenced_llm(*delays):
+    """Fake LLM whose requests take the given times to first token, in order (the last one repeats).
+
+    Also returns the list of requests started, which counts cancelled ones too.
+    """
+    remaining = list(delays)
+    started = []
+    lock = threading.Lock()
+
+    def next_delay():
+        with lock:
+            started.append(remaining[0])
+            return remaining.pop(0) if len(remaining) > 1 else remaining[0]
+
+    return FakeStreamingLLM(latency_sampler=next_delay), started
+
+
+def warmed_hedger(call_type="chat", latency=0.02, **kwargs):
+    """Hedger that has already seen enough fast calls to know the call type's tail"""
+    hedger = Hedger(**kwargs)
+    for _ in range(hedger.tracker.min_samples):
+        hedger.tracker.record(call_type, latency)
+        hedger.tracker.record(f"{call_type}:first_chunk", latency)
+    return hedger
+
+
+def test_slow_request_is_hedged_and_the_hedge_wins():
+    hedger = warmed_hedger(max_hedge_rate=1.0)
+    llm, started_requests = sequenced_llm(2.0, 0.01)
+    started = time.monotonic()
+    response = hedger.invoke(lambda: llm.ainvoke("hello"), "chat")
+    assert time.monotonic() - started < 1.0
+    assert response.content == DEFAULT_RESPONSE
+    assert len(started_requests) == 2
+    stats = hedger.stats()["chat"]
+    assert stats["hedged"] == 1 and stats["hedge_wins"] == 1
+
+
+def test_hedge_rate_cap_holds_back_duplicates():
+    hedger = warmed_hedger(max_hedge_rate=0.0)
+    llm, started_requests = sequenced_llm(0.3, 0.01)
+    started = time.monotonic()
+    hedger.invoke(lambda: llm.ainvoke("hello"), "chat")
+    assert time.monotonic() - started >= 0.3
+    assert len(started_requests) == 1
+    assert hedger.stats()["chat"]["hedges_capped"] == 1
+
+
+def test_no_hedging_before_the_tail_is_known():
+    hedger = Hedger(max_hedge_rate=1.0)
+    llm, started_requests = sequenced_llm(0.2, 0.01)
+    hedger.invoke(lambda: llm.ainvoke("hello"), "chat")
+    assert len(started_requests) == 1
+
+
+def test_hedged_stream_races_on_the_first_chunk():
+    hedger = warmed_hedger(max_hedge_rate=1.0)
+    llm, started_requests = sequenced_llm(2.0, 0.01)
+    started = time.monotonic()
+    text = "".join(chunk.content for chunk in hedger.stream(lambda: llm.astream("hello"), "chat"))
+    assert time.monotonic() - started < 1.0
+    assert text == DEFAULT_RESPONSE
+
+
+def run_together(count, fn):
+    results, errors = [], []
+
+    def worker():
+        try:
+            results.append(fn())
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+def test_single_flight_shares_one_call():
+    flight = SingleFlight()
+    llm = FakeStreamingLLM(first_token_delay=0.3)
+    results, errors = run_together(5, lambda: flight.do("key", lambda: llm.invoke("hello").content))
+    assert not errors
+    assert results == [DEFAULT_RESPONSE] * 5
+    assert llm.call_count == 1
+    assert flight.executed == 1 and flight.coalesced == 4
+
+
+def test_single_flight_shares_the_error():
+    flight = SingleFlight()
+
+    def failing():
+        time.sleep(0.2)
+        raise ConnectionError("upstream down")
+
+    results, errors = run_together(3, lambda: flight.do("key", failing))
+    assert not results and len(errors) == 3
+    assert all(isinstance(e, ConnectionError) for e in errors)
+    # Nothing lingers: the next call runs again
+    with pytest.raises(ConnectionError):
+        flight.do("key", failing)
+    assert flight.executed == 2
+
+
+def test_single_flight_stream_fans_out():
+    flight = SingleFlight()
+    llm = FakeStreamingLLM(first_token_delay=0.2, token_delay=0.001)
+    stream = lambda: "".join(flight.stream("key", lambda: (chunk.content for chunk in llm.stream("hello"))))
+    results, errors = run_together(4, stream)
+    assert not errors
+    assert results == [DEFAULT_RESPONSE] * 4
+    assert llm.call_count == 1
@@ -0,0 +1,78 @@
+import pytest
+
+from catalog import get_catalog
+from columnar import ColumnarCatalog
+from fake_llm import FakeStreamingLLM
+from intent_router import CATALOG, ELIGIBILITY, GUIDANCE, OPEN, SIMILAR, IntentRouter, match_scholarship_name, \
+    name_index
+from session_pool import SessionMemoryPool
+
+# (question, route it should be answered by); OPEN means it goes to the LLM
+ROUTES = [
+    ("How do I write a scholarship essay?", GUIDANCE),
+    ("Any tips for my statement of purpose?", GUIDANCE),
+    ("Am I eligible?", ELIGIBILITY),
+    ("What are the eligibility criteria for the Rolls-Royce Unnati scholarship?", ELIGIBILITY),
+    ("show me scholarships for women in engineering", CATALOG),
+    ("list scholarships for PhD students", CATALOG),
+    ("find scholarships similar to the Rolls-Royce Unnati scholarship", SIMILAR),
+    ("Why is the sky blue?", OPEN),
+    # States a profile, so it gets matching scholarships rather than a checklist asking for that profile
+    ("What scholarships am I eligible for as a female engineering student in India?", CATALOG),
+    # A profile doesn't change how to apply, so guidance questions keep the guidance answer
+    ("How do I apply as a PhD student in computer science?", GUIDANCE),
+    ("How do I write a personal statement for an engineering scholarship?", GUIDANCE),
+    ("What documents do I need to apply for a PhD scholarship?", GUIDANCE),
+    ("Tips for my application essay as a computer science undergraduate", GUIDANCE),
+    # Only looks like "how do I apply"
+    ("How many scholarships do you have?", OPEN),
+]
+
+
+@pytest.fixture(scope="module")
+def agent():
+    from langchain_agent import ScholarshipChatAgent
+    return ScholarshipChatAgent(llm=FakeStreamingLLM(), sessions=SessionMemoryPool(lambda: None))
+
+
+@pytest.mark.parametrize("question, route", ROUTES)
+def test_routes(agent, question, route):
+    routed = agent.router.answer(question)
+    assert (routed[0] if routed else OPEN) == route
+
+
+def test_profile_question_is_not_asked_for_its_profile(agent):
+    _, answer = agent.router.answer("What scholarships am I eligible for as a female engineering student in India?")
+    assert "please provide" not in answer
+    assert "scholarships in our database" in answer
+
+
+def test_named_scholarship_eligibility_shows_its_card(agent):
+    _, answer = agent.router.answer("What are the eligibility criteria for the Rolls-Royce Unnati scholarship?")
+    assert "Rolls-Royce" in answer
+
+
+def test_declining_handler_falls_through_to_catalog():
+    router = IntentRouter({ELIGIBILITY: lambda question: None, CATALOG: lambda question: "from the catalog"})
+    assert router.answer("am I eligible for this scholarship") == (CATALOG, "from the catalog")
+
+
+def test_declining_guidance_handler_goes_to_the_llm():
+    router = IntentRouter({GUIDANCE: lambda question: None, CATALOG: lambda question: "from the catalog"})
+    assert router.answer("how to write a scholarship essay") is None
+
+
+def test_declining_similar_handler_goes_to_the_llm():
+    router = IntentRouter({SIMILAR: lambda question: None, CATALOG: lambda question: "from the catalog"})
+    assert router.answer("more scholarships like that") is None
+
+
+def test_name_index_is_built_once_per_catalog_load():
+    columns = get_catalog().scholarships
+    assert name_index(columns) is name_index(columns)
+    row = match_scholarship_name("Rolls-Royce Unnati", columns)
+    assert "Rolls-Royce" in columns[row]["scholarship_name"]
+
+    reloaded = ColumnarCatalog.from_records(list(columns))
+    assert name_index(reloaded) is not name_index(columns)
+    assert match_scholarship_name("Rolls-Royce Unnati", reloaded) == row
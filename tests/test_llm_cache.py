@@ -0,0 +1,52 @@
+import time
+
+from llm_cache import LLMResponseCache, make_cache_key
+
+TEMPLATE = "Recommend scholarships for a {gender} {degree_level} student of {field_of_study} in {country}"
+PROFILE = {"gender": "Female", "field_of_study": "Engineering", "degree_level": "PhD", "country": "India"}
+
+
+def test_key_ignores_fields_the_prompt_does_not_use():
+    key = make_cache_key(TEMPLATE, PROFILE)
+    assert make_cache_key(TEMPLATE, dict(PROFILE, name="Asha", gpa=3.9)) == key
+    assert make_cache_key(TEMPLATE, dict(PROFILE, gender=" female ")) == key
+    assert make_cache_key(TEMPLATE, dict(PROFILE, degree_level="Postgraduate")) != key
+    assert make_cache_key(TEMPLATE + ".", PROFILE) != key
+
+
+def test_disk_tier_survives_a_restart(tmp_path):
+    path = str(tmp_path / "llm_cache.db")
+    LLMResponseCache(path=path).set("k", "answer")
+    reopened = LLMResponseCache(path=path)
+    assert reopened.get("k") == "answer"
+    assert reopened.get("k") == "answer"
+    stats = reopened.stats()
+    assert stats["disk_hits"] == 1 and stats["memory_hits"] == 1
+
+
+def test_entries_expire(tmp_path):
+    cache = LLMResponseCache(path=str(tmp_path / "llm_cache.db"), ttl_seconds=0.05)
+    cache.set("k", "answer")
+    time.sleep(0.1)
+    assert cache.get("k") is None
+    assert LLMResponseCache(path=cache.path, ttl_seconds=0.05).get("k") is None
+    assert cache.stats()["expirations"] >= 1
+
+
+def test_memory_tier_is_bounded():
+    cache = LLMResponseCache(path=None, max_memory_entries=2)
+    for key in ("a", "b", "c"):
+        cache.set(key, key)
+    assert cache.get("a") is None
+    assert cache.get("c") == "c"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_disk_tier_is_bounded_least_recently_used_first(tmp_path):
+    cache = LLMResponseCache(path=str(tmp_path / "llm_cache.db"), max_memory_entries=0, max_disk_bytes=25)
+    cache.set("a", "x" * 10)
+    cache.set("b", "x" * 10)
+    cache.get("a")
+    cache.set("c", "x" * 10)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
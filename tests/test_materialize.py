@@ -0,0 +1,44 @@
+import numpy as np
+
+from materialize import MaterializedEligibility, check_consistency
+
+
+def test_built_table_agrees_with_evaluate(columns):
+    table = MaterializedEligibility.build(columns)
+    assert check_consistency(columns, table) == []
+
+
+def test_corrupted_table_is_reported(columns):
+    table = MaterializedEligibility.build(columns)
+    # Pretend every GPA floor is higher than any score, so GPA-scored profiles lose rows
+    corrupted = MaterializedEligibility(table.fingerprint, table.offsets, table.gpa_ids,
+                                        np.full_like(table.gpa_floors, 10.0), table.cgpa_ids, table.cgpa_floors)
+    assert check_consistency(columns, corrupted)
+
+
+def test_missing_ids_are_reported(columns):
+    table = MaterializedEligibility.build(columns)
+    bucket = int(np.argmax(np.diff(table.offsets)))
+    start = int(table.offsets[bucket])
+    gpa_ids = table.gpa_ids.copy()
+    cgpa_ids = table.cgpa_ids.copy()
+    gpa_ids[start] = cgpa_ids[start] = -1
+    corrupted = MaterializedEligibility(table.fingerprint, table.offsets, gpa_ids, table.gpa_floors,
+                                        cgpa_ids, table.cgpa_floors)
+    assert check_consistency(columns, corrupted)
+
+
+def test_save_and_load(columns, tmp_path):
+    table = MaterializedEligibility.build(columns)
+    path = str(tmp_path / "scholarships.mat")
+    table.save(path)
+    loaded = MaterializedEligibility.load(path, expected_fingerprint=table.fingerprint)
+    assert loaded is not None
+    assert check_consistency(columns, loaded) == []
+    assert MaterializedEligibility.load(path, expected_fingerprint="stale") is None
+
+
+def test_profile_outside_buckets(columns):
+    table = MaterializedEligibility.build(columns)
+    profile = {"gender": "Female", "field_of_study": "Astrology", "degree_level": "PhD", "gpa": None, "cgpa": None}
+    assert table.eligible_ids(profile) is None
@@ -0,0 +1,53 @@
+import pytest
+
+from normalization import SCALE_CGPA_10, SCALE_GPA_4, SCALE_PERCENTAGE, normalize_catalog, normalize_scholarship, \
+    parse_requirement
+
+RECORD = {"scholarship_name": "Example Award", "providing_body": "Example Trust", "degree_level": "Undergraduate, PhD",
+          "field_of_study": ["Engineering"], "gender_eligibility": "All", "brief_description": "Example.",
+          "link": "https://example.org"}
+
+
+@pytest.mark.parametrize("value, floors", [
+    ("Minimum 3.5 GPA", {"min_gpa": 3.5, "requirement_scale": SCALE_GPA_4}),
+    ("GPA of 3.0/4.0 or above", {"min_gpa": 3.0, "requirement_scale": SCALE_GPA_4}),
+    ("Minimum 7.5 CGPA", {"min_cgpa": 7.5, "requirement_scale": SCALE_CGPA_10}),
+    ("CGPA: 8", {"min_cgpa": 8.0, "requirement_scale": SCALE_CGPA_10}),
+    # A "GPA" on the 10-point scale is read as a CGPA
+    ("8.0 GPA", {"min_cgpa": 8.0, "requirement_scale": SCALE_CGPA_10}),
+    ("At least 60% in class 12", {"min_percentage": 60.0, "min_cgpa": 6.0, "requirement_scale": SCALE_PERCENTAGE}),
+    (3.2, {"min_gpa": 3.2, "requirement_scale": SCALE_GPA_4}),
+    (8.5, {"min_cgpa": 8.5, "requirement_scale": SCALE_CGPA_10}),
+    (75, {"min_percentage": 75.0, "min_cgpa": 7.5, "requirement_scale": SCALE_PERCENTAGE}),
+    ("Strong academic record", {}),
+    (None, {}),
+    (True, {}),
+])
+def test_parse_requirement(value, floors):
+    expected = {"min_gpa": None, "min_cgpa": None, "min_percentage": None, "requirement_scale": None}
+    expected.update(floors)
+    assert parse_requirement(value) == expected
+
+
+def test_normalized_record_keeps_the_text():
+    record = normalize_scholarship(dict(RECORD, gpa_requirement="Minimum 3.5 GPA"))
+    assert record["gpa_requirement"] == "Minimum 3.5 GPA"
+    assert record["min_gpa"] == 3.5
+    assert record["degree_level"] == ["Undergraduate", "PhD"]
+    assert record["id"] == normalize_scholarship(RECORD)["id"]
+
+
+def test_cgpa_requirement_is_on_the_ten_point_scale():
+    record = normalize_scholarship(dict(RECORD, gpa_requirement="Minimum 3.0 GPA", cgpa_requirement=4))
+    assert record["min_gpa"] == 3.0
+    assert record["min_cgpa"] == 4.0
+
+
+def test_catalog_validation():
+    records, errors = normalize_catalog([RECORD, RECORD, dict(RECORD, scholarship_name="Other", link="",
+                                                              gender_eligibility="Any")])
+    assert len(records) == 3
+    assert any("duplicate id" in error for error in errors)
+    assert "Other: missing link" in errors
+    assert any("unknown gender_eligibility 'Any'" in error for error in errors)
+
@@ -0,0 +1,91 @@
+import threading
+import time
+
+import pytest
+
+from fake_llm import DEFAULT_RESPONSE, FakeStreamingLLM
+from llm_cache import LLMResponseCache
+from prefetch import Prefetcher
+from resilience import CircuitBreaker, ResilientCaller
+from session_pool import SessionMemoryPool
+
+PROFILE = {"gender": "Female", "field_of_study": "Engineering", "degree_level": "PhD", "country": "India"}
+
+
+class BrokenLLM(FakeStreamingLLM):
+    """Fails every streamed request, like an unreachable upstream"""
+
+    def _stream(self, *args, **kwargs):
+        raise ConnectionError("upstream down")
+
+
+def make_agent(llm, tmp_path):
+    from langchain_agent import ScholarshipChatAgent
+    return ScholarshipChatAgent(
+        llm=llm,
+        response_cache=LLMResponseCache(path=str(tmp_path / "llm_cache.db")),
+        caller=ResilientCaller(breaker=CircuitBreaker(failure_threshold=100), max_attempts=1),
+        sessions=SessionMemoryPool(lambda: None),
+    )
+
+
+def test_failed_prefetch_is_dropped_not_replayed(tmp_path):
+    agent = make_agent(BrokenLLM(), tmp_path)
+    prefetcher = Prefetcher()
+    key = agent.analysis_key(PROFILE)
+    job = prefetcher.submit(key, lambda: agent.analyze_profile_stream(PROFILE, fallback=False))
+    job.future.result()
+    assert isinstance(job.error, ConnectionError)
+
+    # The reader still gets the static advice...
+    shown = "".join(agent.with_fallback(job.stream(), PROFILE))
+    assert "Scholarship Opportunities for Engineering Students" in shown
+    # ...but it is neither kept for other sessions nor cached
+    assert prefetcher.get(key) is None
+    assert agent.response_cache.get(key) is None
+    assert prefetcher.submit(key, lambda: iter(["retried"])) is not job
+
+
+def test_successful_prefetch_is_cached(tmp_path):
+    agent = make_agent(FakeStreamingLLM(), tmp_path)
+    prefetcher = Prefetcher()
+    key = agent.analysis_key(PROFILE)
+    job = prefetcher.submit(key, lambda: agent.analyze_profile_stream(PROFILE, fallback=False))
+    job.future.result()
+    assert job.error is None
+    assert "".join(job.stream()) == DEFAULT_RESPONSE
+    assert prefetcher.get(key) is job
+    assert agent.response_cache.get(key) == DEFAULT_RESPONSE
+    # Handed out once; after that the response cache (and its TTL) serves the profile
+    assert prefetcher.get(key) is None
+
+
+def test_only_running_jobs_are_coalesced():
+    prefetcher = Prefetcher()
+    release = threading.Event()
+
+    def slow():
+        release.wait(5)
+        yield "fresh"
+
+    running = prefetcher.submit("k", slow)
+    assert prefetcher.submit("k", slow) is running
+    release.set()
+    running.future.result()
+    assert prefetcher.submit("k", lambda: iter(["newer"])) is not running
+    assert prefetcher.stats()["coalesced"] == 1
+
+
+def test_unread_job_expires():
+    prefetcher = Prefetcher(ttl_seconds=0.05)
+    prefetcher.submit("k", lambda: iter(["old"])).future.result()
+    time.sleep(0.1)
+    assert prefetcher.get("k") is None
+    assert prefetcher.stats()["expired"] == 1
+
+
+def test_stream_without_fallback_raises(tmp_path):
+    agent = make_agent(BrokenLLM(), tmp_path)
+    with pytest.raises(ConnectionError):
+        "".join(agent.analyze_profile_stream(PROFILE, fallback=False))
+    assert "Scholarship Opportunities" in "".join(agent.analyze_profile_stream(PROFILE))
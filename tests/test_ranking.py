@@ -0,0 +1,33 @@
+import numpy as np
+
+from eligibility import evaluate
+from ranking import RankedResults, match_scores
+
+
+def test_page_matches_a_full_sort():
+    rng = np.random.default_rng(0)
+    for _ in range(100):
+        size = int(rng.integers(1, 200))
+        ids = np.sort(rng.choice(10_000, size, replace=False))
+        # Few distinct scores, so plenty of ties straddle the page boundaries
+        scores = rng.integers(0, 6, size).astype(np.float32)
+        ranked = RankedResults(ids, scores)
+        expected = sorted(zip((-scores).tolist(), ids.tolist()))
+        for page in range(ranked.pages(7) + 1):
+            assert ranked.page(page, 7) == [(i, round(-s)) for s, i in expected[page * 7:(page + 1) * 7]]
+
+
+def test_empty_results():
+    ranked = RankedResults(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32))
+    assert ranked.pages(20) == 1
+    assert ranked.page(0, 20) == []
+
+
+def test_sqlite_orders_and_scores_like_the_column_store(columns, sqlite_store, sidebar_profiles):
+    for profile in sidebar_profiles(gpas=(None, 3.2), cgpas=(None, 8.0)):
+        result = evaluate(columns, profile)
+        for eligible, ids in ((True, result.eligible_ids), (False, result.ineligible_ids)):
+            ranked = RankedResults(ids, match_scores(columns, profile, ids, result.failures[ids]))
+            expected = [(columns[i]["id"], score) for i, score in ranked.page(0, len(columns))]
+            page = sqlite_store.query(profile, eligible=eligible, page=0, page_size=len(columns))
+            assert [(row["id"], score) for row, score in zip(page.rows, page.scores)] == expected, profile
@@ -0,0 +1,168 @@
+import time
+
+import pytest
+
+from resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError, DeadlineExceededError, \
+    ResilientCaller
+
+
+def flaky(failures, error=ConnectionError, result="ok"):
+    """A callable that raises error the first `failures` times, then returns result"""
+    calls = []
+
+    def fn():
+        calls.append(time.monotonic())
+        if len(calls) <= failures:
+            raise error("upstream hiccup")
+        return result
+
+    fn.calls = calls
+    return fn
+
+
+def test_deadline_abandons_a_hung_call():
+    caller = ResilientCaller(max_attempts=1)
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceededError):
+        caller.call(lambda: time.sleep(2), "chat", timeout=0.2)
+    assert time.monotonic() - started < 1.0
+    assert caller.stats()["calls"]["chat"]["deadline_exceeded"] == 1
+
+
+def test_transient_errors_are_retried():
+    caller = ResilientCaller(max_attempts=3, base_delay=0.001, max_delay=0.001)
+    fn = flaky(2)
+    assert caller.call(fn, "chat", timeout=5) == "ok"
+    assert len(fn.calls) == 3
+    assert caller.stats()["calls"]["chat"]["retries"] == 2
+
+
+def test_other_errors_are_not_retried_or_held_against_the_upstream():
+    breaker = CircuitBreaker(failure_threshold=1)
+    caller = ResilientCaller(breaker=breaker, max_attempts=3, base_delay=0.001)
+    fn = flaky(5, error=ValueError)
+    with pytest.raises(ValueError):
+        caller.call(fn, "chat", timeout=5)
+    assert len(fn.calls) == 1
+    assert breaker.state == CLOSED
+
+
+def test_no_retry_past_the_deadline():
+    caller = ResilientCaller(max_attempts=5, base_delay=1.0, max_delay=1.0)
+    caller.backoff = lambda attempt: 1.0
+    fn = flaky(5)
+    with pytest.raises(ConnectionError):
+        caller.call(fn, "chat", timeout=0.5)
+    assert len(fn.calls) == 1
+
+
+def test_breaker_transitions():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.1)
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.allow()
+
+    time.sleep(0.15)
+    assert breaker.state == HALF_OPEN
+    # One trial call at a time
+    assert breaker.allow() and not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN and breaker.times_opened == 2
+
+    time.sleep(0.15)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED and breaker.allow()
+
+
+def test_open_breaker_fails_fast():
+    caller = ResilientCaller(breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60), max_attempts=1)
+    fn = flaky(10)
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            caller.call(fn, "chat", timeout=5)
+    with pytest.raises(CircuitOpenError):
+        caller.call(fn, "chat", timeout=5)
+    assert len(fn.calls) == 2
+    assert caller.stats()["calls"]["chat"]["short_circuited"] == 1
+
+
+def test_stream_is_retried_only_before_the_first_chunk():
+    caller = ResilientCaller(max_attempts=3, base_delay=0.001, max_delay=0.001)
+    attempts = []
+
+    def fails_then_streams():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ConnectionError("reset before any text")
+        yield "a"
+        yield "b"
+
+    assert list(caller.stream(fails_then_streams, "chat", timeout=5)) == ["a", "b"]
+    assert len(attempts) == 2
+
+    def fails_midway():
+        attempts.append(1)
+        yield "partial"
+        raise ConnectionError("reset mid-answer")
+
+    attempts.clear()
+    received = []
+    with pytest.raises(ConnectionError):
+        for chunk in caller.stream(fails_midway, "chat", timeout=5):
+            received.append(chunk)
+    assert received == ["partial"] and len(attempts) == 1
+
+
+def test_abandoned_call_is_reported_until_it_finishes():
+    caller = ResilientCaller(max_attempts=1)
+    abandoned = []
+    with pytest.raises(DeadlineExceededError):
+        caller.call(lambda: time.sleep(0.3), "chat", timeout=0.05, on_abandon=abandoned.append)
+    assert len(abandoned) == 1 and not abandoned[0].done()
+    abandoned[0].result(timeout=2)
+    assert caller.stats()["calls"]["chat"]["abandoned"] == 1
+
+
+def test_abandoned_stream_is_reported_until_it_ends():
+    caller = ResilientCaller(max_attempts=1)
+    abandoned = []
+
+    def slow_stream():
+        time.sleep(0.3)
+        yield "late"
+
+    with pytest.raises(DeadlineExceededError):
+        list(caller.stream(slow_stream, "chat", timeout=0.05, on_abandon=abandoned.append))
+    assert len(abandoned) == 1 and not abandoned[0].done()
+    abandoned[0].result(timeout=2)
+
+    # A stream read to the end was never abandoned
+    assert list(caller.stream(lambda: iter(["a", "b"]), "chat", timeout=5, on_abandon=abandoned.append)) == ["a", "b"]
+    assert len(abandoned) == 1
+
+
+@pytest.mark.parametrize("use_stream", [False, True])
+def test_timed_out_llm_call_keeps_its_admission_slot(use_stream):
+    from admission import AdmissionController
+    from fake_llm import FakeStreamingLLM
+    from langchain_agent import ScholarshipChatAgent
+
+    admission = AdmissionController(rate=1000.0, burst=1000, max_concurrency=1)
+    agent = ScholarshipChatAgent(
+        llm=FakeStreamingLLM(first_token_delay=0.4),
+        caller=ResilientCaller(max_attempts=1, budgets={"summary": 0.1}),
+        admission=admission,
+    )
+    with pytest.raises(DeadlineExceededError):
+        if use_stream:
+            list(agent._stream_llm("slow prompt", "summary"))
+        else:
+            agent._call_llm("slow prompt", "summary")
+    # The upstream is still working on it, so the one slot is still taken
+    assert admission.stats()["active"] == 1
+    time.sleep(0.6)
+    assert admission.stats()["active"] == 0
+    assert admission.stats()["calls"]["summary"]["abandoned"] == 1
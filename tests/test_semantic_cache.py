@@ -0,0 +1,60 @@
+import time
+
+from semantic_cache import SemanticCache
+
+QUESTION = "Which scholarships are there for girls in engineering?"
+
+
+def test_paraphrase_is_a_hit():
+    cache = SemanticCache(path=None)
+    cache.store(QUESTION, "", "answer")
+    hit = cache.lookup("engineering scholarships for women")
+    assert hit.answer == "answer" and hit.similarity >= cache.threshold
+    assert cache.stats()["hits"] == 1
+
+
+def test_different_facets_or_numbers_never_hit():
+    cache = SemanticCache(path=None, threshold=0.5)
+    cache.store(QUESTION, "", "engineering answer")
+    cache.store("scholarships with a minimum CGPA of 8", "", "CGPA 8 answer")
+    assert cache.lookup("engineering scholarships for PhD women") is None
+    assert cache.lookup("scholarships with a minimum CGPA of 7") is None
+    assert cache.stats()["guard_rejections"] == 2
+
+
+def test_follow_up_only_hits_after_the_same_conversation():
+    cache = SemanticCache(path=None)
+    history = "User: Tell me about the Rolls-Royce Unnati scholarship"
+    cache.store("What is its deadline?", history, "Rolls-Royce deadline")
+    assert cache.lookup("What is its deadline?", history).answer == "Rolls-Royce deadline"
+    assert cache.lookup("What is its deadline?", "User: Tell me about the SWE scholarship") is None
+    # A standalone question answered mid-conversation may lean on it, so it isn't cached
+    assert cache.store(QUESTION, history, "answer") is None
+
+
+def test_expired_answers_are_not_served(tmp_path):
+    cache = SemanticCache(path=str(tmp_path / "cache.db"), ttl_seconds=0.1)
+    cache.store(QUESTION, "", "answer")
+    time.sleep(0.2)
+    assert cache.lookup(QUESTION) is None
+    assert SemanticCache(path=str(tmp_path / "cache.db"), ttl_seconds=0.1).stats()["entries"] == 0
+
+
+def test_standalone_answers_survive_a_restart(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = SemanticCache(path=path)
+    cache.store(QUESTION, "", "answer")
+    cache.store("What is its deadline?", "User: Tell me about the SWE scholarship", "follow-up answer")
+    restarted = SemanticCache(path=path)
+    assert restarted.stats()["entries"] == 1
+    assert restarted.lookup("engineering scholarships for women").answer == "answer"
+
+
+def test_reported_false_hit_is_dropped(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = SemanticCache(path=path)
+    entry_id = cache.store(QUESTION, "", "answer")
+    cache.report_false_hit(entry_id)
+    assert cache.lookup(QUESTION) is None
+    assert cache.stats()["false_hits"] == 1
+    assert SemanticCache(path=path).stats()["entries"] == 0
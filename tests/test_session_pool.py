@@ -0,0 +1,85 @@
+import threading
+import time
+
+from session_pool import SessionMemoryPool
+
+
+class SlowMemory:
+    """Just enough of TokenBudgetMemory for the pool, with slow snapshots to widen race windows"""
+
+    def __init__(self, delay: float = 0.0):
+        self.messages = []
+        self.delay = delay
+        self.on_save = None
+
+    def footprint_tokens(self):
+        return 10 * len(self.messages)
+
+    def state(self):
+        time.sleep(self.delay)
+        return {"messages": list(self.messages)}
+
+    def load_state(self, state):
+        time.sleep(self.delay)
+        self.messages = state["messages"]
+
+
+def test_spilled_session_is_restored(tmp_path):
+    pool = SessionMemoryPool(SlowMemory, max_sessions=1, path=str(tmp_path / "sessions.db"))
+    pool.get("a").messages.append("hello")
+    pool.get("b")
+    assert pool.stats()["spilled_sessions"] == 1
+    assert pool.get("a").messages == ["hello"]
+    assert pool.stats()["restored"] == 1
+
+
+def test_request_during_spill_gets_the_same_conversation(tmp_path):
+    pool = SessionMemoryPool(lambda: SlowMemory(delay=0.3), max_sessions=1, path=str(tmp_path / "sessions.db"))
+    memory = pool.get("a")
+    memory.messages.append("hello")
+    # Evicts "a"; its snapshot takes 0.3 s to write
+    evicting = threading.Thread(target=pool.get, args=("b",))
+    evicting.start()
+    time.sleep(0.1)
+    assert pool.get("a") is memory
+    evicting.join()
+    assert pool.stats()["revived"] == 1
+    memory.messages.append("again")
+    # The late spill was skipped, so nothing stale is left to restore later
+    pool.drop("b")
+    assert pool.get("a").messages == ["hello", "again"]
+
+
+def test_concurrent_requests_share_one_restore(tmp_path):
+    pool = SessionMemoryPool(lambda: SlowMemory(delay=0.1), max_sessions=1, path=str(tmp_path / "sessions.db"))
+    pool.get("a").messages.append("hello")
+    pool.get("b")
+    memories = []
+    threads = [threading.Thread(target=lambda: memories.append(pool.get("a"))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(memory) for memory in memories}) == 1
+    assert memories[0].messages == ["hello"]
+    assert pool.stats()["restored"] == 1
+
+
+def test_emptied_conversation_leaves_nothing_to_restore(tmp_path):
+    pool = SessionMemoryPool(SlowMemory, max_sessions=1, path=str(tmp_path / "sessions.db"))
+    pool.get("a").messages.append("hello")
+    pool.get("b")
+    memory = pool.get("a")
+    memory.messages.clear()
+    pool.get("b")
+    assert pool.get("a").messages == []
+
+
+def test_token_cap_evicts_least_recently_used():
+    pool = SessionMemoryPool(SlowMemory, max_tokens=25, path=None)
+    for session_id in ("a", "b", "c"):
+        memory = pool.get(session_id)
+        memory.messages.append("hi")
+        memory.on_save()
+    assert pool.stats()["sessions"] == 2
+    assert pool.stats()["evicted_capacity"] == 1
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from snapshot import FORMAT_VERSION, load_snapshot, read_header, write_snapshot
+
+
+@pytest.fixture
+def snapshot_file(columns, tmp_path):
+    path = str(tmp_path / "scholarships.snap")
+    write_snapshot(columns, path, source_signature=(1, 2))
+    return path
+
+
+def test_round_trip(columns, snapshot_file):
+    mapped = load_snapshot(snapshot_file, expected_signature=(1, 2))
+    assert len(mapped) == len(columns)
+    assert list(mapped) == list(columns)
+
+
+def test_posting_index_is_mapped_not_rebuilt(columns, snapshot_file):
+    mapped = load_snapshot(snapshot_file)
+    for name, column in columns.multi_columns.items():
+        loaded = mapped.multi_columns[name]
+        # Views into the mapped file, not arrays re-sorted at load
+        assert not loaded.postings.flags.owndata and not loaded.posting_offsets.flags.owndata
+        assert np.array_equal(loaded.postings, column.postings)
+        for value in column.vocabulary.strings:
+            assert np.array_equal(loaded.contains(value), column.contains(value))
+
+
+def test_snapshot_of_another_file_version_is_ignored(snapshot_file):
+    assert load_snapshot(snapshot_file, expected_signature=(1, 3)) is None
+
+
+def test_other_format_version_is_rejected(snapshot_file):
+    with open(snapshot_file, "rb") as f:
+        header, _ = read_header(f.read())
+    assert header["version"] == FORMAT_VERSION
+    with open(snapshot_file, "r+b") as f:
+        data = f.read().replace(b'"version": %d' % FORMAT_VERSION, b'"version": 0', 1)
+        f.seek(0)
+        f.write(data)
+    with pytest.raises(ValueError):
+        load_snapshot(snapshot_file)
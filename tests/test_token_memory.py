@@ -0,0 +1,98 @@
+import threading
+import time
+
+from token_memory import SUMMARY_PREFIX, TokenBudgetMemory, extractive_summary
+
+
+def say(memory, n, words=40):
+    memory.save_context({"input": f"question {n} " + "word " * words}, {"output": f"answer {n} " + "word " * words})
+
+
+def wait_for_summary(memory, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while memory.stats()["summarizing"] or memory.stats()["pending_turns"]:
+        assert time.monotonic() < deadline, "summary never finished"
+        time.sleep(0.01)
+
+
+def test_recent_turns_stay_within_the_budget():
+    memory = TokenBudgetMemory(max_tokens=200, summarizer=lambda summary, transcript: "they talked")
+    for n in range(6):
+        say(memory, n)
+    wait_for_summary(memory)
+    stats = memory.stats()
+    assert stats["recent_tokens"] <= 200
+    assert stats["summarized_turns"] + len(memory.chat_memory.messages) // 2 == 6
+    assert memory.messages()[0].content == SUMMARY_PREFIX + "they talked"
+    assert memory.messages()[-1].content.startswith("answer 5")
+
+
+def test_turns_stay_in_the_prompt_until_their_summary_is_ready():
+    release = threading.Event()
+    memory = TokenBudgetMemory(max_tokens=120,
+                               summarizer=lambda summary, transcript: release.wait(5) and "earlier turns")
+    for n in range(3):
+        say(memory, n)
+    contents = [message.content for message in memory.messages()]
+    assert any(content.startswith("question 0") for content in contents)
+    release.set()
+    wait_for_summary(memory)
+    assert not any(message.content.startswith("question 0") for message in memory.messages())
+    assert memory.summary == "earlier turns"
+
+
+def test_failed_summarizer_falls_back_to_an_extractive_summary():
+    def broken(summary, transcript):
+        raise ConnectionError("upstream down")
+
+    memory = TokenBudgetMemory(max_tokens=100, summarizer=broken)
+    for n in range(3):
+        say(memory, n)
+    wait_for_summary(memory)
+    assert memory.stats()["summary_failures"] >= 1
+    assert "Advisor said: answer 0" in memory.summary
+
+
+def test_extractive_summary_keeps_the_newest_text():
+    memory = TokenBudgetMemory()
+    for n in range(20):
+        say(memory, n, words=5)
+    summary = extractive_summary("", memory.chat_memory.messages, max_chars=100)
+    assert len(summary) <= 101 and summary.startswith("…") and "answer 19" in summary
+
+
+def test_state_round_trip():
+    memory = TokenBudgetMemory(max_tokens=150, summarizer=lambda summary, transcript: "earlier turns")
+    for n in range(4):
+        say(memory, n)
+    wait_for_summary(memory)
+
+    restored = TokenBudgetMemory(max_tokens=150)
+    restored.load_state(memory.state())
+    assert [m.content for m in restored.messages()] == [m.content for m in memory.messages()]
+    assert restored.footprint_tokens() == memory.footprint_tokens()
+
+
+def test_prompt_tokens_are_counted_against_the_window_baseline():
+    memory = TokenBudgetMemory(max_tokens=150, summarizer=lambda summary, transcript: "short")
+    for n in range(6):
+        say(memory, n)
+    wait_for_summary(memory)
+    memory.record_prompt(300)
+    stats = memory.stats()
+    assert stats["last_prompt_tokens"] == 300
+    # Five verbatim turns of ~90 tokens each are far more than the budgeted history
+    assert stats["last_baseline_tokens"] > 300
+    assert stats["avg_prompt_tokens"] == 300
+
+
+def test_clear_drops_a_summary_finishing_afterwards():
+    release = threading.Event()
+    memory = TokenBudgetMemory(max_tokens=100,
+                               summarizer=lambda summary, transcript: release.wait(5) and "stale summary")
+    for n in range(3):
+        say(memory, n)
+    memory.clear()
+    release.set()
+    wait_for_summary(memory)
+    assert memory.summary == "" and memory.messages() == []
@@ -0,0 +1,87 @@
+import json
+
+from catalog import ScholarshipCatalog
+from embedders import HashingEmbedder
+from vector_index import CatalogVectors, VectorIndex, embedding_text
+
+
+def make_index(path, **kwargs):
+    return VectorIndex(str(path), embedder=HashingEmbedder(dim=256), use_faiss=False, **kwargs)
+
+
+def test_upsert_embeds_only_new_or_changed_records(catalog_records, tmp_path):
+    index = make_index(tmp_path / "scholarships.vec")
+    records = catalog_records[:10]
+    assert index.upsert(records) == 10
+    assert index.upsert(records) == 0
+
+    edited = dict(records[3], brief_description="Now only for marine biology.")
+    assert index.upsert([edited]) == 1
+    assert len(index.entries) == 10
+    assert index.search(embedding_text(edited), k=1)[0][0]["record_id"] == edited["id"]
+
+
+def test_sync_removes_records_dropped_from_the_source(catalog_records, tmp_path):
+    index = make_index(tmp_path / "scholarships.vec")
+    index.sync(catalog_records[:10])
+    assert index.sync(catalog_records[2:10]) == (0, 2)
+    assert {e["record_id"] for e in index.entries} == {r["id"] for r in catalog_records[2:10]}
+    assert index.vector_for(catalog_records[0]["id"]) is None
+    # Rows added from another source are left alone
+    index.upsert(catalog_records[:1], source="web")
+    assert index.sync(catalog_records[2:10]) == (0, 0)
+    assert len(index.entries) == 9
+
+
+def test_search_excludes_and_ranks_best_first(catalog_records, tmp_path):
+    index = make_index(tmp_path / "scholarships.vec")
+    index.upsert(catalog_records)
+    target = catalog_records[5]
+    hits = index.search(index.vector_for(target["id"]), k=3)
+    assert hits[0][0]["record_id"] == target["id"]
+    assert [score for _, score in hits] == sorted((score for _, score in hits), reverse=True)
+    assert target["id"] not in {e["record_id"] for e, _ in index.search(embedding_text(target), k=3,
+                                                                            exclude=[target["id"]])}
+
+
+def test_saved_index_loads_without_reembedding(catalog_records, tmp_path):
+    path = tmp_path / "scholarships.vec"
+    index = make_index(path)
+    index.upsert(catalog_records)
+    index.save()
+
+    loaded = make_index(path)
+    assert loaded.load()
+    assert loaded.upsert(catalog_records) == 0
+    assert loaded.search(embedding_text(catalog_records[0]), k=1)[0][0]["record_id"] == catalog_records[0]["id"]
+
+    # An index built with another embedder is rebuilt rather than searched with the wrong vectors
+    other = VectorIndex(str(path), embedder=HashingEmbedder(dim=128), use_faiss=False)
+    assert not other.load()
+
+
+def test_ivf_search_switches_on_at_the_threshold(catalog_records, tmp_path):
+    index = make_index(tmp_path / "scholarships.vec", ivf_threshold=len(catalog_records), nprobe=64)
+    index.upsert(catalog_records[:-1])
+    index.search("engineering", k=1)
+    assert index.stats()["kind"] == "flat"
+
+    index.upsert(catalog_records[-1:])
+    target = catalog_records[-1]
+    assert index.search(index.vector_for(target["id"]), k=1)[0][0]["record_id"] == target["id"]
+    assert index.stats()["kind"] == "ivf"
+
+
+def test_similar_follows_catalog_reloads(catalog_records, tmp_path):
+    path = tmp_path / "scholarships.json"
+    path.write_text(json.dumps(catalog_records[:8]), encoding="utf-8")
+    catalog = ScholarshipCatalog(str(path), check_interval=0)
+    vectors = CatalogVectors(catalog, make_index(tmp_path / "scholarships.vec"))
+
+    anchor = catalog_records[0]["id"]
+    hits = vectors.similar("", k=3, anchor_id=anchor)
+    assert len(hits) == 3 and anchor not in {e["record_id"] for e, _ in hits}
+
+    path.write_text(json.dumps(catalog_records[:4]), encoding="utf-8")
+    catalog.refresh(force=True)
+    assert len(vectors.similar("", k=10, anchor_id=anchor)) == 3
@@ -0,0 +1,202 @@
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain.memory.chat_memory import BaseChatMemory
+from langchain_core.messages import BaseMessage, SystemMessage, get_buffer_string, messages_from_dict, messages_to_dict
+from pydantic import PrivateAttr
+
+SUMMARY_PREFIX = "Summary of the earlier conversation: "
+# What a ConversationBufferWindowMemory(k=5) would replay, for the savings figure
+BASELINE_WINDOW_TURNS = 5
+
+
+def approximate_tokens(text: str) -> int:
+    """~4 characters per token, close enough for budgeting without a tokenizer call per turn"""
+    return (len(text) + 3) // 4
+
+
+def extractive_summary(summary: str, transcript: List[BaseMessage], max_chars: int = 600) -> str:
+    """Fallback summary without the LLM: each question plus the first line of its answer"""
+    lines = [summary] if summary else []
+    for message in transcript:
+        first_line = next((line.strip("#*- ") for line in message.content.splitlines() if line.strip()), "")
+        lines.append(f"{'Student asked' if message.type == 'human' else 'Advisor said'}: {first_line[:160]}")
+    text = " ".join(lines)
+    return text if len(text) <= max_chars else "…" + text[-max_chars:]
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _summary_executor() -> ThreadPoolExecutor:
+    """One background worker shared by every memory, so summaries never compete with chat for threads"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="memory-summary")
+    return _executor
+
+
+class TokenBudgetMemory(BaseChatMemory):
+    """Recent turns verbatim within a token budget; older turns folded into a rolling summary.
+
+    Turns pushed out of the budget are summarized on a background thread and stay in the prompt
+    verbatim until their summary is ready, so the request path never waits for a summary.
+    """
+
+    memory_key: str = "chat_history"
+    max_tokens: int = 1000
+    min_recent_turns: int = 1
+    summary_max_tokens: int = 200
+    # (previous summary, transcript to fold in) -> new summary; the extractive fallback if unset or failing
+    summarizer: Optional[Callable[[str, str], str]] = None
+    token_counter: Callable[[str], int] = approximate_tokens
+    summary: str = ""
+    # Called after every saved turn, e.g. so a session pool can re-measure this memory
+    on_save: Optional[Callable[[], None]] = None
+
+    _pending: List[BaseMessage] = PrivateAttr(default_factory=list)
+    _summarizing: bool = PrivateAttr(default=False)
+    # Bumped by clear(), so a summary finishing afterwards is dropped instead of resurrecting the old chat
+    _generation: int = PrivateAttr(default=0)
+    _lock: Any = PrivateAttr(default_factory=threading.RLock)
+    _turn_tokens: Any = PrivateAttr(default_factory=lambda: deque(maxlen=BASELINE_WINDOW_TURNS))
+    _counters: Dict[str, int] = PrivateAttr(default_factory=lambda: {
+        "turns": 0, "summarized_turns": 0, "summaries": 0, "summary_failures": 0,
+        "prompt_tokens_total": 0, "saved_tokens_total": 0, "last_prompt_tokens": 0, "last_baseline_tokens": 0,
+    })
+
+    @property
+    def memory_variables(self) -> List[str]:
+        return [self.memory_key]
+
+    def messages(self) -> List[BaseMessage]:
+        """What goes into the prompt: summary, turns awaiting summarization, then recent turns"""
+        with self._lock:
+            messages = list(self._pending) + list(self.chat_memory.messages)
+            if self.summary:
+                messages.insert(0, SystemMessage(content=SUMMARY_PREFIX + self.summary))
+        return messages
+
+    def load_memory_variables(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        messages = self.messages()
+        if self.return_messages:
+            return {self.memory_key: messages}
+        return {self.memory_key: get_buffer_string(messages)}
+
+    def _tokens(self, messages: List[BaseMessage]) -> int:
+        return sum(self.token_counter(message.content) for message in messages)
+
+    def save_context(self, inputs: Dict[str, Any], outputs: Dict[str, str]) -> None:
+        super().save_context(inputs, outputs)
+        with self._lock:
+            self._counters["turns"] += 1
+            self._turn_tokens.append(self._tokens(self.chat_memory.messages[-2:]))
+            self._compact()
+        if self.on_save is not None:
+            self.on_save()
+
+    def _compact(self):
+        """Move the oldest turns past the budget to the summarization queue"""
+        messages = list(self.chat_memory.messages)
+        budget = self.max_tokens - self.token_counter(self.summary)
+        moved = 0
+        while len(messages) > 2 * self.min_recent_turns and self._tokens(messages) > budget:
+            self._pending.extend(messages[:2])
+            messages = messages[2:]
+            moved += 1
+        if moved:
+            self.chat_memory.messages = messages
+        if self._pending and not self._summarizing:
+            self._summarizing = True
+            _summary_executor().submit(self._summarize)
+
+    def _summarize(self):
+        """Background job: fold the pending turns into the summary, repeating while more arrive"""
+        while True:
+            with self._lock:
+                batch = list(self._pending)
+                previous = self.summary
+                generation = self._generation
+                if not batch:
+                    self._summarizing = False
+                    return
+            summary = None
+            if self.summarizer is not None:
+                try:
+                    summary = self.summarizer(previous, get_buffer_string(batch, "Student", "Advisor")).strip()
+                except Exception as e:
+                    print(f"⚠️ Conversation summary failed, keeping an extractive one: {e}")
+                    with self._lock:
+                        self._counters["summary_failures"] += 1
+            if not summary:
+                summary = extractive_summary(previous, batch)
+            max_chars = self.summary_max_tokens * 4
+            if self.token_counter(summary) > self.summary_max_tokens:
+                summary = summary[:max_chars].rsplit(" ", 1)[0] + "…"
+            with self._lock:
+                if generation != self._generation:
+                    continue
+                # Only the batch that was summarized leaves; turns queued meanwhile wait for the next round
+                del self._pending[:len(batch)]
+                self.summary = summary
+                self._counters["summaries"] += 1
+                self._counters["summarized_turns"] += len(batch) // 2
+
+    def record_prompt(self, prompt_tokens: int):
+        """Count one turn's prompt size against what a 5-turn verbatim window would have sent"""
+        with self._lock:
+            history_tokens = self._tokens(self.messages())
+            baseline = prompt_tokens - history_tokens + sum(self._turn_tokens)
+            self._counters["last_prompt_tokens"] = prompt_tokens
+            self._counters["last_baseline_tokens"] = baseline
+            self._counters["prompt_tokens_total"] += prompt_tokens
+            # Net: negative while the conversation is still shorter than the window plus the summary
+            self._counters["saved_tokens_total"] += baseline - prompt_tokens
+            self._counters["prompts"] = self._counters.get("prompts", 0) + 1
+
+    def footprint_tokens(self) -> int:
+        """Everything this memory holds, in tokens: summary, queued and recent turns"""
+        with self._lock:
+            return self.token_counter(self.summary) + self._tokens(self._pending) + self._tokens(self.chat_memory.messages)
+
+    def state(self) -> Dict:
+        """JSON-serializable snapshot for spilling an idle conversation to disk"""
+        with self._lock:
+            return {
+                "summary": self.summary,
+                "messages": messages_to_dict(list(self._pending) + list(self.chat_memory.messages)),
+                "turn_tokens": list(self._turn_tokens),
+            }
+
+    def load_state(self, state: Dict):
+        """Restore a snapshot; turns still awaiting a summary are recompacted on the next save"""
+        with self._lock:
+            self.summary = state["summary"]
+            self.chat_memory.messages = messages_from_dict(state["messages"])
+            self._turn_tokens.extend(state["turn_tokens"])
+
+    def clear(self) -> None:
+        super().clear()
+        with self._lock:
+            self._pending.clear()
+            self._generation += 1
+            self.summary = ""
+            self._turn_tokens.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._counters)
+            stats.update({
+                "summary_tokens": self.token_counter(self.summary),
+                "recent_tokens": self._tokens(self.chat_memory.messages),
+                "pending_turns": len(self._pending) // 2,
+                "summarizing": self._summarizing,
+            })
+        prompts = stats.pop("prompts", 0)
+        stats["avg_prompt_tokens"] = round(stats["prompt_tokens_total"] / prompts) if prompts else 0
+        return stats
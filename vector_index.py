@@ -0,0 +1,386 @@
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from catalog import ScholarshipCatalog, get_catalog
+from embedders import create_embedder
+from metrics import get_timings
+
+try:
+    import faiss
+except ImportError:  # the NumPy search below is used instead
+    faiss = None
+
+FORMAT_VERSION = 1
+# Catalogs at least this large get an inverted-file (IVF) index instead of a flat scan
+IVF_THRESHOLD = 2000
+
+
+def vector_path_for(catalog_path: str) -> str:
+    """scholarships.json -> scholarships.vec (plus .vec.json metadata and, with FAISS, .vec.faiss)"""
+    return os.path.splitext(catalog_path)[0] + ".vec"
+
+
+def vector_id(record_id: str) -> int:
+    """Stable 63-bit id for a catalog record id"""
+    return int.from_bytes(hashlib.sha1(record_id.encode("utf-8")).digest()[:8], "little") & (2 ** 63 - 1)
+
+
+def embedding_text(scholarship: Dict) -> str:
+    return " ".join([
+        scholarship.get("scholarship_name") or "",
+        scholarship.get("providing_body") or "",
+        " ".join(scholarship.get("field_of_study") or []),
+        " ".join(scholarship.get("engineering_discipline") or []),
+        scholarship.get("brief_description") or "",
+    ])
+
+
+def fingerprint(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+
+def ivf_lists(size: int) -> int:
+    """Number of IVF clusters: about sqrt(n), with enough points per cluster to train on"""
+    return max(1, min(int(math.sqrt(size)), size // 39))
+
+
+class NumpySearch:
+    def __init__(self, nlist: int = 0, nprobe: int = 8):
+        """Exact inner-product scan, or an IVF scan over the nprobe nearest clusters when nlist > 0"""
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.centroids: Optional[np.ndarray] = None
+        self.lists = np.zeros(0, dtype=np.int32)
+
+    @property
+    def kind(self) -> str:
+        return "ivf" if self.nlist else "flat"
+
+    def build(self, vectors: np.ndarray, iterations: int = 10):
+        if not self.nlist:
+            return
+        # Spherical k-means, seeded with evenly spaced rows so builds are reproducible
+        self.centroids = vectors[np.linspace(0, len(vectors) - 1, self.nlist).astype(int)].copy()
+        for _ in range(iterations):
+            self.lists = np.argmax(vectors @ self.centroids.T, axis=1).astype(np.int32)
+            for cluster in range(self.nlist):
+                members = vectors[self.lists == cluster]
+                if len(members):
+                    centroid = members.sum(axis=0)
+                    self.centroids[cluster] = centroid / (np.linalg.norm(centroid) or 1.0)
+        self.lists = np.argmax(vectors @ self.centroids.T, axis=1).astype(np.int32)
+
+    def add(self, vectors: np.ndarray):
+        if self.centroids is not None:
+            self.lists = np.concatenate([self.lists, np.argmax(vectors @ self.centroids.T, axis=1).astype(np.int32)])
+
+    def remove(self, keep: np.ndarray, vectors: np.ndarray):
+        """keep is the boolean mask of surviving rows, vectors what is left of them"""
+        if self.centroids is not None:
+            self.lists = self.lists[keep]
+
+    def search(self, vectors: np.ndarray, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(rows, scores) of the k best rows, best first"""
+        if self.centroids is not None:
+            probe = np.argsort(-(self.centroids @ query))[:self.nprobe]
+            rows = np.flatnonzero(np.isin(self.lists, probe))
+        else:
+            rows = np.arange(len(vectors))
+        scores = vectors[rows] @ query
+        if len(rows) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+            rows, scores = rows[top], scores[top]
+        order = np.argsort(-scores, kind="stable")
+        return rows[order], scores[order]
+
+
+class FaissSearch:
+    def __init__(self, dim: int, nlist: int = 0, nprobe: int = 8):
+        """FAISS IndexFlatIP, or IndexIVFFlat when nlist > 0; FAISS ids are row numbers"""
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.quantizer = faiss.IndexFlatIP(dim)
+        if nlist:
+            self.index = faiss.IndexIVFFlat(self.quantizer, dim, nlist, faiss.METRIC_INNER_PRODUCT)
+            self.index.nprobe = nprobe
+        else:
+            self.index = faiss.IndexIDMap2(self.quantizer)
+
+    @property
+    def kind(self) -> str:
+        return "ivf" if self.nlist else "flat"
+
+    def build(self, vectors: np.ndarray):
+        self.index.reset()
+        if self.nlist:
+            self.index.train(vectors)
+        self.index.add_with_ids(vectors, np.arange(len(vectors), dtype=np.int64))
+
+    def add(self, vectors: np.ndarray):
+        start = self.index.ntotal
+        self.index.add_with_ids(vectors, np.arange(start, start + len(vectors), dtype=np.int64))
+
+    def remove(self, keep: np.ndarray, vectors: np.ndarray):
+        # Row numbers shift after a removal, so the survivors are re-added under their new rows
+        # (reset() keeps the IVF training)
+        self.index.reset()
+        if len(vectors):
+            self.index.add_with_ids(vectors, np.arange(len(vectors), dtype=np.int64))
+
+    def search(self, vectors: np.ndarray, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        scores, rows = self.index.search(query.reshape(1, -1), k)
+        found = rows[0] >= 0
+        return rows[0][found], scores[0][found]
+
+    def save(self, path: str):
+        faiss.write_index(self.index, path)
+
+
+class VectorIndex:
+    def __init__(self, path: str, embedder=None, ivf_threshold: int = IVF_THRESHOLD, nprobe: int = 8,
+                 use_faiss: Optional[bool] = None):
+        """Embeddings of catalog records with incremental upsert/remove, persisted next to the catalog.
+
+        The vectors file is the source of truth; the search structure (flat or IVF, FAISS when
+        installed) is rebuilt from it when the size crosses ivf_threshold.
+        """
+        self.path = path
+        self.embedder = embedder or create_embedder()
+        self.ivf_threshold = ivf_threshold
+        self.nprobe = nprobe
+        self.use_faiss = faiss is not None if use_faiss is None else use_faiss and faiss is not None
+
+        self.vectors = np.zeros((0, self.embedder.dim), dtype=np.float32)
+        # Per row: record_id, source, fingerprint and what's needed to show the result
+        self.entries: List[Dict] = []
+        self._rows: Dict[int, int] = {}
+        self._search = None
+        self._lock = threading.RLock()
+        self.last_build_seconds = 0.0
+
+    # Persistence
+
+    @property
+    def meta_path(self) -> str:
+        return self.path + ".json"
+
+    @property
+    def faiss_path(self) -> str:
+        return self.path + ".faiss"
+
+    def load(self) -> bool:
+        """Load a saved index built with the same embedder; False if there is none (or it can't be used)"""
+        if not (os.path.exists(self.path) and os.path.exists(self.meta_path)):
+            return False
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("version") != FORMAT_VERSION or meta.get("embedder") != self.embedder.config():
+                print(f"♻️ Vector index {self.path} was built with another embedder; rebuilding")
+                return False
+            with np.load(self.path, allow_pickle=False) as data:
+                vectors = data["vectors"]
+                state = {key[len("embedder."):]: data[key] for key in data.files if key.startswith("embedder.")}
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable vector index {self.path}: {e}")
+            return False
+
+        with self._lock:
+            self.embedder.load_state(state)
+            self.vectors = vectors
+            self.entries = meta["entries"]
+            self._rows = {vector_id(entry["record_id"]): row for row, entry in enumerate(self.entries)}
+            self._search = None
+            if self.use_faiss and os.path.exists(self.faiss_path) and meta.get("search_kind") == self._wanted_kind():
+                self._search = FaissSearch(self.embedder.dim, self._wanted_nlist(), self.nprobe)
+                self._search.index = faiss.read_index(self.faiss_path)
+                if self._search.nlist:
+                    self._search.index.nprobe = self.nprobe
+        return True
+
+    def save(self):
+        """Write atomically, so a reader never sees a half-written index"""
+        with self._lock:
+            search = self._ensure_search()
+            arrays = {"vectors": self.vectors}
+            arrays.update({f"embedder.{key}": value for key, value in self.embedder.state().items()})
+            tmp_path = self.path + ".tmp.npz"
+            np.savez(tmp_path, **arrays)
+            os.replace(tmp_path, self.path)
+            if isinstance(search, FaissSearch):
+                search.save(self.faiss_path + ".tmp")
+                os.replace(self.faiss_path + ".tmp", self.faiss_path)
+            meta = {
+                "version": FORMAT_VERSION,
+                "embedder": self.embedder.config(),
+                "search_kind": search.kind,
+                "entries": self.entries,
+            }
+            with open(self.meta_path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            os.replace(self.meta_path + ".tmp", self.meta_path)
+
+    # Search structure
+
+    def _wanted_kind(self) -> str:
+        return "ivf" if len(self.entries) >= self.ivf_threshold else "flat"
+
+    def _wanted_nlist(self) -> int:
+        return ivf_lists(len(self.entries)) if self._wanted_kind() == "ivf" else 0
+
+    def _ensure_search(self):
+        """Current search structure, rebuilt when the catalog grew or shrank across the IVF threshold"""
+        if self._search is None or self._search.kind != self._wanted_kind():
+            started = time.perf_counter()
+            if self.use_faiss:
+                self._search = FaissSearch(self.embedder.dim, self._wanted_nlist(), self.nprobe)
+            else:
+                self._search = NumpySearch(self._wanted_nlist(), self.nprobe)
+            if len(self.vectors):
+                self._search.build(self.vectors)
+            self.last_build_seconds = time.perf_counter() - started
+        return self._search
+
+    # Updates
+
+    def upsert(self, scholarships: Iterable[Dict], source: str = "catalog") -> int:
+        """Embed new or changed records (by content fingerprint); returns how many were (re)embedded"""
+        scholarships = list(scholarships)
+        texts = {s["id"]: embedding_text(s) for s in scholarships}
+        with self._lock:
+            if self.embedder.needs_fit and not self.embedder.fitted:
+                self.embedder.fit(list(texts.values()))
+            changed = []
+            for scholarship in scholarships:
+                row = self._rows.get(vector_id(scholarship["id"]))
+                if row is None or self.entries[row]["fingerprint"] != fingerprint(texts[scholarship["id"]]):
+                    changed.append(scholarship)
+            if not changed:
+                return 0
+            self.remove([s["id"] for s in changed])
+
+            vectors = self.embedder.embed([texts[s["id"]] for s in changed])
+            start = len(self.entries)
+            self.vectors = np.vstack([self.vectors, vectors]) if len(self.vectors) else vectors
+            for offset, scholarship in enumerate(changed):
+                self.entries.append({
+                    "record_id": scholarship["id"],
+                    "source": source,
+                    "fingerprint": fingerprint(texts[scholarship["id"]]),
+                    "scholarship_name": scholarship.get("scholarship_name"),
+                    "providing_body": scholarship.get("providing_body"),
+                    "link": scholarship.get("link"),
+                })
+                self._rows[vector_id(scholarship["id"])] = start + offset
+            if self._search is not None and self._search.kind == self._wanted_kind():
+                self._search.add(vectors)
+            return len(changed)
+
+    def remove(self, record_ids: Iterable[str]) -> int:
+        with self._lock:
+            rows = {self._rows[vector_id(r)] for r in record_ids if vector_id(r) in self._rows}
+            if not rows:
+                return 0
+            keep = np.ones(len(self.entries), dtype=bool)
+            keep[list(rows)] = False
+            self.vectors = self.vectors[keep]
+            self.entries = [entry for row, entry in enumerate(self.entries) if keep[row]]
+            self._rows = {vector_id(entry["record_id"]): row for row, entry in enumerate(self.entries)}
+            if self._search is not None:
+                self._search.remove(keep, self.vectors)
+            return len(rows)
+
+    def sync(self, scholarships: Iterable[Dict], source: str = "catalog") -> Tuple[int, int]:
+        """Make the rows from source match scholarships; returns (embedded, removed)"""
+        scholarships = list(scholarships)
+        with self._lock:
+            current = {s["id"] for s in scholarships}
+            stale = [e["record_id"] for e in self.entries if e["source"] == source and e["record_id"] not in current]
+            removed = self.remove(stale)
+            return self.upsert(scholarships, source), removed
+
+    # Queries
+
+    def vector_for(self, record_id: str) -> Optional[np.ndarray]:
+        row = self._rows.get(vector_id(record_id))
+        return None if row is None else self.vectors[row]
+
+    def search(self, query, k: int = 5, exclude: Iterable[str] = ()) -> List[Tuple[Dict, float]]:
+        """(entry, cosine) of the k nearest records to a text or a vector, best first"""
+        started = time.perf_counter()
+        exclude = set(exclude)
+        with self._lock:
+            if not self.entries:
+                return []
+            vector = self.embedder.embed([query])[0] if isinstance(query, str) else query
+            rows, scores = self._ensure_search().search(self.vectors, vector.astype(np.float32), k + len(exclude))
+            hits = [(self.entries[int(row)], float(score)) for row, score in zip(rows, scores)
+                    if self.entries[int(row)]["record_id"] not in exclude]
+        get_timings().record("vectors.search", time.perf_counter() - started)
+        return hits[:k]
+
+    def stats(self) -> Dict:
+        search = self._search
+        return {
+            "records": len(self.entries),
+            "embedder": self.embedder.config(),
+            "backend": "faiss" if self.use_faiss else "numpy",
+            "kind": search.kind if search else None,
+            "last_build_ms": round(self.last_build_seconds * 1000, 2),
+            "search": get_timings().summary("vectors.search"),
+        }
+
+
+class CatalogVectors:
+    def __init__(self, catalog: Optional[ScholarshipCatalog] = None, index: Optional[VectorIndex] = None):
+        """The vector index kept in step with the catalog: synced on first use and after every reload"""
+        self.catalog = catalog or get_catalog()
+        self.index = index or VectorIndex(vector_path_for(self.catalog.path))
+        self._columns = None
+        self._lock = threading.Lock()
+
+    def synced(self) -> VectorIndex:
+        columns = self.catalog.scholarships
+        if columns is not self._columns:
+            with self._lock:
+                if columns is not self._columns:
+                    if self._columns is None:
+                        self.index.load()
+                    embedded, removed = self.index.sync(columns, source="catalog")
+                    if embedded or removed:
+                        print(f"🧭 Vector index: {embedded} embedded, {removed} removed ({len(self.index.entries)} total)")
+                        try:
+                            self.index.save()
+                        except OSError as e:
+                            print(f"⚠️ Could not save vector index {self.index.path}: {e}")
+                    self._columns = columns
+        return self.index
+
+    def similar(self, query: str, k: int = 5, anchor_id: Optional[str] = None) -> List[Tuple[Dict, float]]:
+        """Records nearest to anchor_id's scholarship (excluding itself), or to the query text"""
+        index = self.synced()
+        vector = index.vector_for(anchor_id) if anchor_id else None
+        if vector is not None:
+            return index.search(vector, k, exclude=[anchor_id])
+        return index.search(query, k)
+
+
+_vectors: Optional[CatalogVectors] = None
+_vectors_lock = threading.Lock()
+
+
+def get_catalog_vectors() -> CatalogVectors:
+    """Process-wide vector index over the shared catalog"""
+    global _vectors
+    if _vectors is None:
+        with _vectors_lock:
+            if _vectors is None:
+                _vectors = CatalogVectors()
+    return _vectors